@@ -1,8 +1,7 @@
 from typing import List
 
-import requests
-
 from BERT_classifier.app.models import Labels, Results, ResultsLines, Text, TextLines
+from connectors.transport import get_transport
 
 
 class BERTConnector:
@@ -10,14 +9,14 @@ class BERTConnector:
         self.url = url
 
     def get_home(self) -> dict:
-        response = requests.get(self.url)
+        response = get_transport().get(self.url)
 
         response.raise_for_status()
 
         return response.json()
 
     def get_labels(self) -> Labels:
-        response = requests.get(self.url + "/labels")
+        response = get_transport().get(self.url + "/labels")
 
         response.raise_for_status()
 
@@ -26,8 +25,9 @@ class BERTConnector:
         return labels
 
     def post_classify_text(self, text) -> Results:
-        response = requests.post(self.url + "/classify_text",
-                                 json=Text(text=text).dict())
+        response = get_transport().post(self.url + "/classify_text",
+                                        json=Text(text=text).dict(),
+                                        idempotent=True)
 
         response.raise_for_status()
 
@@ -46,8 +46,9 @@ class BERTConnector:
         return results_lines
 
     def _post(self, url_path, json=None):
-        response = requests.post(self.url + url_path,
-                                 json=json)
+        response = get_transport().post(self.url + url_path,
+                                        json=json,
+                                        idempotent=True)
 
         response.raise_for_status()
 
@@ -0,0 +1,212 @@
+"""
+Content-addressed on-disk cache for API responses.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+# Header of every cache file: creation time (used for the TTL).
+_HEADER = struct.Struct("<d")
+_SUFFIX = ".z"
+
+
+class DiskCache:
+    """
+    Compressed key-value store on disk, with size-bounded LRU eviction and a time to live.
+
+    The least recently used entries are removed once the total size of the cache exceeds *max_size*.
+    Entries older than *ttl* are ignored (and removed).
+    """
+
+    def __init__(self,
+                 directory: Union[str, Path],
+                 max_size: int = 1024 ** 3,
+                 ttl: Optional[float] = None,
+                 compress_level: int = 6):
+        """
+
+        Args:
+            directory: Folder to save the cache in. Is created if it doesn't exist yet.
+            max_size: Maximum total size of the (compressed) cache in bytes.
+            ttl: Time to live of an entry in seconds. None for no expiration.
+            compress_level: zlib compression level, 1 (fastest) to 9 (smallest).
+        """
+
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.compress_level = compress_level
+
+        self.n_hits = 0
+        self.n_misses = 0
+
+        self._lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Index of the entries: key -> size, from least to most recently used.
+        self._index = OrderedDict()
+        self._size = 0
+        l_entries = []
+        for filename in self.directory.glob(f"*/*{_SUFFIX}"):
+            try:
+                stat = filename.stat()
+            except FileNotFoundError:
+                continue
+            l_entries.append((stat.st_mtime, filename.name[:-len(_SUFFIX)], stat.st_size))
+
+        for _, key, size in sorted(l_entries):
+            self._index[key] = size
+            self._size += size
+
+    @staticmethod
+    def make_key(*parts: Optional[str]) -> str:
+        """
+        Make a key for the cache, from e.g. the endpoint, HTML and language.
+
+        Args:
+            *parts: strings to identify the entry. None is allowed.
+
+        Returns:
+            sha256 hex digest
+        """
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(repr(part).encode("utf-8"))
+            h.update(b"\0")
+
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get the value of an entry.
+
+        Args:
+            key: see make_key.
+
+        Returns:
+            The value, or None if not in the cache or expired.
+        """
+
+        filename = self._get_filename(key)
+
+        try:
+            with open(filename, "rb") as f:
+                b = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.n_misses += 1
+                self._remove_from_index(key)
+            return None
+
+        (t_created,) = _HEADER.unpack_from(b)
+        if self.ttl is not None and time.time() - t_created > self.ttl:
+            self.delete(key)
+            with self._lock:
+                self.n_misses += 1
+            return None
+
+        try:
+            value = zlib.decompress(b[_HEADER.size:])
+        except zlib.error:
+            # Corrupt entry.
+            self.delete(key)
+            with self._lock:
+                self.n_misses += 1
+            return None
+
+        # Mark as recently used. The modification time is used to restore the order.
+        try:
+            os.utime(filename)
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self.n_hits += 1
+            if key not in self._index:
+                self._index[key] = len(b)
+                self._size += len(b)
+            self._index.move_to_end(key)
+
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Add an entry, evicting the least recently used entries if the cache gets too big.
+
+        Args:
+            key: see make_key.
+            value: raw bytes to save.
+        """
+
+        b = _HEADER.pack(time.time()) + zlib.compress(value, self.compress_level)
+
+        filename = self._get_filename(key)
+        filename.parent.mkdir(exist_ok=True)
+
+        # Write to a temporary file first, such that other processes never read a partial entry.
+        fd, filename_tmp = tempfile.mkstemp(dir=filename.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(b)
+            os.replace(filename_tmp, filename)
+        except BaseException:
+            try:
+                os.remove(filename_tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            self._remove_from_index(key)
+            self._index[key] = len(b)
+            self._size += len(b)
+
+            while self._size > self.max_size and len(self._index) > 1:
+                key_lru, _ = next(iter(self._index.items()))
+                self._remove_from_index(key_lru)
+                try:
+                    os.remove(self._get_filename(key_lru))
+                except FileNotFoundError:
+                    pass
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove_from_index(key)
+        try:
+            os.remove(self._get_filename(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            l_keys = list(self._index)
+        for key in l_keys:
+            self.delete(key)
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the cache on disk, in bytes.
+        """
+        return self._size
+
+    def __len__(self):
+        return len(self._index)
+
+    def _get_filename(self, key: str) -> Path:
+        # Spread over subfolders, to keep the folders small.
+        return self.directory / key[:2] / (key + _SUFFIX)
+
+    def _remove_from_index(self, key: str) -> None:
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._size -= size
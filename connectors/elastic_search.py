@@ -6,9 +6,10 @@ from collections import Counter
 from typing import Dict, Generator, List, Optional, Union
 
 import pydantic
-import requests
 from pydantic import BaseModel
 
+from connectors.transport import get_transport
+
 ES_LOGIN = os.environ.get("ES_LOGIN")
 ES_PASSW = os.environ.get("ES_PASSW")
 
@@ -78,7 +79,7 @@ class ElasticSearchConnector:
 
         query = f"https://elasticsearch.cefat4cities.crosslang.com/documents/_search?{s_muni}{s_from}{s_size}{s_min_acceptance}"
 
-        r = requests.get(query, auth=(ES_LOGIN, ES_PASSW))
+        r = get_transport().get(query, auth=(ES_LOGIN, ES_PASSW))
 
         assert r.ok, (r, r.text)
 
@@ -104,10 +105,10 @@ class ElasticSearchConnector:
             ]
         }
 
-        response = requests.get(self.url,
-                                data=json.dumps(d),
-                                auth=(ES_LOGIN, ES_PASSW),
-                                headers=self.HEADERS)
+        response = get_transport().get(self.url,
+                                       data=json.dumps(d),
+                                       auth=(ES_LOGIN, ES_PASSW),
+                                       headers=self.HEADERS)
 
         j = response.json()["hits"]["hits"]
 
@@ -186,10 +187,10 @@ class ElasticSearchConnector:
 
             HEADERS = {"content-type": "application/json"}
             url = "https://elasticsearch.cefat4cities.crosslang.com/documents/_search?pretty=true"
-            response = requests.get(url,
-                                    data=json.dumps(d),
-                                    auth=(ES_LOGIN, ES_PASSW),
-                                    headers=HEADERS)
+            response = get_transport().get(url,
+                                           data=json.dumps(d),
+                                           auth=(ES_LOGIN, ES_PASSW),
+                                           headers=HEADERS)
 
             try:
                 hits = response.json()["hits"]["hits"]
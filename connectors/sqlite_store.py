@@ -0,0 +1,133 @@
+"""
+Key-value table in SQLite, shared by the persistent caches (translation memory, predictions).
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+# Maximum number of variables in a single SQLite query.
+MAX_VARIABLES = 900
+
+
+class SQLiteStore:
+    """
+    Values saved in an SQLite table, keyed by (partition columns..., key column),
+    e.g. (source language, target language) and segment for the translations.
+
+    Can be shared between threads and (through the file) between processes.
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path],
+                 table: str,
+                 partition: Sequence[str],
+                 key: str,
+                 value: str,
+                 extra: Dict[str, str] = None):
+        """
+
+        Args:
+            filename: SQLite database. Is created if it doesn't exist yet.
+            table: Name of the table. Is created if it doesn't exist yet.
+            partition: Names of the columns that are fixed for a lookup.
+            key: Name of the column with the keys.
+            value: Name of the column with the values.
+            extra: (Optional) additional columns that are only written: name -> SQL type, e.g. {"created": "REAL"}.
+        """
+
+        self.filename = str(filename)
+
+        self.table = table
+        self.partition = tuple(partition)
+        self.key = key
+        self.value = value
+        self.extra = dict(extra or {})
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+        columns = [f"{column} TEXT NOT NULL" for column in (*self.partition, self.key, self.value)]
+        columns += [f"{column} {sql_type} NOT NULL" for column, sql_type in self.extra.items()]
+
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                             {", ".join(columns)},
+                             PRIMARY KEY ({", ".join((*self.partition, self.key))}))""")
+            conn.commit()
+
+    def get_many(self, partition: Tuple[str, ...], keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up multiple keys at once.
+
+        Args:
+            partition: Values of the partition columns.
+            keys: Keys to look up.
+
+        Returns:
+            Dictionary key -> value, only for the keys that were found.
+        """
+
+        l_key = list(dict.fromkeys(keys))
+
+        where = " AND ".join(f"{column} = ?" for column in self.partition)
+
+        d_value = {}
+
+        with self._lock:
+            conn = self._get_connection()
+
+            for i in range(0, len(l_key), MAX_VARIABLES):
+                l_key_i = l_key[i:i + MAX_VARIABLES]
+
+                rows = conn.execute(f"""SELECT {self.key}, {self.value} FROM {self.table}
+                                        WHERE {where + " AND " if where else ""}
+                                        {self.key} IN ({", ".join("?" * len(l_key_i))})""",
+                                    (*partition, *l_key_i))
+
+                d_value.update(rows)
+
+        return d_value
+
+    def set_many(self,
+                 partition: Tuple[str, ...],
+                 d_value: Dict[str, str],
+                 extra: Sequence = ()) -> None:
+        """
+        Save (or replace) multiple values at once.
+
+        Args:
+            partition: Values of the partition columns.
+            d_value: Dictionary key -> value.
+            extra: Values of the extra columns, the same for all the keys.
+        """
+
+        columns = (*self.partition, self.key, self.value, *self.extra)
+
+        with self._lock:
+            conn = self._get_connection()
+            conn.executemany(f"""INSERT OR REPLACE INTO {self.table} ({", ".join(columns)})
+                                 VALUES ({", ".join("?" * len(columns))})""",
+                             ((*partition, key, value, *extra) for key, value in d_value.items()))
+            conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            (n,) = self._get_connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return n
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Connections can't be shared with forked processes.
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.filename,
+                                         timeout=30,
+                                         check_same_thread=False)
+            # Allow reading while another process is writing.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn_pid = os.getpid()
+
+        return self._conn
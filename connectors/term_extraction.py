@@ -1,15 +1,27 @@
+import hashlib
+import json
+import os
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from enum import auto, Enum
-from typing import List
+from typing import Dict, List, Optional
 
 import requests
 from pydantic import BaseModel, validator
 
-from connectors.term_extraction_utils.cas_utils import CasWrapper
+from connectors.disk_cache import DiskCache
+from connectors.transport import get_transport, Transport
+from connectors.term_extraction_utils.cas_utils import get_contact_paragraph, get_tokens
 from connectors.term_extraction_utils.models import ChunkModel, ContactInfo, Document, QuestionAnswersModel, TermsModel
 
 KEY_CAS_CONTENT = 'cas_content'
 
+# Opt-in cache of the term extraction responses: folder, max size (MB) and time to live (seconds).
+TERM_EXTRACTION_CACHE = os.environ.get("TERM_EXTRACTION_CACHE")
+TERM_EXTRACTION_CACHE_SIZE = float(os.environ.get("TERM_EXTRACTION_CACHE_SIZE", 1024))
+TERM_EXTRACTION_CACHE_TTL = float(os.environ.get("TERM_EXTRACTION_CACHE_TTL") or 0) or None
+
 
 class Connector:
     def __init__(self, url,
@@ -27,19 +39,53 @@ class Connector:
 
         if test_connection:
             try:
-                requests.get(url)
-            except requests.exceptions.ConnectionError as e:
+                # Without retries, such that an unreachable API doesn't block the init during the backoff.
+                self.transport.get(url, retries=0)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
                 warnings.warn(f"Can't reach API.\n{e}", ConnectionWarning)
 
+    @property
+    def transport(self) -> Transport:
+        """
+        Shared transport (keep-alive connection pools) of the current process.
+        """
+        return get_transport()
+
 
 class ConnectorTermExtraction(Connector):
     """
     Connects to the Term Extraction API
+
+    The responses of /chunking, /extract_terms and /extract_contact_info can be cached on disk,
+    such that an unchanged corpus doesn't have to be sent again.
     """
 
+    _PATH_CHUNKING = "/chunking"
     _PATH_EXTRACT_TERMS = "/extract_terms"
+    _PATH_EXTRACT_CONTACT_INFO = "/extract_contact_info"
     _PATH_EXTRACT_QA = "/extract_questions_answers"
 
+    def __init__(self, url,
+                 test_connection: bool = True,
+                 cache: Optional[DiskCache] = None):
+        """
+
+        Args:
+            url:
+                URL of the API
+            test_connection:
+                flag to make a small connection check. Disable for slightly faster init.
+                Skipped when using a cache, as the API might not be needed at all.
+            cache:
+                Cache for the responses. If None, the cache configured by TERM_EXTRACTION_CACHE in env is used,
+                if any.
+        """
+
+        self.cache = cache if cache is not None else get_default_cache()
+
+        super(ConnectorTermExtraction, self).__init__(url,
+                                                      test_connection=test_connection and self.cache is None)
+
     def get_contact_info(self,
                          html: str,
                          language: str = None,
@@ -62,9 +108,8 @@ class ConnectorTermExtraction(Connector):
         # TODO use cleaned version of contact
         # TODO test that cleaned version returns the same values.
 
-        cas = CasWrapper.from_cas_content(contact_info_response.cas_content)
-
-        l_contact = cas.get_contact_paragraph(unique=unique)
+        # Only the contact paragraphs are needed, no need to decode the whole CAS.
+        l_contact = get_contact_paragraph(contact_info_response.cas_content, unique=unique)
 
         return l_contact
 
@@ -73,10 +118,8 @@ class ConnectorTermExtraction(Connector):
         terms_return = self._post_extract_terms(html,
                                                 language=language)
 
-        cas = CasWrapper.from_cas_content(terms_return.cas_content)
-
         # TODO use cleaned list of terms/lemmas
-        l_terms = cas._get_tokens()
+        l_terms = get_tokens(terms_return.cas_content)
 
         return l_terms
 
@@ -87,9 +130,7 @@ class ConnectorTermExtraction(Connector):
                        language=language
                        )
 
-        r = requests.post(self.url + "/chunking",
-                          json=doc.dict())
-        j_r = r.json()
+        j_r = self._post_cached(self._PATH_CHUNKING, doc)
 
         chunk = ChunkModel.from_json(j_r)
 
@@ -114,9 +155,7 @@ class ConnectorTermExtraction(Connector):
                        language=language
                        )
 
-        r = requests.post(self.url + self._PATH_EXTRACT_TERMS,
-                          json=doc.dict())
-        j_r = r.json()
+        j_r = self._post_cached(self._PATH_EXTRACT_TERMS, doc)
         return TermsModel.from_json(j_r)
 
     def _post_extract_contact_info(self,
@@ -138,9 +177,7 @@ class ConnectorTermExtraction(Connector):
                        language=language
                        )
 
-        r = requests.post(self.url + "/extract_contact_info",
-                          json=doc.dict())
-        j_r = r.json()
+        j_r = self._post_cached(self._PATH_EXTRACT_CONTACT_INFO, doc)
 
         contact_info_response = ContactInfo(**j_r)
 
@@ -158,14 +195,51 @@ class ConnectorTermExtraction(Connector):
                        language=language
                        )
 
-        r = requests.post(self.url + self._PATH_EXTRACT_QA,
-                          json=doc.dict())
+        r = self.transport.post(self.url + self._PATH_EXTRACT_QA,
+                                json=doc.dict(),
+                                idempotent=True)
         j_r = r.json()
 
         qa_response = QuestionAnswersModel.from_json(j_r)
 
         return qa_response
 
+    def _post_cached(self, path: str, doc: Document) -> dict:
+        """
+        Post request, of which the response is saved in the cache (if enabled).
+
+        Args:
+            path: Path of the endpoint.
+            doc: Input of the request.
+
+        Returns:
+            JSON of the response
+        """
+
+        if self.cache is None:
+            r = self.transport.post(self.url + path,
+                                    json=doc.dict(),
+                                    idempotent=True)
+            r.raise_for_status()
+            return r.json()
+
+        key = self.cache.make_key(self.url + path,
+                                  hashlib.sha256(doc.html.encode("utf-8")).hexdigest(),
+                                  doc.language)
+
+        content = self.cache.get(key)
+        if content is None:
+            r = self.transport.post(self.url + path,
+                                    json=doc.dict(),
+                                    idempotent=True)
+            # Errors are not saved, they could be temporary.
+            r.raise_for_status()
+
+            content = r.content
+            self.cache.set(key, content)
+
+        return json.loads(content)
+
 
 class Sentence(BaseModel):
     string: str
@@ -175,6 +249,11 @@ class SentenceCountry(Sentence):
     country_code: str
 
 
+class SentencesCountry(BaseModel):
+    strings: List[str]
+    country_code: str
+
+
 class TypesContactInfo(Enum):
     """
     Using auto, because we don't need a value.
@@ -209,6 +288,7 @@ class ConnectorContactInfoClassification(Connector):
     # TODO this should actually be implemented in the API repo and installed from there!
 
     _PATH_CLASSIFY_CONTACT_TYPE = "/classify_contact_type"
+    _PATH_CLASSIFY_CONTACT_TYPE_LINES = "/classify_contact_type_lines"
     _PATH_CLASSIFY_LABELS = "/classify_contact_type/labels"
 
     _PATH_CLASSIFY_EMAIL = "/classify_contact_type/email"
@@ -216,14 +296,85 @@ class ConnectorContactInfoClassification(Connector):
     _PATH_CLASSIFY_TELEPHONE = "/classify_contact_type/telephone"
     _PATH_CLASSIFY_ADDRESS = "/classify_contact_type/address"
 
+    # Remember per API whether the batch route exists, to only try it once.
+    _has_route_lines: Dict[str, bool] = {}
+
+    def classify_contact_type_lines(self,
+                                    l_s: List[str],
+                                    country_code: str,
+                                    max_workers: int = 8) -> List[List[Label]]:
+        """
+        Classify the contact type of multiple lines at once.
+
+        Uses the batch route of the API if available (single request),
+        else the lines are sent concurrently, with at most *max_workers* requests at the same time.
+
+        Args:
+            l_s: List of lines with contact info.
+            country_code: e.g. BE, AT...
+            max_workers: Maximum number of requests at the same time, when the batch route is not available.
+
+        Returns:
+            The labels for each line, in the same order.
+        """
+
+        # Duplicate lines only have to be classified once.
+        l_s_unique = list(dict.fromkeys(l_s))
+
+        if not l_s_unique:
+            return []
+
+        l_labels_unique = None
+
+        if self._has_route_lines.get(self.url, True):
+            try:
+                l_labels_unique = self._post_classify_contact_type_lines(l_s_unique,
+                                                                         country_code=country_code)
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code not in (404, 405):
+                    raise
+
+                # Batch route is not available.
+                self._has_route_lines[self.url] = False
+            else:
+                self._has_route_lines[self.url] = True
+
+        if l_labels_unique is None:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(l_s_unique))) as executor:
+                l_labels_unique = list(executor.map(lambda s: self._post_classify_contact_type(s, country_code),
+                                                    l_s_unique))
+
+        d_labels = dict(zip(l_s_unique, l_labels_unique))
+
+        return [d_labels[s] for s in l_s]
+
+    def _post_classify_contact_type_lines(self,
+                                          l_s: List[str],
+                                          country_code: str) -> List[List[Label]]:
+        sents = SentencesCountry(strings=l_s,
+                                 country_code=country_code)
+
+        r = self.transport.post(self.url + self._PATH_CLASSIFY_CONTACT_TYPE_LINES,
+                                json=sents.dict(),
+                                idempotent=True)
+
+        r.raise_for_status()
+
+        j_r = r.json()
+
+        l_labels = [[Label(**label) for label in labels] for labels in j_r]
+
+        return l_labels
+
     def _post_classify_contact_type(self,
                                     s: str,
                                     country_code: str) -> List[Label]:
         sent = SentenceCountry(string=s,
                                country_code=country_code)
 
-        r = requests.post(self.url + self._PATH_CLASSIFY_CONTACT_TYPE,
-                          json=sent.dict())
+        r = self.transport.post(self.url + self._PATH_CLASSIFY_CONTACT_TYPE,
+                                json=sent.dict(),
+                                idempotent=True)
 
         r.raise_for_status()
 
@@ -234,7 +385,7 @@ class ConnectorContactInfoClassification(Connector):
         return labels
 
     def _get_classify_contact_type_labels(self) -> List[str]:
-        r = requests.get(self.url + self._PATH_CLASSIFY_LABELS)
+        r = self.transport.get(self.url + self._PATH_CLASSIFY_LABELS)
         l = r.json()
 
         return l
@@ -243,8 +394,9 @@ class ConnectorContactInfoClassification(Connector):
                                           s: str) -> bool:
         sent = Sentence(string=s)
 
-        r = requests.post(self.url + self._PATH_CLASSIFY_EMAIL,
-                          json=sent.dict())
+        r = self.transport.post(self.url + self._PATH_CLASSIFY_EMAIL,
+                                json=sent.dict(),
+                                idempotent=True)
         b = r.json()
 
         return b
@@ -253,8 +405,9 @@ class ConnectorContactInfoClassification(Connector):
                                           s: str) -> bool:
         sent = Sentence(string=s)
 
-        r = requests.post(self.url + self._PATH_CLASSIFY_HOURS,
-                          json=sent.dict())
+        r = self.transport.post(self.url + self._PATH_CLASSIFY_HOURS,
+                                json=sent.dict(),
+                                idempotent=True)
         b = r.json()
 
         return b
@@ -265,8 +418,9 @@ class ConnectorContactInfoClassification(Connector):
         sent = SentenceCountry(string=s,
                                country_code=country_code)
 
-        r = requests.post(self.url + self._PATH_CLASSIFY_TELEPHONE,
-                          json=sent.dict())
+        r = self.transport.post(self.url + self._PATH_CLASSIFY_TELEPHONE,
+                                json=sent.dict(),
+                                idempotent=True)
         b = r.json()
 
         return b
@@ -275,13 +429,36 @@ class ConnectorContactInfoClassification(Connector):
                                             s: str) -> bool:
         sent = Sentence(string=s, )
 
-        r = requests.post(self.url + self._PATH_CLASSIFY_ADDRESS,
-                          json=sent.dict())
+        r = self.transport.post(self.url + self._PATH_CLASSIFY_ADDRESS,
+                                json=sent.dict(),
+                                idempotent=True)
         b = r.json()
 
         return b
 
 
+_default_cache: Optional[DiskCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[DiskCache]:
+    """
+    Get the cache of the term extraction responses, as configured in env.
+
+    Returns:
+        DiskCache, or None if TERM_EXTRACTION_CACHE is not set.
+    """
+    global _default_cache
+
+    with _default_cache_lock:
+        if TERM_EXTRACTION_CACHE and _default_cache is None:
+            _default_cache = DiskCache(TERM_EXTRACTION_CACHE,
+                                       max_size=int(TERM_EXTRACTION_CACHE_SIZE * 1024 ** 2),
+                                       ttl=TERM_EXTRACTION_CACHE_TTL)
+
+    return _default_cache
+
+
 class ConnectionWarning(Warning):
     """
     Custom warning when the connection might be lost.
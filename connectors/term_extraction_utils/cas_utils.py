@@ -1,8 +1,12 @@
 import base64
 import os
-from typing import Generator, List
+import warnings
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, FrozenSet, Generator, List, NamedTuple, Optional, Sequence, Union
 
 from cassis import Cas, load_cas_from_xmi, load_typesystem, typesystem
+from lxml import etree
 
 # [Annotation]
 TAG_TYPE = "com.crosslang.uimahtmltotext.uima.type.ValueBetweenTagType"
@@ -14,6 +18,9 @@ QUESTION_PARAGRAPH_TYPE = "de.tudarmstadt.ukp.dkpro.core.api.segmentation.type.Q
 TOKEN_TYPE = "cassis.Token"
 NER_TYPE = "de.tudarmstadt.ukp.dkpro.core.api.ner.type.NamedEntity"
 
+NS_XMI = "http://www.omg.org/XMI"
+NS_CAS = "http:///uima/cas.ecore"
+
 MEDIA_ROOT = os.path.join(os.path.dirname(__file__), '../../data')
 with open(os.path.join(MEDIA_ROOT, 'typesystem.xml'), 'rb') as f:
     TYPESYSTEM = load_typesystem(f)
@@ -42,6 +49,195 @@ def get_decoded_cas_content(cas_content: str):
     return base64.b64decode(cas_content).decode('utf-8')
 
 
+class LazyAnnotation(NamedTuple):
+    """
+    Minimal representation of an annotation, see select_annotations.
+    """
+    begin: int
+    end: int
+    text: str  # covered text
+    features: Dict[str, str]  # Only the requested (primitive) features
+
+
+def select_annotations(cas_content: Union[str, bytes],
+                       annotation: str,
+                       features: Sequence[str] = (),
+                       sofa_id: str = SOFA_ID) -> List[LazyAnnotation]:
+    """
+    Streaming alternative to cas_from_cas_content(...).get_view(sofa_id).select(annotation).
+
+    The XMI is parsed incrementally and only the annotations of the requested type (and its subtypes) are kept,
+    without building the whole CAS.
+    Falls back to cassis if the XMI can't be handled by the streaming reader.
+
+    Args:
+        cas_content: The encoded UIMA CASSIS as string, or the decoded XMI as bytes.
+        annotation: annotation type, e.g. CONTACT_PARAGRAPH_TYPE
+        features: Names of the features to extract, e.g. "content" or "lemma".
+        sofa_id: uses default SOFA_ID.
+
+    Returns:
+        The annotations, in the same order as cassis.
+    """
+
+    xmi = base64.b64decode(cas_content) if isinstance(cas_content, str) else cas_content
+
+    try:
+        return _select_annotations_xmi(xmi, annotation, features=features, sofa_id=sofa_id)
+    except (etree.LxmlError, KeyError, ValueError) as e:
+        warnings.warn(f"Could not stream the XMI, falling back to cassis.\n{e}", UserWarning)
+
+    cas = load_cas_from_xmi(xmi.decode('utf-8'), typesystem=TYPESYSTEM)
+
+    return [LazyAnnotation(begin=fs.begin,
+                           end=fs.end,
+                           text=fs.get_covered_text(),
+                           features={feature: getattr(fs, feature, None) for feature in features})
+            for fs in _get_list_feature_structure(cas, annotation, sofa_id=sofa_id)]
+
+
+def _select_annotations_xmi(xmi: bytes,
+                            annotation: str,
+                            features: Sequence[str] = (),
+                            sofa_id: str = SOFA_ID) -> List[LazyAnnotation]:
+    tags = _get_tags(annotation)
+    tag_sofa = etree.QName(NS_CAS, "Sofa").text
+    tag_view = etree.QName(NS_CAS, "View").text
+    attrib_id = etree.QName(NS_XMI, "id").text
+
+    # xmi:id of the sofa -> sofaID/sofaString
+    d_sofa_id: Dict[str, str] = {}
+    d_sofa_string: Dict[str, str] = {}
+    # xmi:id of the sofa -> members of the view
+    d_members: Dict[str, FrozenSet[str]] = {}
+    # Candidate annotations: (begin, end, xmi:id, sofa ref, features)
+    l_candidates = []
+
+    context = etree.iterparse(BytesIO(xmi),
+                              events=("end",),
+                              huge_tree=True,
+                              resolve_entities=False,
+                              )
+
+    for _, elem in context:
+        tag = elem.tag
+
+        if tag in tags:
+            attrib = elem.attrib
+            l_candidates.append((int(attrib["begin"]),
+                                 int(attrib["end"]),
+                                 attrib[attrib_id],
+                                 attrib.get("sofa"),
+                                 {feature: attrib.get(feature) for feature in features}))
+        elif tag == tag_sofa:
+            xmi_id = elem.get(attrib_id)
+            d_sofa_id[xmi_id] = elem.get("sofaID")
+            d_sofa_string[xmi_id] = elem.get("sofaString")
+        elif tag == tag_view:
+            d_members[elem.get("sofa")] = frozenset(elem.get("members", "").split())
+
+        # Free the memory of the already processed elements.
+        if elem.getparent() is not None:
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    sofa_ref = next((ref for ref, _sofa_id in d_sofa_id.items() if _sofa_id == sofa_id), None)
+    if sofa_ref is None:
+        raise KeyError(f"No sofa found with ID '{sofa_id}'")
+
+    sofa_string = d_sofa_string[sofa_ref] or ""
+    members = d_members.get(sofa_ref)
+
+    # The offsets are in UTF-16 code units (Java).
+    sofa_utf16 = sofa_string.encode("utf-16-le")
+    if len(sofa_utf16) == 2 * len(sofa_string):
+        def get_covered_text(begin, end):
+            return sofa_string[begin:end]
+    else:
+        def get_covered_text(begin, end):
+            return sofa_utf16[2 * begin:2 * end].decode("utf-16-le", errors="replace")
+
+    l_annotation = [(begin, end, int(xmi_id), d_features)
+                    for begin, end, xmi_id, ref, d_features in l_candidates
+                    if ref == sofa_ref and (members is None or xmi_id in members)]
+    l_annotation.sort(key=lambda a: a[:3])
+
+    return [LazyAnnotation(begin=begin,
+                           end=end,
+                           text=get_covered_text(begin, end),
+                           features=d_features)
+            for begin, end, _, d_features in l_annotation]
+
+
+@lru_cache(maxsize=None)
+def _get_tags(annotation: str) -> FrozenSet[str]:
+    """
+    XML tags of the annotation type and its subtypes.
+    e.g. de.tudarmstadt.ukp.dkpro.core.api.segmentation.type.Paragraph
+        -> {http:///de/tudarmstadt/ukp/dkpro/core/api/segmentation/type.ecore}Paragraph
+    """
+
+    l_type_name = [t.name for t in TYPESYSTEM.get_types() if TYPESYSTEM.subsumes(annotation, t.name)]
+    if annotation not in l_type_name:
+        l_type_name.append(annotation)
+
+    def to_tag(type_name: str) -> str:
+        package, _, name = type_name.rpartition(".")
+        return etree.QName(f"http:///{package.replace('.', '/')}.ecore", name).text
+
+    return frozenset(map(to_tag, l_type_name))
+
+
+def get_contact_paragraph(cas_content: Union[str, bytes],
+                          clean: bool = True,
+                          unique: bool = False) -> List[str]:
+    """
+    Same as CasWrapper.get_contact_paragraph, without decoding the whole CAS.
+
+    Args:
+        cas_content: The encoded UIMA CASSIS as string.
+        clean: Instead of taking the text, use the pre-processed content contained within.
+        unique: flag to remove duplicates.
+
+    Returns:
+        List with the contact paragraphs.
+    """
+
+    l_annotation = select_annotations(cas_content, CONTACT_PARAGRAPH_TYPE, features=("content",))
+
+    if clean:
+        l_contact_paragraph = [a.features["content"] for a in l_annotation]
+    else:
+        l_contact_paragraph = [a.text.strip() for a in l_annotation]
+
+    if unique:
+        # Remove duplicates (and sorts as a consequence)
+        return list(set(l_contact_paragraph))
+
+    return l_contact_paragraph
+
+
+def get_tokens(cas_content: Union[str, bytes]) -> List[str]:
+    """
+    Same as CasWrapper._get_tokens, without decoding the whole CAS.
+
+    Returns:
+        list of all unique terms, as found in the HTML.
+    """
+
+    return list(set(a.text.strip() for a in select_annotations(cas_content, TOKEN_TYPE)))
+
+
+def get_lemmas(cas_content: Union[str, bytes]) -> List[Optional[str]]:
+    """
+    Returns:
+        list of the unique lemmas of the terms.
+    """
+
+    return list(set(a.features["lemma"] for a in select_annotations(cas_content, TOKEN_TYPE, features=("lemma",))))
+
+
 class CasWrapper(Cas):
     """
     wrapper around cas for our cas objects for easier extraction of content.
@@ -72,10 +268,11 @@ class CasWrapper(Cas):
         Returns:
 
         """
-        _self = cls(typesystem=cas.typesystem,
-                    lenient=cas._lenient)
+        # Skip __init__, as all the attributes are copied anyway.
+        _self = cls.__new__(cls)
 
         _self.__dict__.update(cas.__dict__)
+        _self.sofa_id = SOFA_ID
 
         return _self
 
@@ -1,11 +1,22 @@
+import io
 import os
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, Generator, List, Optional, Union
 from urllib.parse import urljoin
 
 import requests
 
+from connectors.translation_memory import normalize_segment, TranslationMemory
+from connectors.transport import get_transport, HTTP_CONNECT_TIMEOUT
+
+# Opt-in translation memory (SQLite file), to only translate segments that weren't translated before.
+TRANSLATION_MEMORY = os.environ.get("TRANSLATION_MEMORY")
+# Timeout (seconds) of the blocking translations, which only respond once translated. 0 to wait indefinitely.
+ETRANSLATION_TIMEOUT = float(os.environ.get("ETRANSLATION_TIMEOUT", 600)) or None
+
 
 class ETranslationConnector:
     base_url = 'https://etranslation.cefat4cities.crosslang.com'
@@ -19,10 +30,26 @@ class ETranslationConnector:
 
     url_docs = urljoin(url_trans_doc, "docs")
 
-    def __init__(self, username: str, password: str):
+    # Translation of a list of texts: maximum size of a single document (bytes) and documents sent at the same time.
+    MAX_CHUNK_SIZE = 100000
+    MAX_WORKERS = 4
+
+    def __init__(self, username: str, password: str,
+                 translation_memory: Optional[TranslationMemory] = None):
+        """
+
+        Args:
+            username: eTranslation login
+            password: eTranslation password
+            translation_memory: If None, the translation memory configured by TRANSLATION_MEMORY in env is used,
+                if any.
+        """
         self._username = username
         self._password = password
 
+        self.translation_memory = translation_memory if translation_memory is not None else \
+            get_default_translation_memory()
+
     def info(self):
         r = self._get(self.url_info)
         return r.json()
@@ -61,17 +88,26 @@ class ETranslationConnector:
         if not bool(snippet):
             return snippet
 
+        if self.translation_memory is not None:
+            snippet_trans = self.translation_memory.get(source, target, snippet)
+            if snippet_trans is not None:
+                return snippet_trans
+
         data = {'source': str(source),
                 'target': str(target),
                 'snippet': str(snippet)}
 
         r = self._post(self.url_trans_snippet_blocking,
-                       data=data)
+                       data=data,
+                       timeout=(HTTP_CONNECT_TIMEOUT, ETRANSLATION_TIMEOUT))
 
         r.raise_for_status()
 
         snippet_trans = r.json().strip()
 
+        if self.translation_memory is not None:
+            self.translation_memory.set(source, target, snippet, snippet_trans)
+
         return snippet_trans
 
     def trans_doc(self, source: str,
@@ -126,6 +162,7 @@ class ETranslationConnector:
             r = self._post(self.url_trans_doc_blocking,
                            data=data,
                            files=files,
+                           timeout=(HTTP_CONNECT_TIMEOUT, ETRANSLATION_TIMEOUT),
                            )
 
             if r.status_code > 300:
@@ -141,6 +178,8 @@ class ETranslationConnector:
                             l_text: List[str],
                             target: str,
                             source: str,
+                            max_chunk_size: int = None,
+                            max_workers: int = None,
                             ) -> List[str]:
         """
 
@@ -148,6 +187,9 @@ class ETranslationConnector:
             l_text: List of sentences. May contain newlines.
             target: Target langauge
             source: Source langauge
+            max_chunk_size: Maximum size (in bytes) of a single document sent to eTranslation.
+                Larger inputs are split in chunks that are translated in parallel.
+            max_workers: Maximum number of chunks that are translated at the same time.
 
         Returns:
             List with translated text segments.
@@ -161,16 +203,20 @@ class ETranslationConnector:
             l_n.append(len(text_split))
             l_text_split.extend(text_split)
 
-        s_tmp = ''.join(text_i + '\n' for text_i in l_text_split)
+        kwargs = dict(target=target,
+                      source=source,
+                      max_chunk_size=max_chunk_size,
+                      max_workers=max_workers)
 
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_file = os.path.join(tmp_dir, 'tmp_text_lines.txt')
-            with open(tmp_file, 'w') as f:
-                f.write(s_tmp)
-            # send to MT
-            j = self.trans_doc_blocking(source, target, Path(tmp_file))
+        if self.translation_memory is None:
+            # Every line only has to be translated once.
+            l_line_unique = [line for line in dict.fromkeys(l_text_split) if line.strip()]
 
-            l_trans_text_split = list(map(str.strip, j['content'].decode('UTF-8').splitlines()))
+            d_trans = dict(zip(l_line_unique, self._trans_lines_blocking(l_line_unique, **kwargs)))
+
+            l_trans_text_split = [d_trans.get(line, "") for line in l_text_split]
+        else:
+            l_trans_text_split = self._trans_lines_memory(l_text_split, **kwargs)
 
         # In case some sentences had newlines in them.
         l_text_trans = []
@@ -184,16 +230,179 @@ class ETranslationConnector:
 
         return l_text_trans
 
+    def _trans_lines_memory(self,
+                            l_line: List[str],
+                            target: str,
+                            source: str,
+                            **kwargs) -> List[str]:
+        """
+        Translate lines, only sending the lines that are not in the translation memory yet.
+
+        Args:
+            l_line: List of lines, without newlines.
+            target: Target language
+            source: Source language
+            **kwargs: See _trans_lines_blocking.
+
+        Returns:
+            Translated lines.
+        """
+
+        l_segment = [normalize_segment(line) for line in l_line]
+
+        d_trans: Dict[str, str] = self.translation_memory.get_many(source, target, filter(None, l_segment))
+
+        l_miss = [segment for segment in dict.fromkeys(l_segment) if segment and segment not in d_trans]
+
+        if l_miss:
+            l_miss_trans = self._trans_lines_blocking(l_miss, target=target, source=source, **kwargs)
+
+            d_miss_trans = dict(zip(l_miss, l_miss_trans))
+            self.translation_memory.set_many(source, target, d_miss_trans)
+            d_trans.update(d_miss_trans)
+
+        return [d_trans.get(segment, "") for segment in l_segment]
+
+    def _trans_lines_blocking(self,
+                              l_line: List[str],
+                              target: str,
+                              source: str,
+                              max_chunk_size: int = None,
+                              max_workers: int = None) -> List[str]:
+        """
+        Translate lines, by uploading them as documents of limited size, in parallel.
+
+        Args:
+            l_line: List of lines, without newlines.
+            target: Target language
+            source: Source language
+            max_chunk_size: Maximum size of a document in bytes. Defaults to MAX_CHUNK_SIZE.
+            max_workers: Maximum number of documents translated at the same time. Defaults to MAX_WORKERS.
+
+        Returns:
+            Translated lines, in the same order.
+        """
+
+        if max_chunk_size is None:
+            max_chunk_size = self.MAX_CHUNK_SIZE
+        if max_workers is None:
+            max_workers = self.MAX_WORKERS
+
+        l_chunk = list(_chunk_lines(l_line, max_chunk_size))
+
+        if len(l_chunk) <= 1:
+            return [l_trans for chunk in l_chunk for l_trans in self._trans_chunk_blocking(chunk, target, source)]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(l_chunk))) as executor:
+            l_chunk_trans = executor.map(lambda chunk: self._trans_chunk_blocking(chunk, target, source),
+                                         l_chunk)
+
+            return [l_trans for chunk_trans in l_chunk_trans for l_trans in chunk_trans]
+
+    def _trans_chunk_blocking(self,
+                              l_line: List[str],
+                              target: str,
+                              source: str) -> List[str]:
+        """
+        Translate lines, by uploading them as a single document.
+
+        Args:
+            l_line: List of lines, without newlines.
+            target: Target language
+            source: Source language
+
+        Returns:
+            Translated lines.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_file = os.path.join(tmp_dir, 'tmp_text_lines.txt')
+            with open(tmp_file, 'w', encoding='UTF-8') as f:
+                f.writelines(text_i + '\n' for text_i in l_line)
+
+            # send to MT
+            with open(tmp_file, 'rb') as f:
+                data = {'source': str(source),
+                        'target': str(target),
+                        }
+
+                files = {'file': f}
+
+                r = self._post(self.url_trans_doc_blocking,
+                               data=data,
+                               files=files,
+                               stream=True,
+                               timeout=(HTTP_CONNECT_TIMEOUT, ETRANSLATION_TIMEOUT),
+                               )
+
+        with r:
+            if r.status_code > 300:
+                raise Exception(f'{r}\n{r.text}')
+
+            # Read the translation line by line, instead of keeping the whole document in memory.
+            r.raw.decode_content = True
+            r.raw.auto_close = False  # Required by TextIOWrapper
+            l_trans_line = [line.strip() for line in io.TextIOWrapper(r.raw, encoding='UTF-8')]
+
+        if len(l_trans_line) != len(l_line):
+            # The translations can't be matched with the lines.
+            raise ValueError(f"Expected {len(l_line)} translated lines, got {len(l_trans_line)}.")
+
+        return l_trans_line
+
     def _get(self, url, auth=None, *args, **kwargs) -> requests.Response:
         if auth is None:
             auth = (self._username, self._password)
-        r = requests.get(url=url, auth=auth, *args, **kwargs)
+        r = get_transport().get(url=url, auth=auth, *args, **kwargs)
 
         return r
 
     def _post(self, url, auth=None, *args, **kwargs) -> requests.Response:
         if auth is None:
             auth = (self._username, self._password)
-        r = requests.post(url=url, auth=auth, *args, **kwargs)
+        r = get_transport().post(url=url, auth=auth, *args, **kwargs)
 
         return r
+
+
+def _chunk_lines(l_line: List[str], max_chunk_size: int) -> Generator[List[str], None, None]:
+    """
+    Split lines into consecutive chunks, of which the size (in bytes, newlines included) is at most max_chunk_size.
+    A line that is too large on its own, gets its own chunk.
+    """
+
+    chunk = []
+    size_chunk = 0
+    for line in l_line:
+        size_line = len(line.encode('UTF-8')) + 1
+
+        if chunk and size_chunk + size_line > max_chunk_size:
+            yield chunk
+            chunk = []
+            size_chunk = 0
+
+        chunk.append(line)
+        size_chunk += size_line
+
+    if chunk:
+        yield chunk
+
+
+_default_translation_memory: Optional[TranslationMemory] = None
+_default_translation_memory_lock = threading.Lock()
+
+
+def get_default_translation_memory() -> Optional[TranslationMemory]:
+    """
+    Get the translation memory, as configured in env.
+
+    Returns:
+        TranslationMemory, or None if TRANSLATION_MEMORY is not set.
+    """
+    global _default_translation_memory
+
+    with _default_translation_memory_lock:
+        if TRANSLATION_MEMORY and _default_translation_memory is None:
+            _default_translation_memory = TranslationMemory(TRANSLATION_MEMORY)
+
+    return _default_translation_memory
@@ -0,0 +1,107 @@
+"""
+Persistent translation memory, to not translate the same segment twice.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from connectors.sqlite_store import SQLiteStore
+
+
+def normalize_segment(segment: str) -> str:
+    """
+    Normalize a segment, such that trivial variations (unicode form, whitespace) share a translation.
+
+    Args:
+        segment: text to translate.
+
+    Returns:
+        normalized segment
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", segment)).strip()
+
+
+class TranslationMemory:
+    """
+    Translations saved in SQLite, keyed by (source language, target language, normalized segment).
+
+    Can be shared between threads and (through the file) between processes.
+    """
+
+    def __init__(self, filename: Union[str, Path]):
+        """
+
+        Args:
+            filename: SQLite database. Is created if it doesn't exist yet.
+        """
+
+        self.filename = str(filename)
+
+        self.n_hits = 0
+        self.n_misses = 0
+
+        self._lock = threading.Lock()
+
+        self._store = SQLiteStore(self.filename,
+                                  table="translation",
+                                  partition=("source", "target"),
+                                  key="segment",
+                                  value="translation",
+                                  extra={"created": "REAL"})
+
+    def get(self, source: str, target: str, segment: str) -> Optional[str]:
+        """
+        Get the translation of a single segment.
+
+        Returns:
+            The translation, None if not in the translation memory.
+        """
+
+        return self.get_many(source, target, [segment]).get(normalize_segment(segment))
+
+    def get_many(self, source: str, target: str, segments: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up the translations of multiple segments at once.
+
+        Args:
+            source: source language
+            target: target language
+            segments: texts to translate.
+
+        Returns:
+            Dictionary normalized segment -> translation, only for the segments found in the translation memory.
+        """
+
+        l_segment = list(dict.fromkeys(map(normalize_segment, segments)))
+
+        d_translation = self._store.get_many((source.upper(), target.upper()), l_segment)
+
+        with self._lock:
+            self.n_hits += len(d_translation)
+            self.n_misses += len(l_segment) - len(d_translation)
+
+        return d_translation
+
+    def set(self, source: str, target: str, segment: str, translation: str) -> None:
+        self.set_many(source, target, {segment: translation})
+
+    def set_many(self, source: str, target: str, translations: Dict[str, str]) -> None:
+        """
+        Save translations.
+
+        Args:
+            source: source language
+            target: target language
+            translations: Dictionary segment -> translation.
+        """
+
+        self._store.set_many((source.upper(), target.upper()),
+                             {normalize_segment(segment): translation for segment, translation in translations.items()},
+                             extra=(time.time(),))
+
+    def __len__(self):
+        return len(self._store)
@@ -0,0 +1,274 @@
+"""
+Shared HTTP transport for all the connectors.
+
+Every connector sends its requests through one (per process) persistent session,
+such that TCP/TLS connections are kept alive and reused per host.
+Failed requests are retried, except POSTs that are not marked as idempotent (see Transport.request).
+
+Configuration through environment variables:
+    HTTP_POOL_CONNECTIONS: Number of hosts to keep a connection pool for.
+    HTTP_POOL_MAXSIZE: Number of connections to keep open per host.
+    HTTP_RETRIES: Number of retries on connection errors and server overload.
+    HTTP_BACKOFF_FACTOR: Backoff factor between retries, in seconds.
+    HTTP_CONNECT_TIMEOUT: Default timeout to connect to the server, in seconds.
+    HTTP_READ_TIMEOUT: Default timeout to wait for the server to respond, in seconds. 0 to wait indefinitely.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 10))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 10))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", .5))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 60)) or None
+# Default (connect, read) timeout of a request.
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# Only retry on overload/unavailability, other status codes are handled by the connectors.
+STATUS_FORCELIST = (429, 502, 503, 504)
+
+
+class HostStats(BaseModel):
+    n_requests: int
+    n_connections: int
+
+
+class TransportStats(BaseModel):
+    """
+    Usage statistics of the transport.
+    """
+    n_requests: int  # Requests sent by the transport.
+    n_connections: int  # New connections that had to be opened.
+    in_flight: int  # Requests currently waiting for a response.
+    max_in_flight: int  # Highest number of requests in flight at the same time.
+    hosts: Dict[str, HostStats]
+
+    @property
+    def reuse_rate(self) -> float:
+        """
+        Fraction of the requests that reused an already opened connection.
+        """
+        n_requests = sum(host.n_requests for host in self.hosts.values())
+        n_connections = sum(host.n_connections for host in self.hosts.values())
+
+        if not n_requests:
+            return 0.
+
+        return max(0., 1. - n_connections / n_requests)
+
+
+class Transport:
+    """
+    Persistent session with per-host connection pools, retry with backoff and a default timeout.
+
+    Thread-safe: a single transport can be shared between threads.
+    """
+
+    def __init__(self,
+                 pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 retries: int = HTTP_RETRIES,
+                 backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                 timeout: Union[float, Tuple[float, Optional[float]], None] = HTTP_TIMEOUT):
+        """
+
+        Args:
+            pool_connections: Number of hosts to keep a connection pool for.
+            pool_maxsize: Number of connections to keep open per host, for requests sent at the same time.
+            retries: Number of retries on connection errors and overloaded servers.
+            backoff_factor: Sleep between retries: {backoff factor} * (2 ** ({number of retries} - 1)) seconds.
+            timeout: Default (connect, read) timeout in seconds, used when a request doesn't provide one.
+                None to wait indefinitely.
+        """
+
+        self.timeout = timeout
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+        # A session (and its connection pools) per (number of retries, idempotent), made on first use.
+        self._sessions: Dict[Tuple[int, bool], Tuple[requests.Session, HTTPAdapter]] = {}
+        self._sessions_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._n_requests = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    def request(self,
+                method: str,
+                url: str,
+                idempotent: bool = False,
+                retries: Optional[int] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request.
+
+        Args:
+            method: HTTP method.
+            url: URL of the request.
+            idempotent: Set to True to also retry a POST, only when sending it multiple times has no side effects
+                (e.g. a classifier). Requests with an idempotent method are always retried.
+            retries: (Optional) number of retries of this request, instead of the default of the transport,
+                e.g. 0 for a quick connection check.
+            **kwargs: See requests.Session.request.
+
+        Returns:
+            Response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        session = self._get_session(self.retries if retries is None else retries, idempotent=idempotent)
+
+        with self._lock:
+            self._n_requests += 1
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+        try:
+            return session.request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get(self, url: str, params=None, **kwargs) -> requests.Response:
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, data=None, json=None, idempotent: bool = False, **kwargs) -> requests.Response:
+        return self.request("POST", url, data=data, json=json, idempotent=idempotent, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> TransportStats:
+        """
+        Get the current usage statistics, e.g. to tune the pool size under load.
+
+        Returns:
+            TransportStats
+        """
+
+        with self._sessions_lock:
+            adapters = [adapter for _, adapter in self._sessions.values()]
+
+        hosts = {}
+        # Connections opened by pools that got evicted are not counted anymore.
+        for adapter in adapters:
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                host_stats = hosts.get(host, HostStats(n_requests=0, n_connections=0))
+                hosts[host] = HostStats(n_requests=host_stats.n_requests + pool.num_requests,
+                                        n_connections=host_stats.n_connections + pool.num_connections)
+
+        with self._lock:
+            return TransportStats(n_requests=self._n_requests,
+                                  n_connections=sum(host.n_connections for host in hosts.values()),
+                                  in_flight=self._in_flight,
+                                  max_in_flight=self._max_in_flight,
+                                  hosts=hosts)
+
+    def close(self):
+        with self._sessions_lock:
+            sessions = [session for session, _ in self._sessions.values()]
+            self._sessions.clear()
+
+        for session in sessions:
+            session.close()
+
+    def _get_session(self, retries: int, idempotent: bool = False) -> requests.Session:
+        """
+        The session with the given retry policy.
+
+        Args:
+            retries: Number of retries on connection errors and overloaded servers.
+            idempotent: Also retry the methods that are not idempotent (POST).
+
+        Returns:
+            requests.Session
+        """
+
+        key = (retries, idempotent)
+
+        with self._sessions_lock:
+            if key not in self._sessions:
+                # Only the idempotent methods (GET, PUT, DELETE...) are retried by default.
+                retry = Retry(total=retries,
+                              backoff_factor=self.backoff_factor,
+                              status_forcelist=STATUS_FORCELIST,
+                              raise_on_status=False,
+                              )
+                if idempotent:
+                    # For requests that are marked as idempotent, e.g. POSTs to read-only endpoints.
+                    retry = retry.new(allowed_methods=None)
+
+                adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                      pool_maxsize=self.pool_maxsize,
+                                      max_retries=retry)
+
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+
+                self._sessions[key] = (session, adapter)
+
+            return self._sessions[key][0]
+
+
+_transport: Optional[Transport] = None
+_transport_pid: Optional[int] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """
+    Get the shared transport of this process.
+
+    A new transport is made in forked (child) processes, as connections can't be shared between processes.
+
+    Returns:
+        Transport
+    """
+    global _transport, _transport_pid
+
+    with _transport_lock:
+        if _transport is None or _transport_pid != os.getpid():
+            _transport = Transport()
+            _transport_pid = os.getpid()
+
+        return _transport
+
+
+def configure_transport(**kwargs) -> Transport:
+    """
+    Replace the shared transport by one with a different configuration.
+
+    Args:
+        **kwargs: See Transport.
+
+    Returns:
+        The new shared Transport.
+    """
+    global _transport, _transport_pid
+
+    with _transport_lock:
+        if _transport is not None and _transport_pid == os.getpid():
+            _transport.close()
+
+        _transport = Transport(**kwargs)
+        _transport_pid = os.getpid()
+
+        return _transport
@@ -4,10 +4,11 @@ import urllib
 import warnings
 from typing import Union
 
-import requests
 from pydantic import BaseModel
 from requests import Response
 
+from connectors.transport import get_transport
+
 URL_ORION = os.environ["URL_ORION"]
 URL_V1 = URL_ORION + "/ngsi-ld/v1/entities/"
 URL_V2 = URL_ORION + "/v2/entities/"
@@ -51,14 +52,14 @@ def post_example():
         }
     }
 
-    r = requests.post(URL_V1,
-                      headers=HEADERS,
-                      json=json_post)
+    r = get_transport().post(URL_V1,
+                             headers=HEADERS,
+                             json=json_post)
     return r
 
 
 def delete_example():
-    r = requests.delete(os.path.join(URL_V2, ID))
+    r = get_transport().delete(os.path.join(URL_V2, ID))
 
     return r
 
@@ -338,7 +339,7 @@ class OrionConnector:
 
         self.url = url
 
-        response = requests.get(url + self.PATH_VERSION)
+        response = get_transport().get(url + self.PATH_VERSION)
         if not response.ok:
             warnings.warn(f"Could not connect to {url}", UserWarning)
 
@@ -352,15 +353,15 @@ class OrionConnector:
 
         """
 
-        response = requests.post(self.url + self.PATH_V1,
-                                 headers=HEADERS,
-                                 json=item)
+        response = get_transport().post(self.url + self.PATH_V1,
+                                        headers=HEADERS,
+                                        json=item)
 
         return response
 
     def remove_item(self, id: str) -> Response:
 
-        r = requests.delete(URL_V1 + id)
+        r = get_transport().delete(URL_V1 + id)
 
         return r
 
@@ -378,9 +379,9 @@ class OrionConnector:
         params = Params(options="count",
                         limit="1")
 
-        r = requests.get(self.url + self.PATH_V2,
-                         params=params.dict()
-                         )
+        r = get_transport().get(self.url + self.PATH_V2,
+                                params=params.dict()
+                                )
         n_count = int(r.headers['Fiware-Total-Count'])
         return n_count
 
@@ -449,12 +450,12 @@ def delete_all(debug=False):
         json_all = []
 
         for offset in range(0, n_count, limit):
-            r = requests.get(URL_V2,
-                             params={
-                                 "limit": str(limit),
-                                 "offset": str(offset)
-                             }
-                             )
+            r = get_transport().get(URL_V2,
+                                    params={
+                                        "limit": str(limit),
+                                        "offset": str(offset)
+                                    }
+                                    )
 
             json_all += r.json()
 
@@ -472,9 +473,9 @@ def delete_all(debug=False):
             b = 0
             if b:
 
-                r = requests.delete(URL_V1 + urllib.parse.quote_plus(s_id))
+                r = get_transport().delete(URL_V1 + urllib.parse.quote_plus(s_id))
             else:
-                r = requests.delete(URL_V1 + s_id)
+                r = get_transport().delete(URL_V1 + s_id)
 
         else:
             body = f"""
@@ -487,9 +488,9 @@ def delete_all(debug=False):
               ]
             }}
             """
-            r = requests.post("http://localhost:1026/v2/op/update",
-                              headers={"Content-Type": "application/json"},  # HEADERS
-                              json=body)
+            r = get_transport().post("http://localhost:1026/v2/op/update",
+                                     headers={"Content-Type": "application/json"},  # HEADERS
+                                     json=body)
 
         if not r.ok:
             if debug:
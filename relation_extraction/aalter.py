@@ -6,18 +6,8 @@ class AalterCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
     For https://www.aalter.be/
     """
 
-    def __init__(self,
-                 pattern_criterion_requirement=r"voorwaarden(.)*",
-                 pattern_rule=r"hoe(.)*",
-                 pattern_evidence=r"wat meebrengen(.)*",  # with or without ?
-                 pattern_cost=r"prijs(.)*",
-                 ):
-        super(AalterCPSVAPRelationsClassifier, self).__init__(
-            pattern_criterion_requirement=pattern_criterion_requirement,
-            pattern_rule=pattern_rule,
-            pattern_evidence=pattern_evidence,
-            pattern_cost=pattern_cost
-        )
+    # Patterns in regex_classifiers.yml
+    municipality = "Aalter"
 
 
 class AalterParser(ClassifierCityParser):
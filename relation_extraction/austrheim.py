@@ -6,18 +6,8 @@ class AustrheimCPSVAPRelationsClassifier(AalterCPSVAPRelationsClassifier):
     Austrheim
     """
 
-    def __init__(self,
-                 pattern_criterion_requirement=r"Krav til søkjar(.)*",
-                 pattern_rule=r"Kva skjer vidare(.)*",
-                 pattern_evidence=r"(?=x)(?!x)",  # TODO NOT IMPLEMENTED YET
-                 pattern_cost=r"Kva kostar det(.)*",
-                 ):
-        super(AustrheimCPSVAPRelationsClassifier, self).__init__(
-            pattern_criterion_requirement=pattern_criterion_requirement,
-            pattern_rule=pattern_rule,
-            pattern_evidence=pattern_evidence,
-            pattern_cost=pattern_cost
-        )
+    # Patterns in regex_classifiers.yml
+    municipality = "Austrheim"
 
 
 class AustrheimParser(AalterParser):  # CityParser
@@ -7,12 +7,17 @@ import abc
 import re
 from typing import Generator, List, Optional, Tuple, Union
 
+import lxml.html
 from bs4 import BeautifulSoup, Tag
 from pydantic import BaseModel
 
 from c4c_cpsv_ap.models import BusinessEvent, Event, Info, LifeEvent
 from relation_extraction.html_parsing.parsers import Section
-from relation_extraction.utils import clean_text
+from relation_extraction.html_parsing.section_extractor import is_header, LxmlSectionExtractor
+from relation_extraction.parsed_page import get_page_key, ParsedPage, ParsedPageCache
+from relation_extraction.regex_classifiers import compile_relations_pattern, FILENAME_REGEX_CLASSIFIERS, \
+    get_regex_classifiers, RegexClassifierModel
+from relation_extraction.utils import clean_text, get_page_procedure, HeaderIndex
 
 
 class Relations(BaseModel):
@@ -62,8 +67,43 @@ class Relations(BaseModel):
         return [event for event in self.events if isinstance(event, BusinessEvent)]
 
 
+class RelationsPrediction(BaseModel):
+    """
+    Predictions for a single section.
+    """
+    criterion_requirement: bool = False
+    rule: bool = False
+    evidence: bool = False
+    cost: bool = False
+
+
 class CPSVAPRelationsClassifier(abc.ABC):
 
+    def predict_all(self,
+                    titles: List[str],
+                    paragraphs: List[str] = None) -> List[RelationsPrediction]:
+        """
+        Predicts all the relations for multiple sections at once.
+
+        Override this method for classifiers that can do batch predictions.
+
+        Args:
+            titles: The headers, titles or subtitles of all the sections.
+            paragraphs: (Optional) The corresponding paragraphs.
+
+        Returns:
+            The predictions, in the same order as the titles.
+        """
+
+        if paragraphs is None:
+            paragraphs = [None] * len(titles)
+
+        return [RelationsPrediction(criterion_requirement=self.predict_criterion_requirement(title, paragraph),
+                                    rule=self.predict_rule(title, paragraph),
+                                    evidence=self.predict_evidence(title, paragraph),
+                                    cost=self.predict_cost(title, paragraph))
+                for title, paragraph in zip(titles, paragraphs)]
+
     @abc.abstractmethod
     def predict_criterion_requirement(self,
                                       title: str = None,
@@ -144,42 +184,93 @@ class CPSVAPRelationsClassifier(abc.ABC):
 class RegexCPSVAPRelationsClassifier(CPSVAPRelationsClassifier):
     """
     Classify the headers based on Regular Expressions.
+
+    The patterns of all relations are combined in a single regular expression, such that each title is matched once.
+    Patterns that are not given are taken from the municipality in regex_classifiers.yml, if any.
     """
 
+    # Name of the municipality in regex_classifiers.yml
+    municipality: Optional[str] = None
+
     def __init__(self,
-                 pattern_criterion_requirement: str,
-                 pattern_rule: str,
-                 pattern_evidence: str,
-                 pattern_cost: str,
+                 pattern_criterion_requirement: str = None,
+                 pattern_rule: str = None,
+                 pattern_evidence: str = None,
+                 pattern_cost: str = None,
                  *args,
+                 municipality: str = None,
                  **kwargs):
         super(RegexCPSVAPRelationsClassifier, self).__init__(*args,
                                                              **kwargs)
 
-        self.pattern_criterion_requirement = pattern_criterion_requirement
-        self.pattern_rule = pattern_rule
-        self.pattern_evidence = pattern_evidence
-        self.pattern_cost = pattern_cost
+        if municipality is not None:
+            self.municipality = municipality
+
+        patterns_default = RegexClassifierModel(name="").get_patterns()
+        if self.municipality is not None:
+            regex_classifier = get_regex_classifiers().get(self.municipality)
+            if regex_classifier is None:
+                raise KeyError(f"Could not find {self.municipality} in {FILENAME_REGEX_CLASSIFIERS}")
+
+            patterns_default = regex_classifier.get_patterns()
+
+        patterns = {"criterion_requirement": pattern_criterion_requirement,
+                    "rule": pattern_rule,
+                    "evidence": pattern_evidence,
+                    "cost": pattern_cost}
+        patterns = {label: patterns_default[label] if pattern is None else pattern
+                    for label, pattern in patterns.items()}
+
+        self.pattern_criterion_requirement = patterns["criterion_requirement"]
+        self.pattern_rule = patterns["rule"]
+        self.pattern_evidence = patterns["evidence"]
+        self.pattern_cost = patterns["cost"]
+
+        self._pattern = compile_relations_pattern(patterns, municipality=self.municipality)
+
+    @classmethod
+    def from_url(cls, url: str) -> Optional["RegexCPSVAPRelationsClassifier"]:
+        """
+        The classifier of the municipality whose domain (see regex_classifiers.yml) is the hostname of the URL
+        (or a parent domain of it), if any.
+        """
+
+        regex_classifier = get_regex_classifiers().get_by_url(url)
+        if regex_classifier is None:
+            return None
+
+        return cls(municipality=regex_classifier.name)
+
+    def predict_all(self,
+                    titles: List[str],
+                    paragraphs: List[str] = None) -> List[RelationsPrediction]:
+        return [self._predict(title) for title in titles]
+
+    def _predict(self, title: str) -> RelationsPrediction:
+        # Always matches, the group of a relation is None if its pattern doesn't match.
+        match = self._pattern.match(title)
+
+        return RelationsPrediction(**{label: group is not None for label, group in match.groupdict().items()})
 
     def predict_criterion_requirement(self,
                                       title: str = None,
                                       paragraph: str = None):
-        return bool(re.match(self.pattern_criterion_requirement, title, re.IGNORECASE))
+        return self._predict(title).criterion_requirement
 
     def predict_rule(self,
                      title: str = None,
                      paragraph: str = None):
-        return bool(re.match(self.pattern_rule, title, re.IGNORECASE))
+        return self._predict(title).rule
 
     def predict_evidence(self,
                          title: str = None,
                          paragraph: str = None):
-        return bool(re.match(self.pattern_evidence, title, re.IGNORECASE))
+        return self._predict(title).evidence
 
     def predict_cost(self,
                      title: str = None,
                      paragraph: str = None):
-        return bool(re.match(self.pattern_cost, title, re.IGNORECASE))
+        return self._predict(title).cost
 
 
 class CityParser(abc.ABC):
@@ -219,24 +310,73 @@ class CityParser(abc.ABC):
         """
         pass
 
+    def get_parsed_page(self,
+                        s_html: str,
+                        include_sub: bool = True) -> ParsedPage:
+        """
+        Parse the page only once: the result is kept (per content hash) until evicted with evict_parsed_page.
+
+        Args:
+            s_html: HTML as string
+            include_sub (bool): see parse_page
+
+        Returns:
+            The parsed page.
+        """
+
+        key = (get_page_key(s_html), include_sub)
+
+        parsed_page = self.parsed_page_cache.get(key)
+        if parsed_page is None:
+            parsed_page = self._make_parsed_page(s_html, include_sub=include_sub)
+            self.parsed_page_cache.put(key, parsed_page)
+
+        return parsed_page
+
+    def evict_parsed_page(self, page: Union[str, ParsedPage]) -> None:
+        """
+        Remove a page from the parsed pages.
+
+        Args:
+            page: HTML as string or the parsed page.
+        """
+
+        page_key = page.key if isinstance(page, ParsedPage) else get_page_key(page)
+        self.parsed_page_cache.evict(page_key)
+
+    @property
+    def parsed_page_cache(self) -> ParsedPageCache:
+        # Created on first use, as not every subclass calls __init__.
+        if getattr(self, "_parsed_page_cache", None) is None:
+            self._parsed_page_cache = ParsedPageCache()
+        return self._parsed_page_cache
+
+    def _make_parsed_page(self,
+                          s_html: str,
+                          include_sub: bool = True) -> ParsedPage:
+        return ParsedPage(key=get_page_key(s_html),
+                          sections=self.parse_page(s_html, include_sub=include_sub),
+                          html=s_html)
+
     def _paragraph_generator(self,
                              s_html,
-                             include_sub: bool = True
+                             include_sub: bool = True,
+                             parsed_page: ParsedPage = None
                              ) -> Generator[Tuple[str, str], None, None]:
         """
         Generates the header-paragraph pairs out of the HTML.
 
         Args:
             s_html: HTML of page as string.
+            parsed_page: (Optional) the already parsed page.
 
         Returns:
             generates (title, paragraph) pairs.
         """
-        for section in self.parse_page(s_html, include_sub=include_sub):
-            title = section.title
-            paragraphs_clean = section.paragraphs_text()
+        if parsed_page is None:
+            parsed_page = self.get_parsed_page(s_html, include_sub=include_sub)
 
-            yield title, paragraphs_clean
+        yield from parsed_page.get_title_paragraphs()
 
 
 class ClassifierCityParser(CityParser):
@@ -244,6 +384,12 @@ class ClassifierCityParser(CityParser):
     Originally AalterParser
     """
 
+    # Extract the sections with lxml in a single pass (see LxmlSectionExtractor) instead of BeautifulSoup.
+    # Verified to give the same sections on tests/relation_extraction/EXAMPLE_FILES (see test_section_extractor),
+    # but lxml can repair broken HTML differently: set to False to fall back to BeautifulSoup.
+    # Subclasses that override _filter_header should override _filter_header_lxml as well.
+    use_lxml = True
+
     def __init__(self, classifier: CPSVAPRelationsClassifier, *args, **kwargs):
         """
         """
@@ -253,20 +399,79 @@ class ClassifierCityParser(CityParser):
 
     def parse_page(self,
                    s_html,
-                   include_sub: bool = True
+                   include_sub: bool = True,
+                   soup: BeautifulSoup = None
                    ) -> List[Section]:
         """
         With HeaderHTMLParser
+
+        Args:
+            s_html: HTML as string
+            include_sub: Flag whether to include subsections as well.
+            soup: (Optional) the already parsed page, to reuse.
         """
-        soup = BeautifulSoup(s_html, 'html.parser')
+
+        l = [[]]
+
+        for text_header, l_par in self._get_header_paragraphs(s_html, include_sub=include_sub, soup=soup):
+            l.append([text_header] + l_par)
+
+        # Filter empty lines:
+        l = [[s for s in l_sub if s] for l_sub in l]
+        # Filter empty subs:
+        l = [l_sub for l_sub in l if len(l_sub)]
+
+        # Convert to sections
+        l = [Section(l_sub[0], l_sub[1:]) for l_sub in l]
+
+        return l
+
+    def _make_parsed_page(self,
+                          s_html: str,
+                          include_sub: bool = True) -> ParsedPage:
+        # The soup is kept with the parsed page, such that the other consumers of the page don't parse it again.
+        parsed_page = ParsedPage(key=get_page_key(s_html),
+                                 sections=[],
+                                 html=s_html)
+        parsed_page.sections = self.parse_page(s_html,
+                                               include_sub=include_sub,
+                                               soup=None if self.use_lxml else parsed_page.soup)
+        return parsed_page
+
+    def _get_header_paragraphs(self,
+                               s_html,
+                               include_sub: bool = True,
+                               soup: BeautifulSoup = None
+                               ) -> List[Tuple[str, List[str]]]:
+        """
+        For each header of the procedure, the header text and the text of its following siblings.
+
+        Args:
+            s_html: HTML as string
+            include_sub: Flag whether to include subsections as well.
+            soup: (Optional) the already parsed page, to reuse.
+
+        Returns:
+            List of (header text, paragraphs)
+        """
+
+        if self.use_lxml:
+            extractor = LxmlSectionExtractor(s_html, filter_header=self._filter_header_lxml)
+            return extractor.get_header_paragraphs(include_sub=include_sub)
+
+        if soup is None:
+            soup = BeautifulSoup(s_html, 'html.parser')
 
         # Find the Title
         h_title = soup.find_all('h1')[-1]
-        page_procedure = self._get_page_procedure(h_title)
 
-        l = [[]]
+        # Headers of the whole page, found only once.
+        header_index = HeaderIndex(soup, get_all_headers=self._get_all_headers)
+        page_procedure = self._get_page_procedure(h_title, header_index=header_index)
+
+        l = []
 
-        l_headers = self._get_all_headers(page_procedure)
+        l_headers = header_index.get_headers(page_procedure)
         for header in l_headers:
 
             l_par = []
@@ -274,7 +479,6 @@ class ClassifierCityParser(CityParser):
             # Header text
             text_header = header.get_text(separator=" ", strip=True)
             text_header = clean_text(text_header, remove_newlines=True)
-            l_par.append(text_header)
 
             # All following text.
             for sib in header.find_next_siblings():
@@ -289,7 +493,7 @@ class ClassifierCityParser(CityParser):
 
                         l_par.append(f"* {text_li}")
 
-                if sib in l_headers:
+                if sib in header_index:
                     # Only return if sib header is of same depth or higher
                     if not include_sub:
                         # No need to check.
@@ -315,15 +519,7 @@ class ClassifierCityParser(CityParser):
                     # Else
                     l_par.append(text)
 
-            l.append(l_par)
-
-        # Filter empty lines:
-        l = [[s for s in l_sub if s] for l_sub in l]
-        # Filter empty subs:
-        l = [l_sub for l_sub in l if len(l_sub)]
-
-        # Convert to sections
-        l = [Section(l_sub[0], l_sub[1:]) for l_sub in l]
+            l.append((text_header, l_par))
 
         return l
 
@@ -341,30 +537,39 @@ class ClassifierCityParser(CityParser):
 
         d = Relations()
 
-        n = len(list(self._paragraph_generator(s_html, include_sub=include_sub)))
+        # Parse the page only once. The parsed page is kept for the other consumers of the page:
+        # the caller evicts it when the whole extraction is done (see RelationExtractor2.extract_all).
+        parsed_page = self.get_parsed_page(s_html, include_sub=include_sub)
+        l_title_paragraph = list(self._paragraph_generator(s_html, parsed_page=parsed_page))
 
-        for i, (title, paragraph) in enumerate(self._paragraph_generator(s_html, include_sub=include_sub)):
-            if verbose:
-                print(f"Classifying section for relations {i + 1}/{n}")
+        if verbose:
+            print(f"Classifying {len(l_title_paragraph)} sections for relations")
 
+        titles = [title for title, _ in l_title_paragraph]
+        paragraphs = [paragraph for _, paragraph in l_title_paragraph]
+
+        predictions = self.classifier.predict_all(titles, paragraphs)
+
+        for title, paragraph, prediction in zip(titles, paragraphs, predictions):
             info = Info(name=title,
                         description=paragraph)
 
-            if self.classifier.predict_criterion_requirement(title, paragraph):
+            if prediction.criterion_requirement:
                 d.add_criterion_requirement(info)
 
-            if self.classifier.predict_rule(title, paragraph):
+            if prediction.rule:
                 d.add_rule(info)
 
-            if self.classifier.predict_evidence(title, paragraph):
+            if prediction.evidence:
                 d.add_evidence(info)
 
-            if self.classifier.predict_cost(title, paragraph):
+            if prediction.cost:
                 d.add_cost(info)
 
         return d
 
-    def _get_page_procedure(self, page_procedure_child, n_headers_min=2, n_headers_max=None):
+    def _get_page_procedure(self, page_procedure_child, n_headers_min=2, n_headers_max=None,
+                            header_index: HeaderIndex = None):
         """
          Start from single element and go up untill multiple headers are returned.
 
@@ -372,30 +577,15 @@ class ClassifierCityParser(CityParser):
             page_procedure_child:
             n_headers_min: Minimum number of headers to retrieve before returning
             n_headers_max: Maximum number of headers to retrieve before returning
+            header_index: (Optional) headers of the document, to reuse.
 
          """
 
-        if n_headers_max is None:
-            soup = page_procedure_child.find_parents()[-1]
-            n_headers_max = len(self._get_all_headers(soup))
-
-        page_procedure = page_procedure_child.parent
-
-        # Check that we can find other headers.
-        headers = self._get_all_headers(page_procedure)
-
-        n_headers = len(headers)
-        if n_headers >= n_headers_min:
-            return page_procedure
-
-        elif n_headers >= n_headers_max:
-            # Max number found
-            return page_procedure
-
-        # recursively go up
-        return self._get_page_procedure(page_procedure,
-                                        n_headers_min=n_headers_min,
-                                        n_headers_max=n_headers_max)
+        return get_page_procedure(page_procedure_child,
+                                  n_headers_min=n_headers_min,
+                                  n_headers_max=n_headers_max,
+                                  get_all_headers=self._get_all_headers,
+                                  header_index=header_index)
 
     def _get_all_headers(self, soup: Union[BeautifulSoup, Tag]) -> List[Tag]:
         return soup.find_all(self._filter_header)
@@ -405,3 +595,19 @@ class ClassifierCityParser(CityParser):
             return True
 
         return False
+
+    def _filter_header_lxml(self, el: lxml.html.HtmlElement) -> bool:
+        """
+        Same as _filter_header, for the lxml fast path (see use_lxml).
+        """
+        return is_header(el)
+
+
+class RegexCityParser(ClassifierCityParser):
+    """
+    Parser for the municipalities that are only defined in regex_classifiers.yml,
+    without a parser of their own (see RegexCPSVAPRelationsClassifier.from_url).
+    """
+
+    def __init__(self, classifier: RegexCPSVAPRelationsClassifier):
+        super(RegexCityParser, self).__init__(classifier=classifier)
@@ -2,21 +2,23 @@ import json
 import os
 import re
 import warnings
-from functools import lru_cache
 from typing import List
 
 import pandas as pd
 from nltk.tokenize import sent_tokenize
 
+from BERT_classifier.app.models import Results
 from connectors.bert_classifier import BERTConnector
 from connectors.translation import ETranslationConnector
 from data.html import get_html
 from relation_extraction.aalter import AalterParser
 from relation_extraction.austrheim import AustrheimParser
-from relation_extraction.cities import ClassifierCityParser, CPSVAPRelationsClassifier
+from relation_extraction.cities import ClassifierCityParser, CPSVAPRelationsClassifier, RelationsPrediction
 from relation_extraction.html_parsing.data import ParserModel
 from relation_extraction.html_parsing.general_parser import GeneralHTMLParser, GeneralSection
 from relation_extraction.nova_gorica import NovaGoricaParser
+from relation_extraction.parsed_page import get_page_key, ParsedPage
+from relation_extraction.prediction_cache import get_prediction_cache, PredictionCache
 from relation_extraction.san_paolo import SanPaoloParser
 from relation_extraction.wien import WienParser
 from relation_extraction.zagreb import ZagrebParser
@@ -26,6 +28,7 @@ url2filename = lambda page: os.path.join(DIR_EXAMPLE_FILES, re.sub(r'\W+', '_',
 
 CEF_LOGIN = os.environ.get("CEF_LOGIN")
 CEF_PASSW = os.environ.get("CEF_PASSW")
+BERT_MODEL_VERSION = os.environ.get("BERT_MODEL_VERSION")
 
 SEP = '⚫'
 EN = "EN"
@@ -284,7 +287,18 @@ class GeneralClassifier(CPSVAPRelationsClassifier):
     EVIDENCE = "evidence"
     CRITERION_REQUIREMENT = "criterion_requirement"
 
-    def __init__(self, lang: str, target=EN):
+    def __init__(self, lang: str, target=EN,
+                 prediction_cache: PredictionCache = None,
+                 model_version: str = None):
+        """
+
+        Args:
+            lang: language of the source files.
+            target: language of the classifier.
+            prediction_cache: Cache of the predictions. Defaults to the cache shared by all classifiers.
+            model_version: Identifies the model, to not reuse cached predictions of another model.
+                Defaults to BERT_MODEL_VERSION in env, else the URL of the classifier API.
+        """
         super(GeneralClassifier, self).__init__()
 
         self.bert_connector = BERTConnector()
@@ -295,6 +309,9 @@ class GeneralClassifier(CPSVAPRelationsClassifier):
         self.target = target
         self.pretranslated_source_target: dict = {}
 
+        self.prediction_cache = prediction_cache if prediction_cache is not None else get_prediction_cache()
+        self._model_version = model_version
+
     def predict_criterion_requirement(self, title: str = None, paragraph: str = None) -> bool:
         """
         Get general classification, then use CACHE to save result temporarily.
@@ -317,6 +334,65 @@ class GeneralClassifier(CPSVAPRelationsClassifier):
     def predict_cost(self, title: str = None, paragraph: str = None) -> bool:
         return self._shared_predict(title, paragraph, self.COST)
 
+    def predict_all(self,
+                    titles: List[str],
+                    paragraphs: List[str] = None) -> List[RelationsPrediction]:
+        """
+        Classify all titles with a single request.
+
+        Args:
+            titles: The titles of all the sections of a page.
+            paragraphs: Not used (yet).
+
+        Returns:
+            The predictions, in the same order as the titles.
+        """
+
+        l_title_unique = list(dict.fromkeys(titles))
+
+        if not l_title_unique:
+            return []
+
+        d_results = self.prediction_cache.get_many(l_title_unique, self.lang, self.model_version)
+
+        # Only classify the titles that weren't classified before.
+        l_title_miss = [title for title in l_title_unique if title not in d_results]
+
+        if l_title_miss:
+            if self.lang.upper() != self.target.upper():
+                self.pretranslate(l_title_miss)
+
+            l_title_target = [self._get_text_target(title, self.lang, self.target) for title in l_title_miss]
+
+            results_lines = self.bert_connector.post_classify_text_lines(l_title_target)
+
+            d_results_miss = {title: Results(names=results_lines.names,
+                                             probabilities=probabilities)
+                              for title, probabilities in zip(l_title_miss, results_lines.probabilities)}
+
+            self.prediction_cache.set_many(d_results_miss, self.lang, self.model_version)
+            d_results.update(d_results_miss)
+
+        d_prediction = {}
+        for title, results in d_results.items():
+            d_prob = dict(zip(results.names, results.probabilities))
+
+            d_prediction[title] = RelationsPrediction(
+                criterion_requirement=bool(round(d_prob[self.CRITERION_REQUIREMENT])),
+                rule=bool(round(d_prob[self.RULE])),
+                evidence=bool(round(d_prob[self.EVIDENCE])),
+                cost=bool(round(d_prob[self.COST])),
+            )
+
+        return [d_prediction[title] for title in titles]
+
+    @property
+    def model_version(self) -> str:
+        if self._model_version is not None:
+            return self._model_version
+
+        return BERT_MODEL_VERSION or self.bert_connector.url
+
     def _shared_predict(self, title: str, paragraph: str, key: str):
         """
 
@@ -338,10 +414,10 @@ class GeneralClassifier(CPSVAPRelationsClassifier):
 
         return bool(round(prob))
 
-    @lru_cache(maxsize=1)
-    def _get_results_cache(self, text: str, lang):
+    def _get_results_cache(self, text: str, lang) -> Results:
         """
-        Use cache for retrieving results as we will call it multiple times in a row with the same value.
+        Use the prediction cache, as we will call it multiple times in a row with the same value,
+        and the same titles are found on many pages.
 
         Args:
             text:
@@ -350,12 +426,17 @@ class GeneralClassifier(CPSVAPRelationsClassifier):
 
         """
 
+        results = self.prediction_cache.get(text, lang, self.model_version)
+        if results is not None:
+            return results
+
         text_EN = self._get_text_target(text, lang, self.target)
 
         results = self.bert_connector.post_classify_text(text_EN)
+
+        self.prediction_cache.set(text, lang, self.model_version, results)
         return results
 
-    @lru_cache(maxsize=20)
     def _get_text_target(self, text, lang, target):
 
         if lang.upper() == target:
@@ -415,28 +496,16 @@ class GeneralCityParser(ClassifierCityParser):
 
         self._filename_html_parsing = filename_html_parsing
 
-    def extract_relations(self, s_html, *args, include_sub=True, **kwargs):
-        """
-        To speed up things, we should pre-translate things
-        Args:
-            *args:
-            **kwargs:
-
-        Returns:
-
-        """
-
-        l_titles = [title for title, _ in self._paragraph_generator(s_html, include_sub=include_sub)]
-        self.classifier.pretranslate(l_titles)
-
-        return super(GeneralCityParser, self).extract_relations(s_html, *args, **kwargs)
-
-    # Is slow, so trying to use with cache
-    @lru_cache(maxsize=1)
     def parse_page(self,
                    s_html,
                    include_sub: bool = True,
                    ) -> List[GeneralSection]:
+        # Is slow, so only parsed once per page, see get_parsed_page.
+        return self.get_parsed_page(s_html, include_sub=include_sub).sections
+
+    def _make_parsed_page(self,
+                          s_html: str,
+                          include_sub: bool = True) -> ParsedPage:
         justext_wrapper_class = self.parser_model.get_justext_wrapper_class()
         html_parser = GeneralHTMLParser(s_html,
                                         language=self.lang_code,
@@ -452,4 +521,8 @@ class GeneralCityParser(ClassifierCityParser):
 
         sections = html_parser.get_sections()
 
-        return sections
+        return ParsedPage(key=get_page_key(s_html),
+                          sections=sections,
+                          dom=html_parser.dom,
+                          paragraphs=html_parser.get_paragraphs(),
+                          html=s_html)
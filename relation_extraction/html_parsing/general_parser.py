@@ -84,7 +84,7 @@ class GeneralHTMLParser:
 
     @property
     def dom(self):
-        return self._justext_wrapper.get_dom_clean()
+        return self._justext_wrapper.dom
 
     def get_lxml_element_from_paragraph(self, paragraph: GeneralParagraph):
 
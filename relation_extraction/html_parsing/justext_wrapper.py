@@ -1,12 +1,24 @@
 import copy
-from typing import FrozenSet, Iterator, List, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterator, List, Tuple
 
 import justext
 import lxml.html
 from justext.core import classify_paragraphs, ParagraphMaker, revise_paragraph_classification
 
+from BERT_classifier.app.models import Labels, Results
 from connectors.bert_classifier import BERTConnector
 from relation_extraction.html_parsing.utils import _get_language_full_from_code, clean_tag_text, dom_write
+from relation_extraction.prediction_cache import get_prediction_cache, PredictionCache
+
+# Title classifier API, maximum number of texts per request and maximum number of concurrent requests.
+TITLE_CLASSIFIER_URL = os.environ.get("TITLE_CLASSIFIER_URL", "http://title_classifier:5000")
+TITLE_CLASSIFIER_CHUNK_SIZE = int(os.environ.get("TITLE_CLASSIFIER_CHUNK_SIZE", 256))
+TITLE_CLASSIFIER_MAX_WORKERS = int(os.environ.get("TITLE_CLASSIFIER_MAX_WORKERS", 4))
+
+LABEL_TITLE = "title"
 
 
 class GeneralParagraph(justext.core.Paragraph):
@@ -21,6 +33,8 @@ class GeneralParagraph(justext.core.Paragraph):
         """
         Our adjustment of the justext Paragraph
 
+        (!) Converted in place, without copying: the paragraph itself is returned as a GeneralParagraph.
+
         Args:
             paragraph:
 
@@ -28,16 +42,10 @@ class GeneralParagraph(justext.core.Paragraph):
 
         """
 
-        class Object(object):
-            pass
+        if not isinstance(paragraph, cls):
+            paragraph.__class__ = cls
 
-        path = Object()
-        path.dom = None
-        path.xpath = None
-        self = cls(path)  # Emtpy init
-        self.__dict__ = copy.deepcopy(paragraph.__dict__)
-
-        return self
+        return paragraph
 
     def __repr__(self):
         class_name = self.__class__.__module__ + "." + self.__class__.__name__
@@ -76,6 +84,7 @@ class JustextWrapper:
         """
 
         self._html_text = html_text
+        self._dom = None
 
         paragraphs = self._make_paragraphs()
 
@@ -89,7 +98,27 @@ class JustextWrapper:
     def paragraphs(self) -> List[GeneralParagraph]:
         return self._paragraphs
 
+    @property
+    def dom(self) -> lxml.html.HtmlElement:
+        """
+        The cleaned DOM, only built once and shared. Use *clone_dom* to get a DOM that can be modified.
+        """
+
+        if self._dom is None:
+            self._dom = self.get_dom_clean()
+
+        return self._dom
+
+    def clone_dom(self) -> lxml.html.HtmlElement:
+        """
+        Copy of the cleaned DOM, that can be modified without affecting *dom*.
+        """
+        return copy.deepcopy(self.dom)
+
     def get_dom_clean(self, *args, **kwargs) -> lxml.html.HtmlElement:
+        """
+        (!) Parses the HTML again. You probably want to use *dom* or *clone_dom* instead.
+        """
 
         dom = self._html_to_dom(self._html_text, *args, **kwargs)
         dom = self._preprocessor(dom)
@@ -99,7 +128,7 @@ class JustextWrapper:
     def _make_paragraphs(self) -> List[GeneralParagraph]:
         """Init of the paragraphs"""
 
-        paragraphs = ParagraphMaker.make_paragraphs(self.get_dom_clean())
+        paragraphs = ParagraphMaker.make_paragraphs(self.dom)
 
         # (!) New
         paragraphs = list(map(GeneralParagraph.from_justext_paragraph, paragraphs))
@@ -107,7 +136,7 @@ class JustextWrapper:
         return paragraphs
 
     def _html_to_dom(self, html_text, *args, **kwargs):
-        """(!) Without preprocessing. You probably want to use *get_dom_clean* instead."""
+        """(!) Without preprocessing. You probably want to use *dom* instead."""
         return justext.core.html_to_dom(html_text, *args, **kwargs)
 
     def _preprocessor(self, dom):
@@ -120,7 +149,7 @@ class JustextWrapper:
         if paragraphs is None:
             paragraphs = self.paragraphs
         if dom is None:
-            dom = self.get_dom_clean()
+            dom = self.dom
 
         for paragraph in paragraphs:
             el = self._get_element_from_paragraph(paragraph,
@@ -133,7 +162,7 @@ class JustextWrapper:
                                     dom=None):
 
         if dom is None:
-            dom = self.get_dom_clean()
+            dom = self.dom
 
         l_e = dom.xpath(paragraph.xpath)
         if len(l_e) != 1:
@@ -152,7 +181,8 @@ class JustextWrapper:
         Do same processing, but save as HTML with important annotations.
         """
 
-        dom_debug = self.get_dom_clean()
+        # Styling is added to a copy.
+        dom_debug = self.clone_dom()
 
         for paragraph, el in self.iterator_paragraph_element(dom=dom_debug):
 
@@ -210,7 +240,7 @@ class BoldJustextWrapper(JustextWrapper):
 
         """
 
-        dom = self.get_dom_clean()
+        dom = self.dom
 
         paragraphs = super(BoldJustextWrapper, self)._make_paragraphs()
 
@@ -231,7 +261,7 @@ class BoldJustextWrapper(JustextWrapper):
             paragraphs = self.paragraphs
 
         if dom is None:
-            dom = self.get_dom_clean()
+            dom = self.dom
 
         for paragraph in paragraphs:
             el = self._get_element_from_paragraph(paragraph,
@@ -250,16 +280,31 @@ class BoldJustextWrapper(JustextWrapper):
         return paragraphs
 
 
+@lru_cache(maxsize=None)
+def get_title_classifier_labels(url: str = TITLE_CLASSIFIER_URL) -> Labels:
+    """
+    Labels of the title classifier, only requested once per process.
+    """
+    return BERTConnector(url=url).get_labels()
+
+
 class TitleClassificationJustextWrapper(JustextWrapper):
     """
     Headers will be detected with a text classifier.
+
+    Predictions are cached (see PredictionCache), as the same boilerplate is found on every page of a website.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args,
+                 title_classifier_url: str = TITLE_CLASSIFIER_URL,
+                 prediction_cache: PredictionCache = None,
+                 **kwargs):
         # Initialise classifier model
-        self._title_classifier_connector = BERTConnector(url="http://title_classifier:5000")
-        labels = self._title_classifier_connector.get_labels()
-        self._i_label_title = labels.names.index("title")
+        self._title_classifier_connector = BERTConnector(url=title_classifier_url)
+        labels = get_title_classifier_labels(title_classifier_url)
+        self._i_label_title = labels.names.index(LABEL_TITLE)
+
+        self._prediction_cache = prediction_cache if prediction_cache is not None else get_prediction_cache()
 
         super(TitleClassificationJustextWrapper, self).__init__(*args, **kwargs)
 
@@ -278,7 +323,7 @@ class TitleClassificationJustextWrapper(JustextWrapper):
 
         """
 
-        dom = self.get_dom_clean()
+        dom = self.dom
         paragraphs = super(TitleClassificationJustextWrapper, self)._make_paragraphs()
 
         # One at a time
@@ -322,8 +367,7 @@ class TitleClassificationJustextWrapper(JustextWrapper):
                         threshold: float = .5,  # Optional, to possibly play with later.
                         ) -> bool:
 
-        result = self._title_classifier_connector.post_classify_text(paragraph.text)
-        p_title = result.probabilities[self._i_label_title]
+        p_title, = self._get_p_title([paragraph.text])
 
         return p_title >= threshold
 
@@ -335,13 +379,65 @@ class TitleClassificationJustextWrapper(JustextWrapper):
 
         text_lines = [par.text for par in l_paragraph]
 
-        results = self._title_classifier_connector.post_classify_text_lines(text_lines)
-        l_p_title = [l_p_i[self._i_label_title] for l_p_i in results.probabilities]
+        l_p_title = self._get_p_title(text_lines)
 
         l_b_title = [p >= threshold for p in l_p_title]
 
         return l_b_title
 
+    def _get_p_title(self, text_lines: List[str]) -> List[float]:
+        """
+        Get the probability of being a title, from the cache or else from the title classifier.
+
+        Args:
+            text_lines: texts of the paragraphs.
+
+        Returns:
+            List with the probability of each text.
+        """
+
+        model = self._title_classifier_connector.url
+
+        d_results = self._prediction_cache.get_many(text_lines, None, model)
+
+        # Unique texts that weren't classified before.
+        l_text_miss = [text for text in dict.fromkeys(text_lines) if text not in d_results]
+
+        if l_text_miss:
+            d_results_miss = self._classify_text_lines(l_text_miss)
+
+            self._prediction_cache.set_many(d_results_miss, None, model)
+            d_results.update(d_results_miss)
+
+        return [d_results[text].probabilities[self._i_label_title] for text in text_lines]
+
+    def _classify_text_lines(self, text_lines: List[str],
+                             chunk_size: int = TITLE_CLASSIFIER_CHUNK_SIZE,
+                             max_workers: int = TITLE_CLASSIFIER_MAX_WORKERS) -> Dict[str, Results]:
+        """
+        Classify the texts in chunks of at most chunk_size texts, with at most max_workers concurrent requests.
+
+        Returns:
+            Dictionary text -> results
+        """
+
+        l_chunk = [text_lines[i:i + chunk_size] for i in range(0, len(text_lines), chunk_size)]
+
+        if len(l_chunk) == 1:
+            l_results_lines = [self._title_classifier_connector.post_classify_text_lines(l_chunk[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(l_chunk))) as executor:
+                l_results_lines = list(executor.map(self._title_classifier_connector.post_classify_text_lines,
+                                                    l_chunk))
+
+        d_results = {}
+        for chunk, results_lines in zip(l_chunk, l_results_lines):
+            for text, probabilities in zip(chunk, results_lines.probabilities):
+                d_results[text] = Results(names=results_lines.names,
+                                          probabilities=probabilities)
+
+        return d_results
+
 
 def get_stoplist(language_or_language_code) -> FrozenSet[str]:
     """
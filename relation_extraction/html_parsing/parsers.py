@@ -3,9 +3,11 @@ import re
 import warnings
 from typing import List, Union
 
+import lxml.html
 from bs4 import BeautifulSoup, Tag
 
-from relation_extraction.utils import clean_text
+from relation_extraction.html_parsing.section_extractor import is_header, LxmlSectionExtractor
+from relation_extraction.utils import clean_text, get_page_procedure, HeaderIndex
 
 
 class Section(list):
@@ -95,6 +97,9 @@ def deprecated_metaclass(message):
 
 
 class HeaderHTMLParser(HTMLParser):
+    # Extract the sections with lxml in a single pass (see LxmlSectionExtractor) instead of BeautifulSoup.
+    # Same as ClassifierCityParser.use_lxml: set to False to fall back to BeautifulSoup.
+    use_lxml = True
 
     def __init__(self, *args, **kwargs):
         warnings.warn("Use GeneralParser instead", DeprecationWarning)
@@ -104,15 +109,21 @@ class HeaderHTMLParser(HTMLParser):
                      include_sub=False) -> List[Section]:
         """"""
 
+        if self.use_lxml:
+            return self._get_sections_lxml(include_sub=include_sub)
+
         soup = BeautifulSoup(self.html, 'html.parser')
 
         # Find the Title
         h_title = soup.find_all('h1')[-1]
-        page_procedure = self._get_page_procedure(h_title)
+
+        # Headers of the whole page, found only once.
+        header_index = HeaderIndex(soup, get_all_headers=self._get_all_headers)
+        page_procedure = self._get_page_procedure(h_title, header_index=header_index)
 
         l_sections = []
 
-        l_headers = self._get_all_headers(page_procedure)
+        l_headers = header_index.get_headers(page_procedure)
         for header in l_headers:
 
             # Header text
@@ -134,7 +145,7 @@ class HeaderHTMLParser(HTMLParser):
 
                         l_par.append(f"* {text_li}")
 
-                if sib in l_headers:
+                if sib in header_index:
                     # Only return if sib header is of same depth or higher
                     if not include_sub:
                         # No need to check.
@@ -171,7 +182,27 @@ class HeaderHTMLParser(HTMLParser):
 
         return l_sections
 
-    def _get_page_procedure(self, page_procedure_child, n_headers_min=2, n_headers_max=None):
+    def _get_sections_lxml(self,
+                           include_sub=False) -> List[Section]:
+        """
+        Same as get_sections, with LxmlSectionExtractor.
+        """
+
+        extractor = LxmlSectionExtractor(self.html, filter_header=self._filter_header_lxml)
+
+        l_sections = []
+        for text_header, l_par in extractor.get_header_paragraphs(include_sub=include_sub):
+            # Filter empty sentences
+            l_par = [s for s in l_par if s]
+
+            if text_header or len(l_par):
+                l_sections.append(Section(title=text_header,
+                                          paragraphs=l_par))
+
+        return l_sections
+
+    def _get_page_procedure(self, page_procedure_child, n_headers_min=2, n_headers_max=None,
+                            header_index: HeaderIndex = None):
         """
          Start from single element and go up untill multiple headers are returned.
 
@@ -179,30 +210,15 @@ class HeaderHTMLParser(HTMLParser):
             page_procedure_child:
             n_headers_min: Minimum number of headers to retrieve before returning
             n_headers_max: Maximum number of headers to retrieve before returning
+            header_index: (Optional) headers of the document, to reuse.
 
          """
 
-        if n_headers_max is None:
-            soup = page_procedure_child.find_parents()[-1]
-            n_headers_max = len(self._get_all_headers(soup))
-
-        page_procedure = page_procedure_child.parent
-
-        # Check that we can find other headers.
-        headers = self._get_all_headers(page_procedure)
-
-        n_headers = len(headers)
-        if n_headers >= n_headers_min:
-            return page_procedure
-
-        elif n_headers >= n_headers_max:
-            # Max number found
-            return page_procedure
-
-        # recursively go up
-        return self._get_page_procedure(page_procedure,
-                                        n_headers_min=n_headers_min,
-                                        n_headers_max=n_headers_max)
+        return get_page_procedure(page_procedure_child,
+                                  n_headers_min=n_headers_min,
+                                  n_headers_max=n_headers_max,
+                                  get_all_headers=self._get_all_headers,
+                                  header_index=header_index)
 
     def _get_all_headers(self, soup: Union[BeautifulSoup, Tag]) -> List[Tag]:
         return soup.find_all(self._filter_header)
@@ -212,3 +228,9 @@ class HeaderHTMLParser(HTMLParser):
             return True
 
         return False
+
+    def _filter_header_lxml(self, el: lxml.html.HtmlElement) -> bool:
+        """
+        Same as _filter_header, for the lxml fast path (see use_lxml).
+        """
+        return is_header(el)
@@ -0,0 +1,273 @@
+"""
+lxml based equivalent of the BeautifulSoup (html.parser) section extraction of the city parsers.
+
+The document is parsed once by lxml (in C) and the headers are indexed in a single pass over the document,
+instead of searching all headers again for every ancestor and every sibling.
+The siblings of the headers are visited once as well, instead of once per header.
+"""
+
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import lxml.html
+
+from relation_extraction.utils import clean_text
+
+# Strings within these tags are not returned by BeautifulSoup's get_text (Script, Stylesheet, TemplateString...).
+_EXCLUDED_STRING_CONTAINERS = frozenset(["script", "style", "template", "rt", "rp"])
+
+_PATTERN_HEADER = re.compile(r'^h[1-6]$')
+_PATTERN_DEPTH = re.compile(r"h([0-9]+)", re.IGNORECASE)
+
+
+def html_to_lxml(html: str) -> lxml.html.HtmlElement:
+    """
+    Parse HTML with lxml.
+
+    Args:
+        html: HTML as string
+
+    Returns:
+        Root element of the document.
+    """
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings with encoding declaration are not supported.
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+
+
+def is_element(el) -> bool:
+    """
+    False for comments, processing instructions...
+    """
+    return isinstance(el.tag, str)
+
+
+def is_header(el: lxml.html.HtmlElement) -> bool:
+    """
+    Same as ClassifierCityParser._filter_header: <h1/> to <h6/>
+    """
+    return bool(_PATTERN_HEADER.match(el.tag))
+
+
+def get_depth(el: lxml.html.HtmlElement) -> Optional[int]:
+    """
+    Level of a header: 1 for <h1/>, 2 for <h2/>...
+    """
+    match = _PATTERN_DEPTH.match(el.tag)
+    if match:
+        return int(match.groups()[0])
+
+
+def iter_strings(el: lxml.html.HtmlElement) -> Iterator[str]:
+    """
+    The text nodes within an element, in document order, like the strings of BeautifulSoup's get_text.
+
+    Args:
+        el: lxml element.
+
+    Returns:
+        Generator of the strings.
+    """
+
+    if el.text:
+        yield el.text
+
+    # Without recursion, for deeply nested pages. The tail of an element comes after its descendants.
+    stack = [(iter(el), None)]
+    while stack:
+        it, parent = stack[-1]
+        child = next(it, None)
+
+        if child is None:
+            stack.pop()
+            if parent is not None and parent.tail:
+                yield parent.tail
+
+        elif is_element(child) and child.tag not in _EXCLUDED_STRING_CONTAINERS:
+            if child.text:
+                yield child.text
+            stack.append((iter(child), child))
+
+        elif child.tail:
+            yield child.tail
+
+
+def get_text(el: lxml.html.HtmlElement, separator: str = "", strip: bool = False) -> str:
+    """
+    Same as BeautifulSoup's Tag.get_text with strip=True.
+    Without strip, whitespace-only strings are kept as is, while BeautifulSoup reduces them to a newline.
+
+    Args:
+        el: lxml element.
+        separator: Joins the strings.
+        strip: Strip the strings and skip the empty ones.
+
+    Returns:
+        The text of the element.
+    """
+
+    strings = iter_strings(el)
+    if strip:
+        strings = filter(None, map(str.strip, strings))
+
+    return separator.join(strings)
+
+
+class LxmlSectionExtractor:
+    """
+    Sections (header with its paragraphs) of the procedure on a page.
+
+    Gives the same output as ClassifierCityParser.parse_page (and HeaderHTMLParser.get_sections),
+    which search the headers and their following siblings with BeautifulSoup.
+    """
+
+    def __init__(self,
+                 html: str,
+                 filter_header: Callable[[lxml.html.HtmlElement], bool] = is_header):
+        """
+
+        Args:
+            html: HTML as string
+            filter_header: Decides whether an (lxml) element is a header.
+        """
+
+        self.root = html_to_lxml(html)
+        self._filter_header = filter_header
+
+        # All headers in document order. Single pass over the document.
+        self._headers = [el for el in self.root.iter() if is_element(el) and filter_header(el)]
+        self._set_headers = set(self._headers)
+
+    def get_page_procedure(self, n_headers_min=2) -> lxml.html.HtmlElement:
+        """
+        Start from the last <h1/> and go up until multiple headers (or all the headers of the page) are found.
+
+        Args:
+            n_headers_min: Minimum number of headers to retrieve before returning
+
+        Returns:
+            The element that contains the procedure.
+        """
+
+        l_h1 = list(self.root.iter("h1"))
+        h_title = l_h1[-1]  # IndexError if there is no title, like the original.
+
+        # Ancestors of the title, from the title up.
+        l_ancestors = list(h_title.iterancestors())
+        d_i_ancestor = {el: i for i, el in enumerate(l_ancestors)}
+
+        # For each header, the lowest ancestor of the title that contains it.
+        n_headers_ancestor = [0] * len(l_ancestors)
+        for header in self._headers:
+            for el in header.iterancestors():
+                i = d_i_ancestor.get(el)
+                if i is not None:
+                    n_headers_ancestor[i] += 1
+                    break
+
+        n_headers_max = len(self._headers)
+
+        n_headers = 0
+        for el, n in zip(l_ancestors, n_headers_ancestor):
+            n_headers += n
+
+            if n_headers >= n_headers_min or n_headers >= n_headers_max:
+                return el
+
+        # Document root (BeautifulSoup object) contains all headers.
+        return l_ancestors[-1]
+
+    def get_headers(self, page_procedure: lxml.html.HtmlElement = None) -> List[lxml.html.HtmlElement]:
+        """
+        All headers within the page procedure, in document order.
+        """
+        if page_procedure is None:
+            return list(self._headers)
+
+        return [el for el in page_procedure.iterdescendants() if el in self._set_headers]
+
+    def get_header_paragraphs(self, include_sub: bool = True) -> List[Tuple[str, List[str]]]:
+        """
+        For each header of the procedure, the header text and the texts of its following siblings
+        (up till the next header of the same or a higher level).
+
+        Single pass: the children of each parent of a header are visited once,
+        and each visited sibling is added to all the headers that are still collecting (the "open" headers).
+
+        Args:
+            include_sub: Flag whether to include subsections as well.
+
+        Returns:
+            List of (header text, paragraphs). The paragraphs can be empty strings, like the original.
+        """
+
+        page_procedure = self.get_page_procedure()
+        l_headers = self.get_headers(page_procedure)
+
+        # The text of an element is computed once, even if it is part of multiple (sub)sections.
+        d_text: Dict[lxml.html.HtmlElement, str] = {}
+
+        def get_text_clean(el) -> str:
+            text = d_text.get(el)
+            if text is None:
+                text = d_text[el] = clean_text(get_text(el, separator=" ", strip=True), remove_newlines=True)
+            return text
+
+        def is_closed_by(header, sib) -> bool:
+            """
+            Whether a following sibling header ends the section of the header.
+            """
+            if not include_sub:
+                return True
+
+            depth_header = get_depth(header)
+            depth_sib = get_depth(sib)
+            if (depth_header is None) or (depth_sib is None):
+                # No depth information, just break.
+                return True
+
+            # Equal or higher level header.
+            return depth_sib <= depth_header
+
+        d_paragraphs: Dict[lxml.html.HtmlElement, List[str]] = {header: [] for header in l_headers}
+
+        # Parents in order of their first header.
+        l_parents = list(dict.fromkeys(header.getparent() for header in l_headers))
+
+        for parent in l_parents:
+            l_open: List[lxml.html.HtmlElement] = []
+
+            for sib in parent.iterchildren():
+                if not is_element(sib):
+                    continue
+
+                if l_open:
+                    # All following text.
+                    text = get_text_clean(sib)
+                    if sib.tag in ["div", "p", "a"]:
+                        l_text = [text]
+                    elif sib.tag == "li":
+                        l_text = [f"* {text}"]
+                    elif sib.tag == "ul":
+                        l_text = [f"* {get_text_clean(li)}" for li in sib.iterdescendants("li")]
+                    else:
+                        l_text = []
+
+                    for header in l_open:
+                        d_paragraphs[header].extend(l_text)
+
+                    if sib in self._set_headers:
+                        l_open_next = []
+                        for header in l_open:
+                            if not is_closed_by(header, sib):
+                                d_paragraphs[header].append(text)
+                                l_open_next.append(header)
+                        l_open = l_open_next
+
+                if sib in d_paragraphs:
+                    # A header of the procedure starts collecting its following siblings.
+                    l_open.append(sib)
+
+        return [(get_text_clean(header), d_paragraphs[header]) for header in l_headers]
@@ -0,0 +1,200 @@
+"""
+Incremental parsing of (very large) HTML pages: paragraphs and sections are generated while the page is parsed,
+without building the DOM.
+
+The paragraphs are made by Justext's ParagraphMaker, as in JustextWrapper, but fed by the events of an incremental
+lxml parser instead of a DOM.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Union
+
+import lxml.etree
+from justext.core import classify_paragraphs, ParagraphMaker, revise_paragraph_classification
+
+from relation_extraction.html_parsing.general_parser import GeneralSection
+from relation_extraction.html_parsing.justext_wrapper import GeneralParagraph, get_stoplist
+
+# Number of characters fed to the parser at once.
+CHUNK_SIZE = 2 ** 16
+
+# Same as justext.core.preprocessor: these elements are removed with their content...
+_KILL_TAGS = frozenset(["head", "script", "style", "applet", "button", "input", "select", "textarea"])
+# ... and these elements are removed, but their content is kept.
+_REMOVE_TAGS = frozenset(["form", "iframe", "embed", "layer", "object", "param"])
+
+
+class _ParagraphMakerTarget:
+    """
+    lxml parser target that passes the parser events on to a Justext ParagraphMaker.
+    """
+
+    def __init__(self):
+        self.paragraph_maker = ParagraphMaker()
+        # Depth within a removed element (see _KILL_TAGS).
+        self._depth_kill = 0
+        # The parser can split a text node in multiple calls of data (e.g. at entities).
+        self._data = []
+        # Like the DOM, ignore everything after the end of the root element.
+        self._depth = 0
+        self._closed = False
+
+    def _flush_data(self):
+        if self._data:
+            self.paragraph_maker.characters("".join(self._data))
+            self._data = []
+
+    def start(self, tag, attrib):
+        if self._closed:
+            return
+
+        self._flush_data()
+        self._depth += 1
+        if self._depth_kill or tag in _KILL_TAGS:
+            self._depth_kill += 1
+        elif tag not in _REMOVE_TAGS:
+            self.paragraph_maker.startElementNS((None, tag), tag, attrib)
+
+    def end(self, tag):
+        if self._closed:
+            return
+
+        self._flush_data()
+        self._depth -= 1
+        self._closed = self._depth <= 0
+        if self._depth_kill:
+            self._depth_kill -= 1
+        elif tag not in _REMOVE_TAGS:
+            self.paragraph_maker.endElementNS((None, tag), tag)
+
+    def data(self, data):
+        if not (self._depth_kill or self._closed):
+            self._data.append(data)
+
+    def close(self):
+        self._flush_data()
+        self.paragraph_maker.endDocument()
+
+    def pop_paragraphs(self) -> List[GeneralParagraph]:
+        """
+        The paragraphs that were completed since the previous call.
+        """
+        paragraphs = self.paragraph_maker.paragraphs
+        self.paragraph_maker.paragraphs = []
+
+        return list(map(GeneralParagraph.from_justext_paragraph, paragraphs))
+
+
+def _iter_chunks(html: Union[str, Iterable[str]], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    if isinstance(html, str):
+        for i in range(0, len(html), chunk_size):
+            yield html[i:i + chunk_size]
+    else:
+        yield from html
+
+
+def iter_paragraphs(html: Union[str, Iterable[str]],
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[GeneralParagraph]:
+    """
+    Generate the (not yet classified) paragraphs of a page while it is parsed.
+
+    Args:
+        html: HTML as string, or an iterable of chunks of it (e.g. an opened file).
+        chunk_size: Number of characters fed to the parser at once, if html is a string.
+
+    Returns:
+        Generator of the paragraphs, as JustextWrapper.paragraphs before classification.
+    """
+
+    target = _ParagraphMakerTarget()
+    parser = lxml.etree.HTMLParser(target=target)
+
+    for chunk in _iter_chunks(html, chunk_size=chunk_size):
+        parser.feed(chunk)
+
+        yield from target.pop_paragraphs()
+
+    parser.close()
+
+    yield from target.pop_paragraphs()
+
+
+def iter_sections(html: Union[str, Iterable[str]],
+                  language: str = None,
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[GeneralSection]:
+    """
+    Generate the sections of a page while it is parsed: a section is returned as soon as the next heading is found.
+    The memory use is thus bounded by the largest section instead of the whole page.
+
+    Contrary to GeneralHTMLParser.get_sections, the boilerplate is decided within each heading and its paragraphs,
+    as the paragraphs of the rest of the page are not known yet. As in get_sections, a heading that is boilerplate
+    doesn't start a new section: its (non-boilerplate) paragraphs are added to the previous section.
+    A section is thus only returned when the next heading that is not boilerplate is found.
+
+    Args:
+        html: HTML as string, or an iterable of chunks of it (e.g. an opened file).
+        language: (Optional) ISO language name (e.g. English, Dutch...) to remove the boilerplate.
+            If None, all paragraphs are kept.
+        chunk_size: Number of characters fed to the parser at once, if html is a string.
+
+    Returns:
+        Generator of the sections.
+    """
+
+    stoplist = None if language is None else get_stoplist(language)
+
+    def is_boilerplate(paragraph: GeneralParagraph) -> bool:
+        return stoplist is not None and paragraph.is_boilerplate
+
+    section = None
+
+    def add_paragraphs(paragraphs: List[GeneralParagraph]) -> Optional[GeneralSection]:
+        """
+        Add a heading and its paragraphs.
+
+        Returns:
+            The previous section, if it is complete.
+        """
+        nonlocal section
+
+        if stoplist is not None:
+            classify_paragraphs(paragraphs, stoplist)
+            revise_paragraph_classification(paragraphs)
+
+        heading, body = (paragraphs[0], paragraphs[1:]) if paragraphs[0].is_heading else (None, paragraphs)
+        texts = [paragraph.text for paragraph in body if not is_boilerplate(paragraph)]
+
+        section_complete = None
+        if heading is not None and not is_boilerplate(heading):
+            section_complete, section = section, GeneralSection(title=heading.text,
+                                                                paragraphs=[])
+        elif section is None:
+            if not texts:
+                return None
+
+            section = GeneralSection(title="",
+                                     paragraphs=[])
+
+        for text in texts:
+            section.add_paragraph(text)
+
+        return section_complete
+
+    paragraphs = []
+    for paragraph in iter_paragraphs(html, chunk_size=chunk_size):
+        if paragraph.is_heading and paragraphs:
+            # The previous heading with its paragraphs is complete.
+            section_complete = add_paragraphs(paragraphs)
+            if section_complete is not None:
+                yield section_complete
+
+            paragraphs = []
+
+        paragraphs.append(paragraph)
+
+    if paragraphs:
+        section_complete = add_paragraphs(paragraphs)
+        if section_complete is not None:
+            yield section_complete
+
+    if section is not None:
+        yield section
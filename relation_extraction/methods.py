@@ -1,16 +1,18 @@
+import hashlib
 import os
 import re
+import threading
 import warnings
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional
 
-import requests
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
 
 from c4c_cpsv_ap.connector.hierarchy import Provider
 from c4c_cpsv_ap.models import Concept, ContactPoint, PublicOrganisation, PublicService
 from connectors.term_extraction import ConnectorContactInfoClassification, ConnectorTermExtraction, TypesContactInfo
-from connectors.term_extraction_utils.cas_utils import cas_from_cas_content, SOFA_ID
+from connectors.term_extraction_utils.cas_utils import get_lemmas
 from relation_extraction.utils import clean_text
 
 TERM_EXTRACTION = os.environ.get("TERM_EXTRACTION")
@@ -62,6 +64,12 @@ class ContactInfoSplit(BaseModel):
 
 
 class RelationExtractor:
+    # Contact info is the most expensive remote call. Shared between all extractors (of this process),
+    # such that repeated pages, e.g. in batch mode, are only processed once.
+    _contact_info_split_cache: "OrderedDict[str, ContactInfoSplit]" = OrderedDict()
+    _contact_info_split_cache_size: int = 128
+    _contact_info_split_lock = threading.Lock()
+
     def __init__(self, html, context,
                  country_code: str):
         # Save data
@@ -77,8 +85,15 @@ class RelationExtractor:
         """
         """
 
-        contact_info = self.extract_contact_info()
-        public_org = self.extract_public_organisation()
+        # Only extract the contact info once, it's shared between contact point and public organisation.
+        try:
+            contact_info_split = self.get_contact_info_split()
+        except Exception as e:
+            warnings.warn(f"Unable to extract contact info:\n{e}", UserWarning)
+            contact_info_split = None
+
+        contact_info = self._get_contact_point(contact_info_split) if contact_info_split is not None else None
+        public_org = self._add_public_organisation(contact_info_split)
 
         if extract_concepts:
             concepts = self.extract_concepts()
@@ -95,39 +110,39 @@ class RelationExtractor:
             contact_info_split = self.get_contact_info_split()
         except Exception as e:
             warnings.warn(f"Unable to extract contact info:\n{e}", UserWarning)
-            address = None
-        else:
-            l_address = contact_info_split.address
-            address = '\n'.join(l_address)
-
-        # Prefered label can most likely be extracted from the name of the service
-        # within the contact information.
-        public_org = PublicOrganisation(pref_label=f"# TODO",  # TODO
-                                        spatial=self.context,
-                                        has_address=address)  # TODO
-        self.provider.public_organisations.add(public_org, context=self.context)
+            contact_info_split = None
 
-        return public_org
+        return self._add_public_organisation(contact_info_split)
 
     def extract_public_service(self,
                                contact_info: ContactPoint,
                                public_org: PublicOrganisation,
-                               concepts: List[Concept]
+                               concepts: List[Concept],
+                               description: str = None,
+                               name: str = None
                                ) -> PublicService:
         """
         Extract all public service information
 
+        Args:
+            description (optional): Already extracted description. If None, it will be requested.
+            name (optional): Already extracted name. If None, it is taken from the title of the page.
+
         TODO
          * add the identifier extraction results
         """
 
-        try:
-            description = get_public_service_description(self.html)
-        except Exception as e:
-            warnings.warn(f"Unable to extract public service description:\n{e}", UserWarning)
-            description = ""
+        if description is None:
+            try:
+                description = get_public_service_description(self.html)
+            except Exception as e:
+                warnings.warn(f"Unable to extract public service description:\n{e}", UserWarning)
+                description = ""
 
-        public_service = PublicService(name=get_public_service_name(self.html),
+        if name is None:
+            name = get_public_service_name(self.html)
+
+        public_service = PublicService(name=name,
                                        description=description,
                                        identifier=None,
                                        has_competent_authority=public_org,
@@ -147,23 +162,94 @@ class RelationExtractor:
         except Exception as e:
             warnings.warn(f"Unable to extract contact info:\n{e}", UserWarning)
         else:
-            contact_info = ContactPoint(email=contact_info_split.email,
-                                        telephone=contact_info_split.telephone,
-                                        opening_hours=contact_info_split.opening_hours
-                                        )
-            return contact_info
+            return self._get_contact_point(contact_info_split)
+
+    def _add_public_organisation(self,
+                                 contact_info_split: Optional[ContactInfoSplit]) -> PublicOrganisation:
+        """
+        Add the public organisation to the provider.
+
+        Args:
+            contact_info_split: Contact info of the page. None if not available.
+        """
+
+        if contact_info_split is not None:
+            l_address = contact_info_split.address
+            address = '\n'.join(l_address)
+        else:
+            address = None
+
+        # Prefered label can most likely be extracted from the name of the service
+        # within the contact information.
+        public_org = PublicOrganisation(pref_label=f"# TODO",  # TODO
+                                        spatial=self.context,
+                                        has_address=address)  # TODO
+        self.provider.public_organisations.add(public_org, context=self.context)
+
+        return public_org
+
+    @staticmethod
+    def _get_contact_point(contact_info_split: ContactInfoSplit) -> ContactPoint:
+        contact_info = ContactPoint(email=contact_info_split.email,
+                                    telephone=contact_info_split.telephone,
+                                    opening_hours=contact_info_split.opening_hours
+                                    )
+        return contact_info
+
+    def get_contact_info_split(self, use_cache: bool = True) -> ContactInfoSplit:
+        """
+        Extract the contact info and split it up in email, telephone, opening hours and address.
+
+        Args:
+            use_cache: flag to reuse the result of a previous call for the same HTML, and to save the result for later
+                calls. The cache is keyed on a hash of the HTML and the country code.
+
+        Returns:
+            A copy of the contact info, so it can be safely changed.
+        """
+
+        key = self._contact_info_split_key()
+
+        if use_cache:
+            with self._contact_info_split_lock:
+                contact_info_split = self._contact_info_split_cache.get(key)
+                if contact_info_split is not None:
+                    self._contact_info_split_cache.move_to_end(key)
+                    return contact_info_split.copy(deep=True)
 
-    def get_contact_info_split(self) -> ContactInfoSplit:
         conn = ConnectorTermExtraction(TERM_EXTRACTION)
         l_info_text = conn.get_contact_info(html=self.html,
                                             # language=language
                                             )
         contact_info_split = _split_contact_info(l_info_text, country_code=self.country_code)
-        return contact_info_split
+
+        if not use_cache:
+            return contact_info_split
+
+        with self._contact_info_split_lock:
+            self._contact_info_split_cache[key] = contact_info_split
+            self._contact_info_split_cache.move_to_end(key)
+            while len(self._contact_info_split_cache) > self._contact_info_split_cache_size:
+                self._contact_info_split_cache.popitem(last=False)
+
+        return contact_info_split.copy(deep=True)
+
+    @classmethod
+    def clear_contact_info_split_cache(cls):
+        with cls._contact_info_split_lock:
+            cls._contact_info_split_cache.clear()
+
+    def _contact_info_split_key(self) -> str:
+        h = hashlib.sha256(self.html.encode("utf-8")).hexdigest()
+        return f"{h}_{self.country_code}"
 
     def extract_concepts(self) -> List[Concept]:
         l_label = get_concepts(self.html)
 
+        return self._get_concepts(l_label)
+
+    @staticmethod
+    def _get_concepts(l_label: List[str]) -> List[Concept]:
         l_concept_cpsv_ap = [Concept(pref_label=label) for label in l_label]
 
         return l_concept_cpsv_ap
@@ -179,14 +265,19 @@ class RelationExtractor:
             print(s)
 
 
-def get_public_service_name(html: str) -> str:
+def get_public_service_name(html: str, soup: BeautifulSoup = None) -> str:
     """
     Returns the public service of an HTML
 
     We
+
+    Args:
+        html: HTML as string
+        soup: (Optional) the already parsed page, to reuse.
     """
     # urllib2.urlopen("https://www.google.com")
-    soup = BeautifulSoup(html, "html.parser")
+    if soup is None:
+        soup = BeautifulSoup(html, "html.parser")
 
     # Cast to string instead of using NavigableString
     title = str(soup.title.string)
@@ -210,19 +301,12 @@ def get_public_service_description(html) -> str:
 
 def get_concepts(html: str,
                  language="en"):
-    j = {
-        "html": html,
-        "language": language
-    }
-    r = requests.post(TERM_EXTRACTION + "/extract_terms",
-                      json=j)
-    j_r = r.json()
-
-    cas = cas_from_cas_content(j_r['cas_content'])
-
-    l_term_typesystem = cas.get_view(SOFA_ID).select("cassis.Token")
+    conn = ConnectorTermExtraction(TERM_EXTRACTION,
+                                   test_connection=False)
+    terms = conn._post_extract_terms(html=html,
+                                     language=language)
 
-    l_term = list(set(map(lambda ts: ts.lemma, l_term_typesystem)))
+    l_term = get_lemmas(terms.cas_content)
 
     return l_term
 
@@ -335,10 +419,11 @@ def _split_contact_info(l_info_text: List[str],
 
     conn = ConnectorContactInfoClassification(CONTACT_CLASSIFICATION)
 
-    for text in l_info_text:
+    # All lines at once
+    l_l_labels = conn.classify_contact_type_lines(l_info_text,
+                                                  country_code=country_code)
 
-        l_labels = conn._post_classify_contact_type(text,
-                                                    country_code=country_code)
+    for text, l_labels in zip(l_info_text, l_l_labels):
 
         if debug and (len(l_labels) == 0):
             warnings.warn(f"Could not find a type of contact info: {text}")
@@ -6,7 +6,7 @@ from bs4 import BeautifulSoup, Tag
 from relation_extraction.aalter import AalterParser
 from relation_extraction.cities import RegexCPSVAPRelationsClassifier
 from relation_extraction.html_parsing.parsers import Section
-from relation_extraction.utils import clean_text
+from relation_extraction.utils import clean_text, HeaderIndex
 
 
 class NovaGoricaCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
@@ -14,19 +14,8 @@ class NovaGoricaCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
     Nova Gorica
     """
 
-    def __init__(self,
-                 # Ignore ":"
-                 pattern_criterion_requirement=r"obrazci(.)*",
-                 pattern_rule=r"opis postopka(.)*",
-                 pattern_evidence=r"zahtevane priloge(.)*",
-                 pattern_cost=r"taksa(.)*",
-                 ):
-        super(NovaGoricaCPSVAPRelationsClassifier, self).__init__(
-            pattern_criterion_requirement=pattern_criterion_requirement,
-            pattern_rule=pattern_rule,
-            pattern_evidence=pattern_evidence,
-            pattern_cost=pattern_cost
-        )
+    # Patterns in regex_classifiers.yml
+    municipality = "Nova Gorica"
 
 
 class NovaGoricaParser(AalterParser):  # CityParser
@@ -44,13 +33,18 @@ class NovaGoricaParser(AalterParser):  # CityParser
 
     def parse_page(self,
                    s_html,
-                   include_sub: bool = True
+                   include_sub: bool = True,
+                   soup: BeautifulSoup = None
                    ) -> List[Section]:
-        soup = BeautifulSoup(s_html, 'html.parser')
+        if soup is None:
+            soup = BeautifulSoup(s_html, 'html.parser')
 
         # Find the Title
         h_title = soup.find_all('h1')[-1]
-        page_procedure = self._get_page_procedure(h_title)
+
+        # Headers of the whole page, found only once.
+        header_index = HeaderIndex(soup, get_all_headers=self._get_all_headers)
+        page_procedure = self._get_page_procedure(h_title, header_index=header_index)
 
         def get_text_within_tag(tag, header, next_header) -> str:
             text_tag = clean_text(tag.get_text(separator=" ", strip=True))
@@ -70,7 +64,7 @@ class NovaGoricaParser(AalterParser):  # CityParser
 
         l = []
 
-        l_headers = self._get_all_headers(page_procedure)
+        l_headers = header_index.get_headers(page_procedure)
         for i_header, header in enumerate(l_headers):
 
             l_par = []
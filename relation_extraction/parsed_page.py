@@ -0,0 +1,150 @@
+"""
+The result of parsing a page, computed once and shared by the whole extraction of that page.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import lxml.html
+from bs4 import BeautifulSoup
+
+from relation_extraction.html_parsing.justext_wrapper import GeneralParagraph
+from relation_extraction.html_parsing.parsers import Section
+
+# Maximum number of parsed pages kept in memory per parser.
+PARSED_PAGE_CACHE_SIZE = int(os.environ.get("PARSED_PAGE_CACHE_SIZE", 4))
+
+
+def get_page_key(s_html: str) -> str:
+    """
+    Key of a page: hash of its content.
+
+    Args:
+        s_html: HTML as string
+
+    Returns:
+        SHA-256 hexdigest
+    """
+    return hashlib.sha256(s_html.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ParsedPage:
+    """
+    The sections of a page, with (when available) the DOM and paragraphs they were made from.
+
+    The BeautifulSoup of the page is built on first use and shared by all consumers of the parsed page.
+    """
+
+    def __init__(self,
+                 key: str,
+                 sections: List[Section],
+                 dom: lxml.html.HtmlElement = None,
+                 paragraphs: List[GeneralParagraph] = None,
+                 html: str = None):
+        """
+
+        Args:
+            key: Content hash of the page, see get_page_key.
+            sections: Sections of the page, as returned by CityParser.parse_page.
+            dom: (Optional) DOM of the page.
+            paragraphs: (Optional) paragraphs of the page, with their metadata (heading, boilerplate...).
+            html: (Optional) HTML of the page as string, needed for soup.
+        """
+
+        self.key = key
+        self.sections = sections
+        self.dom = dom
+        self.paragraphs = paragraphs
+        self.html = html
+
+        self._soup = None
+        self._soup_lock = threading.Lock()
+
+    @property
+    def soup(self) -> Optional[BeautifulSoup]:
+        """
+        BeautifulSoup of the page (html.parser), parsed only once. None if the HTML was not kept.
+        """
+
+        if self.html is None:
+            return None
+
+        with self._soup_lock:
+            if self._soup is None:
+                self._soup = BeautifulSoup(self.html, 'html.parser')
+
+        return self._soup
+
+    def get_title_paragraphs(self) -> List[Tuple[str, str]]:
+        """
+        The (title, paragraph text) pairs of the sections.
+        """
+        return [(section.title, section.paragraphs_text()) for section in self.sections]
+
+
+class ParsedPageCache:
+    """
+    Size-bounded (LRU) cache of the parsed pages. Thread-safe.
+
+    Pages are evicted explicitly once the whole extraction of the page is done (see evict),
+    or when the cache is full.
+    """
+
+    def __init__(self, max_size: int = PARSED_PAGE_CACHE_SIZE):
+        """
+
+        Args:
+            max_size: Maximum number of parsed pages kept in memory.
+        """
+
+        self.max_size = max_size
+
+        self.n_hits = 0
+        self.n_misses = 0
+
+        self._lock = threading.Lock()
+        self._cache: Dict[Hashable, ParsedPage] = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key: Hashable) -> Optional[ParsedPage]:
+        with self._lock:
+            parsed_page = self._cache.get(key)
+            if parsed_page is None:
+                self.n_misses += 1
+            else:
+                self.n_hits += 1
+                self._cache.move_to_end(key)
+
+        return parsed_page
+
+    def put(self, key: Hashable, parsed_page: ParsedPage) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._cache[key] = parsed_page
+            self._cache.move_to_end(key)
+
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def evict(self, page_key: str) -> None:
+        """
+        Remove all parsed versions of a page.
+
+        Args:
+            page_key: Content hash of the page, see get_page_key.
+        """
+
+        with self._lock:
+            for key in [key for key, parsed_page in self._cache.items() if parsed_page.key == page_key]:
+                del self._cache[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
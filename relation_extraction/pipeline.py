@@ -1,13 +1,16 @@
 import os
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
 
 from rdflib import Literal
 
 from c4c_cpsv_ap.models import Cost, CriterionRequirement, Evidence, PublicService, Rule
 from connectors.translation import ETranslationConnector
 from relation_extraction.cities import CityParser, Relations
-from relation_extraction.methods import RelationExtractor
+from relation_extraction.methods import get_concepts, get_public_service_description, get_public_service_name, \
+    RelationExtractor
 
 CEF_LOGIN = os.environ.get("CEF_LOGIN")
 CEF_PASSW = os.environ.get("CEF_PASSW")
@@ -33,27 +36,108 @@ class RelationExtractor2(RelationExtractor):
 
         self.lang_code = lang_code
 
-    def extract_all(self, *args, verbose=0, **kwargs, ) -> PublicService:
-        if verbose:
-            print("Relation extraction contact info - Start")
+    def extract_all(self,
+                    extract_concepts=True,
+                    verbose=0,
+                    max_workers: int = 4,
+                    ) -> PublicService:
+        """
+        All the remote calls that are independent of each other (contact info, chunking, concepts and the
+        req/rule/evidence/cost classification) are started at the same time,
+        such that the extraction takes about as long as the slowest call instead of the sum of all calls.
+        The results are added to the graph afterwards, in the main thread.
 
-        ps = super(RelationExtractor2, self).extract_all(*args, **kwargs)
-        if verbose:
-            print("Relation extraction contact info - Finish")
+        Args:
+            extract_concepts: flag to extract the Concepts.
+            verbose:
+            max_workers: Maximum number of remote calls running at the same time.
+
+        Returns:
+            the extracted public service
+        """
 
         if verbose:
-            print("Relation extraction req/rule/evidence/cost - Start")
+            print("Relation extraction - Start")
 
+        # The page is parsed once and shared by all consumers (see CityParser.get_parsed_page),
+        # it is released only when the whole extraction of the page is done.
         try:
-            d_relations = self.parser.extract_relations(self.html,
-                                                        url=self.url,
-                                                        verbose=verbose)
-        except Exception as e:
-            warnings.warn(f"Unable to extract relations:\n{e}", UserWarning)
-            d_relations = Relations()
+            ps = self._extract_all(extract_concepts=extract_concepts, verbose=verbose, max_workers=max_workers)
+        finally:
+            if isinstance(self.parser, CityParser):
+                self.parser.evict_parsed_page(self.html)
+
+        return ps
+
+    def _extract_all(self,
+                     extract_concepts=True,
+                     verbose=0,
+                     max_workers: int = 4,
+                     ) -> PublicService:
+        """
+        See extract_all, without releasing the parsed page.
+        """
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_contact_info_split = executor.submit(self.get_contact_info_split)
+            future_description = executor.submit(get_public_service_description, self.html)
+            future_concepts = executor.submit(get_concepts, self.html) if extract_concepts else None
+            future_relations = executor.submit(self.parser.extract_relations,
+                                               self.html,
+                                               url=self.url,
+                                               verbose=verbose)
+
+            try:
+                contact_info_split = future_contact_info_split.result()
+            except Exception as e:
+                warnings.warn(f"Unable to extract contact info:\n{e}", UserWarning)
+                contact_info_split = None
+
+            try:
+                description = future_description.result()
+            except Exception as e:
+                warnings.warn(f"Unable to extract public service description:\n{e}", UserWarning)
+                description = ""
+
+            if future_concepts is not None:
+                concepts = self._get_concepts(future_concepts.result())
+            else:
+                concepts = []
+
+            try:
+                d_relations = future_relations.result()
+            except Exception as e:
+                warnings.warn(f"Unable to extract relations:\n{e}", UserWarning)
+                d_relations = None
 
         if verbose:
-            print("Relation extraction req/rule/evidence/cost - Finish")
+            print("Relation extraction - Finish")
+
+        contact_info = self._get_contact_point(contact_info_split) if contact_info_split is not None else None
+        public_org = self._add_public_organisation(contact_info_split)
+
+        # Reuse the page as parsed by the relation extraction (not when the parsing failed).
+        if d_relations is not None and isinstance(self.parser, CityParser):
+            soup = self.parser.get_parsed_page(self.html).soup
+        else:
+            soup = None
+        name = get_public_service_name(self.html, soup=soup)
+
+        ps = self.extract_public_service(contact_info=contact_info,
+                                         public_org=public_org,
+                                         concepts=concepts,
+                                         description=description,
+                                         name=name)
+
+        if d_relations is not None:
+            self._add_relations(ps, d_relations)
+
+        return ps
+
+    def _add_relations(self, ps: PublicService, d_relations: Relations):
+        """
+        Add the req/rule/evidence/cost/event relations to the public service.
+        """
 
         def add_lang2info(info):
             info.name.language_code = self.lang_code
@@ -127,14 +211,18 @@ class RelationExtractor2(RelationExtractor):
                                                         uri_event=uri_event,
                                                         context=self.context)
 
-        return ps
-
-    def translate(self, target: str, source: str):
+    def translate(self, target: Union[str, List[str]], source: str,
+                  max_workers: int = 4):
         """
+        Adds translations of all the literals in the source language.
+
+        All the target languages are translated concurrently.
+        If the translation to a target language fails, the other target languages are still added.
 
         Args:
-            target: Language code
+            target: Language code, or list of language codes. None to not translate.
             source: Language code
+            max_workers: Maximum number of target languages that are translated at the same time.
 
         Returns:
 
@@ -162,28 +250,45 @@ class RelationExtractor2(RelationExtractor):
         translator = ETranslationConnector(username=CEF_LOGIN,
                                            password=CEF_PASSW)
 
-        l_text_source = [str(o) for s, p, o, c in l_to_translate]
+        # The same literal is often found multiple times (e.g. in different contexts).
+        l_text_source = list(dict.fromkeys(str(o) for s, p, o, c in l_to_translate))
 
-        if isinstance(target, str):
+        if target is None:
+            target = []
+        elif isinstance(target, str):
             target = [target]
 
-        for target_i in target:
+        # No need to translate to the source language
+        l_target = [target_i for target_i in dict.fromkeys(target) if target_i.upper() != source.upper()]
 
-            if target_i == source:
-                # No need to translate
-                continue
+        def trans(target_i):
+            return translator.trans_list_blocking(l_text_source,
+                                                  target=target_i,
+                                                  source=source)
 
-            try:
-                l_text_target = translator.trans_list_blocking(l_text_source,
-                                                               target=target_i,
-                                                               source=source)
+        l_quads_trans = []
 
-            except Exception as e:
-                warnings.warn(f"Unable to translate from {source} to {target_i}:\n{e}", UserWarning)
-            else:
-                for (s, p, _, c), text_trans in zip(l_to_translate, l_text_target):
-                    quad_trans = (s, p, Literal(text_trans, lang=target_i), c)
-                    g.add(quad_trans)
+        if l_text_source and l_target:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(l_target))) as executor:
+                d_future = {target_i: executor.submit(trans, target_i) for target_i in l_target}
+
+                for target_i, future in d_future.items():
+                    try:
+                        l_text_target = future.result()
+
+                        if len(l_text_target) != len(l_text_source):
+                            raise ValueError(f"Expected {len(l_text_source)} translations, got {len(l_text_target)}.")
+
+                    except Exception as e:
+                        warnings.warn(f"Unable to translate from {source} to {target_i}:\n{e}", UserWarning)
+                    else:
+                        d_text_target = dict(zip(l_text_source, l_text_target))
+
+                        l_quads_trans.extend((s, p, Literal(d_text_target[str(o)], lang=target_i), c)
+                                             for s, p, o, c in l_to_translate)
+
+        # Add all translations at once
+        g.addN(l_quads_trans)
 
         t1 = time.time()
         print(f"Translating labels - End ({t1 - t0:.2f} s)")
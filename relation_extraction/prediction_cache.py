@@ -0,0 +1,178 @@
+"""
+Shared cache of the predictions of the (BERT) classifiers.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from BERT_classifier.app.models import Results
+from connectors.sqlite_store import SQLiteStore
+from connectors.translation_memory import normalize_segment
+
+# Optional SQLite file to keep the predictions between runs, and maximum number of predictions kept in memory.
+PREDICTION_CACHE = os.environ.get("PREDICTION_CACHE")
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))
+
+
+class PredictionCache:
+    """
+    Size-bounded (LRU) cache of (normalized text, language, model version) -> prediction.
+
+    Optionally backed by an SQLite file, such that predictions are kept between runs.
+    Thread-safe.
+    """
+
+    def __init__(self,
+                 max_size: int = PREDICTION_CACHE_SIZE,
+                 filename: Union[str, Path] = None):
+        """
+
+        Args:
+            max_size: Maximum number of predictions kept in memory.
+            filename: (Optional) SQLite database to persist the predictions.
+        """
+
+        self.max_size = max_size
+        self.filename = None if filename is None else str(filename)
+
+        self.n_hits = 0
+        self.n_misses = 0
+
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, str, str], Results] = OrderedDict()
+
+        self._store: Optional[SQLiteStore] = None
+        if self.filename is not None:
+            self._store = SQLiteStore(self.filename,
+                                      table="prediction",
+                                      partition=("model", "lang"),
+                                      key="text",
+                                      value="results")
+
+    @property
+    def hit_rate(self) -> float:
+        n = self.n_hits + self.n_misses
+        return self.n_hits / n if n else 0.
+
+    def get(self, text: str, lang: str, model: str) -> Optional[Results]:
+        return self.get_many([text], lang, model).get(text)
+
+    def get_many(self, texts: Iterable[str], lang: str, model: str) -> Dict[str, Results]:
+        """
+        Get the cached predictions of multiple texts.
+
+        Args:
+            texts: the classified texts.
+            lang: language of the texts.
+            model: identifies the model (version) that made the prediction.
+
+        Returns:
+            Dictionary text -> prediction, only for the texts found in the cache.
+        """
+
+        d_key = {text: self._get_key(text, lang, model) for text in dict.fromkeys(texts)}
+
+        d_results = {}
+
+        with self._lock:
+            for text, key in d_key.items():
+                results = self._cache.get(key)
+                if results is not None:
+                    self._cache.move_to_end(key)
+                    d_results[text] = results
+
+            l_miss = [text for text in d_key if text not in d_results]
+
+            if l_miss and self._store is not None:
+                d_results_db = self._select(l_miss, d_key, lang, model)
+                d_results.update(d_results_db)
+                self._update({d_key[text]: results for text, results in d_results_db.items()})
+
+            self.n_hits += len(d_results)
+            self.n_misses += len(d_key) - len(d_results)
+
+        return d_results
+
+    def set(self, text: str, lang: str, model: str, results: Results) -> None:
+        self.set_many({text: results}, lang, model)
+
+    def set_many(self, d_results: Dict[str, Results], lang: str, model: str) -> None:
+        """
+        Save predictions.
+
+        Args:
+            d_results: Dictionary text -> prediction
+            lang: language of the texts.
+            model: identifies the model (version) that made the prediction.
+        """
+
+        d_key_results = {self._get_key(text, lang, model): results for text, results in d_results.items()}
+
+        with self._lock:
+            self._update(d_key_results)
+
+        if self._store is not None:
+            self._store.set_many((model, (lang or "").upper()),
+                                 {key[2]: results.json() for key, results in d_key_results.items()})
+
+    def clear(self) -> None:
+        """
+        Clear the predictions in memory (not the persistent ones) and the metrics.
+        """
+        with self._lock:
+            self._cache.clear()
+            self.n_hits = 0
+            self.n_misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def _get_key(text: str, lang: str, model: str) -> Tuple[str, str, str]:
+        return model, (lang or "").upper(), normalize_segment(text)
+
+    def _update(self, d_key_results: Dict[Tuple[str, str, str], Results]) -> None:
+        for key, results in d_key_results.items():
+            self._cache[key] = results
+            self._cache.move_to_end(key)
+
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def _select(self, l_text, d_key, lang, model) -> Dict[str, Results]:
+        # normalized text -> texts
+        d_text: Dict[str, list] = {}
+        for text in l_text:
+            d_text.setdefault(d_key[text][2], []).append(text)
+
+        d_results = {}
+        for text_norm, results in self._store.get_many((model, (lang or "").upper()), d_text).items():
+            for text in d_text[text_norm]:
+                d_results[text] = Results(**json.loads(results))
+
+        return d_results
+
+
+_prediction_cache: Optional[PredictionCache] = None
+_prediction_cache_lock = threading.Lock()
+
+
+def get_prediction_cache() -> PredictionCache:
+    """
+    Get the prediction cache shared by all the classifiers of this process, as configured in env.
+
+    Returns:
+        PredictionCache
+    """
+    global _prediction_cache
+
+    with _prediction_cache_lock:
+        if _prediction_cache is None:
+            _prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE,
+                                                filename=PREDICTION_CACHE)
+
+    return _prediction_cache
@@ -0,0 +1,193 @@
+"""
+Regular expressions of the relation classifiers of each municipality, see regex_classifiers.yml.
+"""
+
+import os
+import re
+import warnings
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Union
+from urllib.parse import urlparse
+
+import yaml
+from pydantic import BaseModel, validator
+
+FILENAME_REGEX_CLASSIFIERS = os.environ.get("REGEX_CLASSIFIERS",
+                                            os.path.join(os.path.dirname(__file__), "regex_classifiers.yml"))
+
+# Same names as the fields of RelationsPrediction.
+LABELS = ["criterion_requirement", "rule", "evidence", "cost"]
+
+# Never matches.
+PATTERN_NOT_IMPLEMENTED = r"(?=x)(?!x)"
+
+
+def _get_label_pattern(label: str, pattern: str) -> str:
+    """
+    The pattern of a label as part of the combined expression, see compile_relations_pattern.
+    """
+    return f"(?:(?=(?P<{label}>{pattern})))?"
+
+
+def validate_pattern(pattern: str, label: str, municipality: str = None) -> None:
+    """
+    Check that a pattern can be combined with the others, see compile_relations_pattern.
+
+    The groups of the combined expression are numbered and named differently,
+    thus the patterns should not contain (capturing or named) groups, nor refer to them.
+
+    Args:
+        pattern: Regular expression of the label.
+        label: The relation, for the error message.
+        municipality: (Optional) municipality of the pattern, for the error message.
+
+    Raises:
+        ValueError: if the pattern is not valid.
+    """
+
+    where = label if municipality is None else f"{label} of {municipality}"
+
+    try:
+        compiled = re.compile(pattern)
+        # Also within the combined expression.
+        re.compile(_get_label_pattern(label, pattern))
+    except re.error as e:
+        if e.msg.startswith("global flags not at the start"):
+            raise ValueError(f"Inline flags such as (?i) are not allowed in the pattern of {where}: {pattern}. "
+                             f"The patterns are case-insensitive already, use a scoped flag, e.g. (?s:...), instead."
+                             ) from e
+
+        raise ValueError(f"Invalid pattern of {where}: {pattern} ({e})") from e
+
+    if compiled.groups != 0 or compiled.groupindex != {}:
+        raise ValueError(f"Groups are not allowed in the pattern of {where}, "
+                         f"use a non-capturing group (?:...) instead: {pattern}")
+
+
+def compile_relations_pattern(patterns: Dict[str, str], municipality: str = None) -> Pattern:
+    """
+    Combine the patterns in a single regular expression, with a named group per label.
+
+    Each pattern is an optional lookahead at the start of the title, such that a single match gives all the labels
+    whose pattern matches (an alternation would only give the first one).
+
+    Args:
+        patterns: label -> pattern, as used by re.match
+        municipality: (Optional) municipality of the patterns, for the error message.
+
+    Returns:
+        Compiled (case-insensitive) regular expression. The group of a label is not None if its pattern matches.
+
+    Raises:
+        ValueError: if a pattern is not valid, see validate_pattern.
+    """
+
+    for label, pattern in patterns.items():
+        # Validate separately, for a clear error message.
+        validate_pattern(pattern, label, municipality=municipality)
+
+    return re.compile("".join(_get_label_pattern(label, pattern) for label, pattern in patterns.items()),
+                      re.IGNORECASE)
+
+
+class RegexClassifierModel(BaseModel):
+    name: str
+    domain: Optional[str] = None
+
+    criterion_requirement: str = PATTERN_NOT_IMPLEMENTED
+    rule: str = PATTERN_NOT_IMPLEMENTED
+    evidence: str = PATTERN_NOT_IMPLEMENTED
+    cost: str = PATTERN_NOT_IMPLEMENTED
+
+    @validator(*LABELS)
+    def check_pattern(cls, v: str, values: dict, field) -> str:
+        validate_pattern(v, field.name, municipality=values.get("name"))
+        return v
+
+    def get_patterns(self) -> Dict[str, str]:
+        return {label: getattr(self, label) for label in LABELS}
+
+
+class DataRegexClassifiers(BaseModel):
+    municipalities: List[RegexClassifierModel]
+
+    @validator("municipalities", pre=True)
+    def convert_dict_to_list(cls, v: Union[List[RegexClassifierModel], Dict[str, dict]]) \
+            -> List[RegexClassifierModel]:
+        if isinstance(v, dict):
+            return [RegexClassifierModel(name=name, **(value or {})) for name, value in v.items()]
+
+        return v
+
+    @classmethod
+    def load_yaml(cls,
+                  filename=FILENAME_REGEX_CLASSIFIERS,
+                  remove_template=True,
+                  key_template_municipality="City"
+                  ) -> "DataRegexClassifiers":
+        with open(filename) as file:
+            dict_tmp = yaml.full_load(file)
+
+        data = cls(**dict_tmp)
+
+        if remove_template:
+            if key_template_municipality in data.municipality_names():
+                data.municipalities = [municipality for municipality in data.municipalities
+                                       if municipality.name != key_template_municipality]
+
+            else:
+                warnings.warn(f"Could not find template ({key_template_municipality}) in the file. "
+                              f"Municipalities: {data.municipality_names()}",
+                              UserWarning)
+
+        return data
+
+    def get(self, municipality_name, default=None) -> RegexClassifierModel:
+        """
+        Return the municipality based on name
+
+        Args:
+            municipality_name: Made it case-independent.
+
+        Returns:
+        """
+
+        for municipality in self.municipalities:
+            if municipality.name.lower() == municipality_name.lower():
+                return municipality
+
+        return default
+
+    def get_by_url(self, url: str, default=None) -> RegexClassifierModel:
+        """
+        Return the municipality of a webpage: the hostname of the URL is its domain, or a subdomain of it.
+
+        Args:
+            url: URL of the webpage. The scheme is optional.
+        """
+
+        # Without scheme, the hostname would be parsed as path.
+        hostname = urlparse(url if "//" in url else f"//{url}").hostname
+        if not hostname:
+            return default
+
+        for municipality in self.municipalities:
+            if not municipality.domain:
+                continue
+
+            domain = municipality.domain.lower()
+            if hostname == domain or hostname.endswith(f".{domain}"):
+                return municipality
+
+        return default
+
+    def municipality_names(self) -> List[str]:
+        return [municipality.name for municipality in self.municipalities]
+
+
+@lru_cache()
+def get_regex_classifiers(filename=FILENAME_REGEX_CLASSIFIERS) -> DataRegexClassifiers:
+    """
+    The regex classifiers of all municipalities, loaded only once.
+    """
+    return DataRegexClassifiers.load_yaml(filename)
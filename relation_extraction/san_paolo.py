@@ -1,9 +1,11 @@
 import re
 
+import lxml.html
 from bs4 import Tag
 
 from relation_extraction.aalter import AalterParser
 from relation_extraction.cities import RegexCPSVAPRelationsClassifier
+from relation_extraction.html_parsing.section_extractor import is_header
 
 
 class SanPaoloCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
@@ -11,19 +13,8 @@ class SanPaoloCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
     San Paolo
     """
 
-    def __init__(self,
-                 # Ignore ":"
-                 pattern_criterion_requirement=r"(?=x)(?!x)",  # TODO, not implemented
-                 pattern_rule=r"(?=x)(?!x)",  # TODO, not implemented
-                 pattern_evidence=r"moduli da compilare e documenti da allegare(.)*",  # with or without ?
-                 pattern_cost=r"pagamenti(.)*"
-                 ):
-        super(SanPaoloCPSVAPRelationsClassifier, self).__init__(
-            pattern_criterion_requirement=pattern_criterion_requirement,
-            pattern_rule=pattern_rule,
-            pattern_evidence=pattern_evidence,
-            pattern_cost=pattern_cost
-        )
+    # Patterns in regex_classifiers.yml
+    municipality = "San Paolo"
 
 
 class SanPaoloParser(AalterParser):
@@ -65,3 +56,22 @@ class SanPaoloParser(AalterParser):
             for c in tag[ARG_CLASS]:
                 if HEADER in c.lower():
                     return True
+
+    def _filter_header_lxml(self, el: lxml.html.HtmlElement) -> bool:
+        return is_header(el) or self._filter_accordion_header_lxml(el)
+
+    @staticmethod
+    def _filter_accordion_header_lxml(el: lxml.html.HtmlElement,
+                                      ARG_CLASS="class",
+                                      HEADER="header"
+                                      ):
+        """
+        Same as _filter_accordion_header, for the lxml fast path.
+        """
+
+        # The class attribute is a single string in lxml, a list of classes in BeautifulSoup.
+        for c in el.get(ARG_CLASS, "").split():
+            if HEADER in c.lower():
+                return True
+
+        return False
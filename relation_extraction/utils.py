@@ -1,5 +1,5 @@
 import re
-from typing import List, Union
+from typing import Callable, Dict, List, Tuple, Union
 
 from bs4 import BeautifulSoup, Tag
 
@@ -16,10 +16,62 @@ def get_all_headers(soup: Union[BeautifulSoup, Tag]) -> List[Tag]:
     return soup.find_all(re.compile('^h[1-6]$'))
 
 
+class HeaderIndex:
+    """
+    The headers of a document, found in a single pass, with the number of headers within every element.
+
+    The headers within an element are consecutive in document order, so they can be returned without searching
+    the element again.
+    """
+
+    def __init__(self,
+                 soup: Union[BeautifulSoup, Tag],
+                 get_all_headers: Callable[[Union[BeautifulSoup, Tag]], List[Tag]] = get_all_headers):
+        """
+
+        Args:
+            soup: The whole document.
+            get_all_headers: Function that returns all headers within a tag.
+        """
+
+        # Keep a reference to the document, as the elements are identified by id.
+        self.soup = soup
+        self.headers = get_all_headers(soup)
+
+        self._ids_headers = set(map(id, self.headers))
+
+        # id of element -> (index of its first header, number of headers)
+        self._range_headers: Dict[int, Tuple[int, int]] = {}
+        for i, header in enumerate(self.headers):
+            for parent in header.parents:
+                i_first, n = self._range_headers.get(id(parent), (i, 0))
+                self._range_headers[id(parent)] = (i_first, n + 1)
+
+    def __contains__(self, tag: Tag) -> bool:
+        """
+        Whether the tag is one of the headers. By identity, instead of comparing the content of the tags.
+        """
+        return id(tag) in self._ids_headers
+
+    def count(self, tag: Union[BeautifulSoup, Tag]) -> int:
+        """
+        Number of headers within the tag.
+        """
+        return self._range_headers.get(id(tag), (0, 0))[1]
+
+    def get_headers(self, tag: Union[BeautifulSoup, Tag]) -> List[Tag]:
+        """
+        Same as get_all_headers(tag)
+        """
+        i_first, n = self._range_headers.get(id(tag), (0, 0))
+        return self.headers[i_first:i_first + n]
+
+
 def get_page_procedure(page_procedure_child: Tag,
                        n_headers_min=2,
                        n_headers_max=None,
-                       get_all_headers=get_all_headers) -> Tag:
+                       get_all_headers=get_all_headers,
+                       header_index: HeaderIndex = None) -> Tag:
     """
     Start from single element and go up untill multiple headers are returned.
 
@@ -27,32 +79,28 @@ def get_page_procedure(page_procedure_child: Tag,
         page_procedure_child:
         n_headers_min: Minimum number of headers to retrieve before returning
         n_headers_max: Maximum number of headers to retrieve before returning
+        get_all_headers: Function that returns all headers within a tag.
+        header_index: (Optional) headers of the document, to reuse.
 
     """
 
-    if n_headers_max is None:
+    if header_index is None:
         soup = page_procedure_child.find_parents()[-1]
-        n_headers_max = len(get_all_headers(soup))
-
-    page_procedure = page_procedure_child.parent
+        header_index = HeaderIndex(soup, get_all_headers=get_all_headers)
 
-    # Check that we can find other headers.
-    headers = get_all_headers(page_procedure)
+    if n_headers_max is None:
+        n_headers_max = len(header_index.headers)
 
-    n_headers = len(headers)
-    if n_headers >= n_headers_min:
-        return page_procedure
+    page_procedure = page_procedure_child.parent
 
-    elif n_headers >= n_headers_max:
-        # Max number found
-        return page_procedure
+    # Go up till we can find other headers.
+    while True:
+        n_headers = header_index.count(page_procedure)
+        if n_headers >= n_headers_min:
+            return page_procedure
 
-    else:
-        # recursively go up
-        return get_page_procedure(page_procedure,
-                                  n_headers_min=n_headers_min,
-                                  n_headers_max=n_headers_max,
-                                  get_all_headers=get_all_headers)
+        elif n_headers >= n_headers_max:
+            # Max number found
+            return page_procedure
 
-    # Fall back, should never reach this.
-    return page_procedure
+        page_procedure = page_procedure.parent
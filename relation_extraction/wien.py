@@ -7,18 +7,8 @@ class WienCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
     San Paolo
     """
 
-    def __init__(self,
-                 pattern_criterion_requirement=r"voraussetzungen(.)*",
-                 pattern_rule=r"allgemeine informationen(.)*",
-                 pattern_evidence=r"erforderliche unterlagen(.)*",
-                 pattern_cost=r"kosten(.)*",
-                 ):
-        super(WienCPSVAPRelationsClassifier, self).__init__(
-            pattern_criterion_requirement=pattern_criterion_requirement,
-            pattern_rule=pattern_rule,
-            pattern_evidence=pattern_evidence,
-            pattern_cost=pattern_cost
-        )
+    # Patterns in regex_classifiers.yml
+    municipality = "Wien"
 
 
 class WienParser(AalterParser):
@@ -4,21 +4,11 @@ from relation_extraction.cities import RegexCPSVAPRelationsClassifier
 
 class ZagrebCPSVAPRelationsClassifier(RegexCPSVAPRelationsClassifier):
     """
-    Austrheim
+    Zagreb
     """
 
-    def __init__(self,
-                 pattern_criterion_requirement=r"(?=x)(?!x)",  # TODO NOT IMPLEMENTED YET
-                 pattern_rule=r"(?=x)(?!x)",  # TODO NOT IMPLEMENTED YET
-                 pattern_evidence=r"(?=x)(?!x)",  # TODO NOT IMPLEMENTED YET
-                 pattern_cost=r"(?=x)(?!x)",  # TODO NOT IMPLEMENTED YET
-                 ):
-        super(ZagrebCPSVAPRelationsClassifier, self).__init__(
-            pattern_criterion_requirement=pattern_criterion_requirement,
-            pattern_rule=pattern_rule,
-            pattern_evidence=pattern_evidence,
-            pattern_cost=pattern_cost
-        )
+    # Patterns in regex_classifiers.yml
+    municipality = "Zagreb"
 
 
 class ZagrebParser(AalterParser):  # CityParser
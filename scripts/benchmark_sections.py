@@ -0,0 +1,81 @@
+import argparse
+import glob
+import os.path
+import time
+from typing import List, Type
+
+from relation_extraction.aalter import AalterParser
+from relation_extraction.austrheim import AustrheimParser
+from relation_extraction.cities import ClassifierCityParser
+from relation_extraction.san_paolo import SanPaoloParser
+from relation_extraction.wien import WienParser
+from relation_extraction.zagreb import ZagrebParser
+
+PARSERS: List[Type[ClassifierCityParser]] = [AalterParser, AustrheimParser, SanPaoloParser, WienParser, ZagrebParser]
+
+DIR_EXAMPLE_FILES = os.path.join(os.path.dirname(__file__), "../tests/relation_extraction/EXAMPLE_FILES")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="benchmark_sections",
+                                     description='Compare the section extraction with BeautifulSoup and with lxml'
+                                                 ' (ClassifierCityParser.use_lxml): speed and identical output.')
+
+    parser.add_argument('directory', nargs='?', default=DIR_EXAMPLE_FILES,
+                        help='Directory with the HTML pages.')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Number of times each page is parsed.')
+
+    return parser
+
+
+def time_parse_page(parser: ClassifierCityParser, html: str, use_lxml: bool, repeat: int):
+    parser.use_lxml = use_lxml
+
+    t = time.perf_counter()
+    for _ in range(repeat):
+        sections = parser.parse_page(html)
+
+    return sections, (time.perf_counter() - t) / repeat
+
+
+def main(directory: str, repeat: int = 5) -> bool:
+    """
+    Returns:
+        True if both give the same sections on every page.
+    """
+
+    filenames = sorted(glob.glob(os.path.join(directory, "*.html")))
+
+    identical = True
+    total_bs4 = total_lxml = 0.
+
+    for parser_class in PARSERS:
+        parser = parser_class()
+
+        for filename in filenames:
+            with open(filename) as f:
+                html = f.read()
+
+            sections_bs4, t_bs4 = time_parse_page(parser, html, False, repeat)
+            sections_lxml, t_lxml = time_parse_page(parser, html, True, repeat)
+
+            total_bs4 += t_bs4
+            total_lxml += t_lxml
+
+            same = sections_bs4 == sections_lxml
+            identical &= same
+
+            print(f"{parser_class.__name__:<16} {os.path.basename(filename)[:50]:<50} "
+                  f"bs4: {t_bs4 * 1000:7.1f} ms - lxml: {t_lxml * 1000:7.1f} ms - {'identical' if same else 'DIFFERENT'}")
+
+    print(f"Total bs4: {total_bs4:.3f} s - lxml: {total_lxml:.3f} s - speed-up: {total_bs4 / max(total_lxml, 1e-9):.1f}x")
+
+    return identical
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+
+    if not main(args.directory, repeat=args.repeat):
+        exit("The sections are different.")
@@ -1,13 +1,21 @@
 import argparse
+import glob
+import json
 import os.path
+import time
 import warnings
-from typing import List, Union
+from concurrent.futures import as_completed, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Union
 
+from pydantic import BaseModel
+
+from c4c_cpsv_ap.connector.hierarchy import CPSV_APGraph
 from data.html import get_html
 from relation_extraction.aalter import AalterParser
 from relation_extraction.austrheim import AustrheimParser
-from relation_extraction.cities import CityParser
+from relation_extraction.cities import CityParser, RegexCityParser, RegexCPSVAPRelationsClassifier
 from relation_extraction.general_classifier import GeneralCityParser
+from relation_extraction.html_parsing.utils import export_jsonl
 from relation_extraction.nova_gorica import NovaGoricaParser
 from relation_extraction.pipeline import RelationExtractor2
 from relation_extraction.san_paolo import SanPaoloParser
@@ -24,13 +32,14 @@ def get_parser():
     parser.add_argument('html',
                         metavar='html',
                         type=str,
-                        help='input filename to read the HTML')
+                        help='input filename to read the HTML. '
+                             'With --batch: a directory, a glob pattern or a JSONL manifest')
 
     parser.add_argument('-o',
                         '--output',
                         metavar='filename',
                         type=str,
-                        help='filename to export as RDF',
+                        help='filename to export as RDF. With --batch --split: directory to export the RDF per page',
                         default=None,
                         required=True)
 
@@ -84,9 +93,60 @@ def get_parser():
                         help="Save the intermediate state of the HTML parsing. (For debugging)",
                         )
 
+    # Batch mode
+    parser.add_argument("--batch",
+                        action="store_true",
+                        default=False,
+                        help="flag to process a whole corpus of HTML pages. "
+                             "Country, language and municipality are used as default for every page.",
+                        )
+
+    parser.add_argument("--workers",
+                        metavar="N",
+                        type=int,
+                        default=None,
+                        help="Number of worker processes for batch mode. Defaults to the number of CPUs.",
+                        )
+
+    parser.add_argument("--split",
+                        action="store_true",
+                        default=False,
+                        help="flag to save one RDF per page (batch mode) instead of a single merged RDF.",
+                        )
+
+    parser.add_argument("--report",
+                        metavar="filename",
+                        type=str,
+                        help="Save the per-page success/failure report of batch mode as JSONL.",
+                        )
+
     return parser
 
 
+class PageJob(BaseModel):
+    """
+    A single page to process in batch mode.
+    """
+    html: str  # filename of the HTML
+    url: Optional[str] = None
+    country: Optional[str] = None
+    language: Optional[str] = None
+    municipality: Optional[str] = None
+
+
+class PageReport(BaseModel):
+    """
+    Outcome of the extraction of a single page in batch mode.
+    """
+    html: str
+    url: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+    n_triples: int = 0
+    duration: float = 0.  # seconds
+    output: Optional[str] = None
+
+
 def extract_cpsv_ap_from_html(filename_html,
                               filename_rdf,
                               context,
@@ -117,6 +177,278 @@ def extract_cpsv_ap_from_html(filename_html,
         0 if successful
     """
 
+    if not os.path.exists(filename_html):
+        warnings.warn(f"Could not find {filename_html}", UserWarning)
+
+    # Get the HTML page
+    try:
+        html = get_html(filename_html)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Could not find HTML file: {filename_html}") from e
+
+    relation_extractor = _get_relation_extractor(html,
+                                                 context=context,
+                                                 country_code=country_code,
+                                                 lang=lang,
+                                                 url=url,
+                                                 extract_concepts=extract_concepts,
+                                                 general=general,
+                                                 filename_html_parsing=filename_html_parsing,
+                                                 translation=translation,
+                                                 verbose=2)
+
+    print("Success")
+
+    # -- Save to RDF --
+    # TODO check if already exists, else, ask for confirmation?
+    if filename_rdf:
+        print(f"Saving to: {filename_rdf}")
+        relation_extractor.export(filename_rdf)
+
+    return 0
+
+
+def extract_cpsv_ap_from_corpus(source: str,
+                                output: str,
+                                context: str,
+                                country_code: str,
+                                lang: str,
+                                extract_concepts: bool = False,
+                                general: bool = False,
+                                translation: Union[str, List[str]] = "EN",
+                                split: bool = False,
+                                workers: int = None,
+                                filename_report: str = None,
+                                ) -> List[PageReport]:
+    """
+    Batch version of *extract_cpsv_ap_from_html*.
+    The pages are distributed over a pool of worker processes, such that the imports and set-up are only paid once
+    per worker instead of once per page.
+
+    Input
+        - source: directory with HTML files, glob pattern or JSONL manifest (see *get_batch_jobs*).
+        - output: filename of the merged RDF, or directory for one RDF per page when *split*.
+        - context, country_code, lang: default values for pages that do not provide them in the manifest.
+        - workers (optional): number of processes. Defaults to the number of CPUs. With 1 worker, the pages are
+            processed in this process.
+        - filename_report (optional): filename to save the per-page report to as JSONL.
+
+    Returns:
+        List with a report per page.
+    """
+
+    jobs = get_batch_jobs(source,
+                          url=None,
+                          country_code=country_code,
+                          lang=lang,
+                          context=context)
+
+    l_filename_rdf = _batch_filenames_rdf(jobs, output) if split else [None] * len(jobs)
+
+    print(f"Batch extraction of {len(jobs)} pages - Start")
+    t0 = time.time()
+
+    graph = CPSV_APGraph()
+    # Keep the order of the input
+    l_report: List[Optional[PageReport]] = [None] * len(jobs)
+
+    # A single worker doesn't need the overhead of a process pool.
+    executor = ThreadPoolExecutor(max_workers=1) if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+
+    with executor:
+        futures = {}
+        for i_job, (job, filename_rdf) in enumerate(zip(jobs, l_filename_rdf)):
+            future = executor.submit(_extract_page,
+                                     job,
+                                     filename_rdf=filename_rdf,
+                                     extract_concepts=extract_concepts,
+                                     general=general,
+                                     translation=translation)
+            futures[future] = i_job
+
+        for i, future in enumerate(as_completed(futures)):
+            report, quads = future.result()
+
+            if quads:
+                graph.addN((s, p, o, graph.get_context(c)) for s, p, o, c in quads)
+
+            print(f"{'Success' if report.success else 'Failed'} {i + 1}/{len(jobs)}: {report.html}")
+            l_report[futures[future]] = report
+
+    if not split:
+        print(f"Saving to: {output}")
+        graph.serialize(output)
+
+    n_success = sum(report.success for report in l_report)
+    t1 = time.time()
+    print(f"Batch extraction - Finish ({t1 - t0:.2f} s): {n_success}/{len(l_report)} successful")
+
+    if filename_report:
+        export_jsonl(l_report, filename_report)
+
+    return l_report
+
+
+def get_batch_jobs(source: str,
+                   url: str = None,
+                   country_code: str = None,
+                   lang: str = None,
+                   context: str = None,
+                   ) -> List[PageJob]:
+    """
+    Collect the pages to process in batch mode.
+
+    Args:
+        source: One of
+            * directory: All *.html files within (recursively).
+            * JSONL manifest: One page per line, e.g.
+                {"html": "page.html", "url": "https://...", "country": "BE", "language": "NL"}
+                Relative paths are relative to the manifest.
+            * glob pattern: e.g. "EXAMPLE_FILES/*aalter*.html"
+        url, country_code, lang, context: Default values for missing fields.
+
+    Returns:
+        List of jobs.
+    """
+
+    def default(job: PageJob) -> PageJob:
+        return PageJob(html=job.html,
+                       url=job.url if job.url is not None else url,
+                       country=job.country if job.country is not None else country_code,
+                       language=job.language if job.language is not None else lang,
+                       municipality=job.municipality if job.municipality is not None else context)
+
+    if os.path.isdir(source):
+        l_filename = sorted(glob.glob(os.path.join(source, "**", "*.html"), recursive=True))
+        jobs = [PageJob(html=filename) for filename in l_filename]
+
+    elif os.path.splitext(source)[-1].lower() == ".jsonl":
+        dirname = os.path.dirname(source)
+
+        jobs = []
+        with open(source, encoding="UTF-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                job = PageJob(**json.loads(line))
+                if not os.path.isabs(job.html):
+                    job.html = os.path.join(dirname, job.html)
+                jobs.append(job)
+
+    else:
+        l_filename = sorted(glob.glob(source, recursive=True))
+        jobs = [PageJob(html=filename) for filename in l_filename]
+
+    if not jobs:
+        warnings.warn(f"Could not find any HTML in {source}", UserWarning)
+
+    return list(map(default, jobs))
+
+
+def _extract_page(job: PageJob,
+                  filename_rdf: str = None,
+                  extract_concepts: bool = False,
+                  general: bool = False,
+                  translation: Union[str, List[str]] = "EN",
+                  ):
+    """
+    Worker of *extract_cpsv_ap_from_corpus*. Never raises, failures are saved in the report.
+
+    Returns:
+        (report, quads of the page). The quads are None when saved to *filename_rdf* or when failed.
+        The context of the quads is returned as identifier, as Graph objects can't be sent between processes.
+    """
+
+    t0 = time.time()
+
+    try:
+        html = get_html(job.html)
+
+        relation_extractor = _get_relation_extractor(html,
+                                                     context=job.municipality,
+                                                     country_code=job.country,
+                                                     lang=job.language,
+                                                     url=job.url,
+                                                     extract_concepts=extract_concepts,
+                                                     general=general,
+                                                     translation=translation,
+                                                     verbose=0)
+
+        graph = relation_extractor.provider.graph
+
+        if filename_rdf:
+            relation_extractor.export(filename_rdf)
+            quads = None
+        else:
+            quads = [(s, p, o, c.identifier) for s, p, o, c in graph.quads()]
+
+    except Exception as e:
+        report = PageReport(html=job.html,
+                            url=job.url,
+                            success=False,
+                            error=f"{type(e).__name__}: {e}",
+                            duration=time.time() - t0)
+        return report, None
+
+    report = PageReport(html=job.html,
+                        url=job.url,
+                        success=True,
+                        n_triples=len(graph),
+                        duration=time.time() - t0,
+                        output=filename_rdf)
+
+    return report, quads
+
+
+def _batch_filenames_rdf(jobs: List[PageJob], dirname: str) -> List[str]:
+    """
+    Output filename of each page when saved separately.
+
+    The subdirectories of the pages (relative to the directory that contains all of them) are kept, such that pages
+    with the same name don't overwrite each other. A page that occurs more than once gets the index of its job.
+
+    Returns:
+        List with an RDF filename per job. Their directories are created.
+    """
+
+    if not jobs:
+        return []
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(job.html)) for job in jobs])
+
+    l_filename_rdf = []
+    for i, job in enumerate(jobs):
+        relpath = os.path.splitext(os.path.relpath(os.path.abspath(job.html), root))[0]
+
+        filename_rdf = os.path.join(dirname, f"{relpath}.rdf")
+        if filename_rdf in l_filename_rdf:
+            filename_rdf = os.path.join(dirname, f"{relpath}_{i}.rdf")
+
+        os.makedirs(os.path.dirname(filename_rdf), exist_ok=True)
+        l_filename_rdf.append(filename_rdf)
+
+    return l_filename_rdf
+
+
+def _get_relation_extractor(html: str,
+                            context: str,
+                            country_code: str,
+                            lang: str,
+                            url: str = None,
+                            extract_concepts: bool = False,
+                            general: bool = False,
+                            filename_html_parsing: str = None,
+                            translation: Union[str, List[str]] = "EN",
+                            verbose=0
+                            ) -> RelationExtractor2:
+    """
+    Shared between single page and batch extraction.
+
+    Returns:
+        RelationExtractor2 after extraction and translation.
+    """
+
     # Cleaning input
     if lang is not None:
         lang = lang.upper()
@@ -127,15 +459,6 @@ def extract_cpsv_ap_from_html(filename_html,
         else:
             translation = [l_i.upper() for l_i in translation]
 
-    if not os.path.exists(filename_html):
-        warnings.warn(f"Could not find {filename_html}", UserWarning)
-
-    # Get the HTML page
-    try:
-        html = get_html(filename_html)
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Could not find HTML file: {filename_html}") from e
-
     def get_parser():
         if not general:
             city_parser = get_municipality_parser(country_code=country_code,
@@ -160,23 +483,30 @@ def extract_cpsv_ap_from_html(filename_html,
                                             )
 
     relation_extractor.extract_all(extract_concepts=extract_concepts,
-                                   verbose=2)
+                                   verbose=verbose)
 
     relation_extractor.translate(translation, source=lang)
 
-    print("Success")
-
-    # -- Save to RDF --
-    # TODO check if already exists, else, ask for confirmation?
-    if filename_rdf:
-        print(f"Saving to: {filename_rdf}")
-        relation_extractor.export(filename_rdf)
-
-    return 0
+    return relation_extractor
 
 
 def main(args: argparse.Namespace):
     """Run the script from args"""
+    if args.batch:
+        l_report = extract_cpsv_ap_from_corpus(source=args.html,
+                                               output=args.output,
+                                               extract_concepts=args.terms,
+                                               context=args.municipality,
+                                               country_code=args.country,
+                                               general=args.general,
+                                               lang=args.language,
+                                               translation=args.translate,
+                                               split=args.split,
+                                               workers=args.workers,
+                                               filename_report=args.report
+                                               )
+        return 0 if all(report.success for report in l_report) else 1
+
     return extract_cpsv_ap_from_html(filename_html=args.html,
                                      filename_rdf=args.output,
                                      extract_concepts=args.terms,
@@ -196,7 +526,7 @@ def get_municipality_parser(country_code: str = "",
     if "AT" == country_code.upper():
         return WienParser()
     elif "BE" == country_code.upper():
-        if "aalter" in url.lower():
+        if "aalter" in (url or "").lower():
             return AalterParser()
     elif "IT" == country_code.upper():
         return SanPaoloParser()
@@ -207,6 +537,11 @@ def get_municipality_parser(country_code: str = "",
     elif country_code.upper() in ["SL", "SI"]:
         return NovaGoricaParser()
 
+    # Municipalities that are only defined in regex_classifiers.yml
+    classifier = RegexCPSVAPRelationsClassifier.from_url(url or "")
+    if classifier is not None:
+        return RegexCityParser(classifier=classifier)
+
 
 if __name__ == '__main__':
     parser = get_parser()
@@ -0,0 +1,166 @@
+"""
+Dynamic micro-batching of the inference requests.
+
+Concurrent requests are queued, collected for a few milliseconds (or until enough texts are collected)
+and predicted in one batch by a worker thread, such that the event loop is never blocked by the model.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Maximum number of texts in a batch and maximum time (in ms) to wait for other requests to join a batch.
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 5))
+
+# Put in the queue to stop the worker thread.
+_STOP = object()
+
+
+class BatcherClosedError(RuntimeError):
+    """
+    Texts are submitted to a closed MicroBatcher.
+    """
+
+
+class MicroBatcher:
+    """
+    Groups the texts of concurrent requests in a single call of the predict function.
+
+    Requests are never split: a request with more texts than max_batch_size is predicted on its own.
+    """
+
+    def __init__(self,
+                 predict: Callable[[List[str]], Sequence],
+                 max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait: float = BATCH_MAX_WAIT_MS / 1000.):
+        """
+
+        Args:
+            predict: Function that predicts a list of texts. Returns one prediction per text, in the same order.
+            max_batch_size: Maximum number of texts in a batch.
+            max_wait: Maximum time (in s) to wait for more requests after the first one arrived.
+        """
+
+        self._predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # Metrics
+        self.n_batches = 0
+        self.n_requests = 0
+        self.n_texts = 0
+
+        self._closed = False
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for prediction.
+
+        Args:
+            texts: List of texts of a single request.
+
+        Returns:
+            Future with the predictions of the texts.
+
+        Raises:
+            BatcherClosedError if the batcher is closed.
+        """
+
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise BatcherClosedError("The batcher is closed.")
+
+            if not texts:
+                future.set_result([])
+            else:
+                self._queue.put((list(texts), future))
+        return future
+
+    async def predict(self, texts: List[str]):
+        """
+        Predict texts, without blocking the event loop.
+
+        Args:
+            texts: List of texts of a single request.
+
+        Returns:
+            The predictions of the texts.
+        """
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def close(self) -> None:
+        """
+        Stop the worker thread, after the already queued requests are handled.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+
+        self._thread.join()
+
+    def _run(self) -> None:
+        item = self._queue.get()
+
+        while item is not _STOP:
+            batch = [item]
+            n_texts = len(item[0])
+
+            # Collect more requests, until the batch is full or the time is up.
+            item = None
+            deadline = time.monotonic() + self.max_wait
+            while n_texts < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+                    break
+
+                if item is _STOP or n_texts + len(item[0]) > self.max_batch_size:
+                    # Handled after this batch.
+                    break
+
+                batch.append(item)
+                n_texts += len(item[0])
+                item = None
+
+            self._predict_batch(batch)
+
+            if item is None:
+                item = self._queue.get()
+
+    def _predict_batch(self, batch: List[Tuple[List[str], Future]]) -> None:
+        # Requests that were cancelled in the meantime don't have to be predicted.
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        l_text = [text for texts, _ in batch for text in texts]
+
+        try:
+            predictions = self._predict(l_text)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.n_batches += 1
+        self.n_requests += len(batch)
+        self.n_texts += len(l_text)
+
+        i = 0
+        for texts, future in batch:
+            future.set_result(predictions[i:i + len(texts)])
+            i += len(texts)
@@ -1,32 +1,63 @@
+import asyncio
 import os
 import warnings
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 
 from BERT_classifier.app.models import Labels, Results, ResultsLines, Text, TextLines
-from BERT_classifier.bert_based_classifier.trainer_bert_sequence_classifier import TrainerBertSequenceClassifier
+from BERT_classifier.app.registry import DIRNAME_ONNX, HostedModel, load_classifier, ModelRegistry, parse_models
 
 # See Dockerfile for file.
 path_model = "/tmp/app_model"
 
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", os.path.join(path_model, DIRNAME_ONNX))
+
+# Models served at /models/{name}/..., as comma separated name=path.
+BERT_MODELS = os.environ.get("BERT_MODELS")
+# Model served at /classify_text, /classify_text_lines and /labels.
+DEFAULT_MODEL = os.environ.get("DEFAULT_MODEL", "default")
+
+model_dirs = parse_models(BERT_MODELS)
+model_dirs.setdefault(DEFAULT_MODEL, path_model)
+
+# Models loaded (and warmed up) at startup, before the service reports to be ready. Comma separated names.
+PRELOAD_MODELS = [name.strip() for name in os.environ.get("PRELOAD_MODELS", DEFAULT_MODEL).split(",")
+                  if name.strip() in model_dirs]
+
 # Sanity check
-if not os.path.exists(path_model):
-    warnings.warn(f"Could not find {path_model}")
-else:
-    if not os.listdir(path_model):
-        warnings.warn(f"Dir is empty: {path_model}")
+for path in model_dirs.values():
+    if not os.path.exists(path):
+        warnings.warn(f"Could not find {path}")
+    else:
+        if not os.listdir(path):
+            warnings.warn(f"Dir is empty: {path}")
 
-# load the model:
 
-trainer_bert_sequence_classifier = TrainerBertSequenceClassifier(
-    pretrained_model_name_or_path=path_model,
-    preprocessed_data_dir=None,
-    output_dir=os.path.dirname(__file__)
-)
+def load(path: str):
+    return load_classifier(path, onnx_model_dir=ONNX_MODEL_DIR if path == path_model else None)
+
+
+# The models are loaded at startup (PRELOAD_MODELS) or on first use.
+registry = ModelRegistry(model_dirs, load=load)
+
+# Loading of PRELOAD_MODELS, see */ready*
+preloading: asyncio.Future = None
 
 app = FastAPI()
 
 
+@app.on_event("startup")
+async def startup():
+    global preloading
+    # In the background, such that the service can already report that it is not ready yet.
+    preloading = asyncio.get_event_loop().run_in_executor(None, registry.preload, PRELOAD_MODELS)
+
+
+@app.on_event("shutdown")
+def shutdown():
+    registry.close()
+
+
 @app.get("/")
 async def hello():
     return {"msg": "BERT Classifier API"}
@@ -44,14 +75,7 @@ async def classify_text(text: Text) -> Results:
     Returns:
 
     """
-    _, probabilities = trainer_bert_sequence_classifier.predict([text.text])
-
-    labels = (await get_labels())
-
-    results = Results(probabilities=probabilities[0].tolist(),
-                      **labels.dict())
-
-    return results
+    return await classify_text_model(DEFAULT_MODEL, text)
 
 
 @app.post("/classify_text_lines", response_model=ResultsLines)
@@ -66,14 +90,7 @@ async def classify_text_lines(text: TextLines) -> ResultsLines:
     Returns:
 
     """
-    _, probabilities = trainer_bert_sequence_classifier.predict(text.text)
-
-    labels = (await get_labels())
-
-    results = ResultsLines(probabilities=probabilities.tolist(),
-                           **labels.dict())
-
-    return results
+    return await classify_text_lines_model(DEFAULT_MODEL, text)
 
 
 # @lru_cache(maxsize=1)
@@ -85,14 +102,87 @@ async def get_labels() -> Labels:
     Returns:
 
     """
+    return await get_labels_model(DEFAULT_MODEL)
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness: whether the preloaded models are loaded and warmed up.
+    Returns 503 while they are loading, or if the loading failed.
+
+    Returns:
+
+    """
+    if preloading is None or not preloading.done():
+        raise HTTPException(status_code=503, detail="Loading the models.")
+
+    if preloading.exception() is not None:
+        raise HTTPException(status_code=503, detail=f"Could not load the models: {preloading.exception()}")
+
+    return {"ready": True,
+            "models": [name for name in registry.names if registry.is_loaded(name)]}
+
+
+@app.get("/models")
+async def get_models():
+    """
+    Get the hosted models and whether they are loaded.
+
+    Returns:
+
+    """
+    return {"models": [{"name": name, "loaded": registry.is_loaded(name)} for name in registry.names]}
+
+
+@app.get("/models/{name}")
+async def hello_model(name: str):
+    check_model(name)
+    return {"msg": f"BERT Classifier API - {name}"}
+
+
+@app.post("/models/{name}/classify_text", response_model=Results)
+async def classify_text_model(name: str, text: Text) -> Results:
+    """
+    Same as */classify_text*, with the model *name*.
+    """
+    check_model(name)
+
+    labels, probabilities = await registry.predict(name, [text.text])
 
-    if not hasattr(trainer_bert_sequence_classifier, 'model'):
-        trainer_bert_sequence_classifier.load_model()
+    results = Results(probabilities=probabilities[0].tolist(),
+                      **labels.dict())
+
+    return results
+
+
+@app.post("/models/{name}/classify_text_lines", response_model=ResultsLines)
+async def classify_text_lines_model(name: str, text: TextLines) -> ResultsLines:
+    """
+    Same as */classify_text_lines*, with the model *name*.
+    """
+    check_model(name)
+
+    labels, probabilities = await registry.predict(name, text.text)
+
+    results = ResultsLines(probabilities=[p.tolist() for p in probabilities],
+                           **labels.dict())
+
+    return results
+
+
+@app.get("/models/{name}/labels", response_model=Labels)
+async def get_labels_model(name: str) -> Labels:
+    """
+    Same as */labels*, with the model *name*.
+    """
+    check_model(name)
 
-    d = trainer_bert_sequence_classifier.model.config.eurovoc_concept_2_id
+    hosted_model: HostedModel = await registry.get_async(name)
 
-    d_inverse = {int(label_id): label_name for label_name, label_id in d.items()}
+    return hosted_model.labels
 
-    names = [d_inverse[i] for i in range(len(d_inverse))]
 
-    return Labels(names=names)
+def check_model(name: str):
+    if name not in registry.model_dirs:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
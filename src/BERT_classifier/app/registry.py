@@ -0,0 +1,276 @@
+"""
+Several named models hosted in one process.
+
+Models are loaded on first use. At most MAX_LOADED_MODELS are kept in memory: the least recently used model is
+unloaded when another one has to be loaded.
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from BERT_classifier.app.batching import BatcherClosedError, MicroBatcher
+from BERT_classifier.app.models import Labels
+
+# Inference backend: "torch" or "onnx" (see export_onnx_bert.py to export the model).
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+BERT_BACKEND = os.environ.get("BERT_BACKEND", BACKEND_TORCH).lower()
+
+# Subdirectory of a model with its ONNX export.
+DIRNAME_ONNX = "onnx"
+
+# Maximum number of models in memory.
+MAX_LOADED_MODELS = int(os.environ.get("MAX_LOADED_MODELS", 2))
+
+WARM_UP_TEXT = "Warm-up of the model."
+
+
+def parse_models(s: Optional[str]) -> Dict[str, str]:
+    """
+    Parse the hosted models from the environment.
+
+    Args:
+        s: Comma separated name=path, e.g. "relations=/models/relations,titles=/models/titles"
+
+    Returns:
+        Dictionary name -> path of the model.
+    """
+    d = {}
+    for item in (s or "").split(","):
+        if not item.strip():
+            continue
+        name, path = item.split("=", 1)
+        d[name.strip()] = path.strip()
+    return d
+
+
+def load_classifier(path_model: str, backend: str = BERT_BACKEND, onnx_model_dir: str = None):
+    """
+    Load a classifier of the backend, with a predict_fast method and a config.
+
+    Args:
+        path_model: Path to the trained (PyTorch) model.
+        backend: "torch" or "onnx".
+        onnx_model_dir: Path to the ONNX model, by default the onnx subdirectory of path_model.
+
+    Returns:
+        TrainerBertSequenceClassifier or OnnxSequenceClassifier
+    """
+
+    if backend == BACKEND_ONNX:
+        from BERT_classifier.bert_based_classifier.onnx_sequence_classifier import OnnxSequenceClassifier
+
+        return OnnxSequenceClassifier(onnx_model_dir or os.path.join(path_model, DIRNAME_ONNX))
+
+    elif backend == BACKEND_TORCH:
+        from BERT_classifier.bert_based_classifier.trainer_bert_sequence_classifier import \
+            TrainerBertSequenceClassifier
+
+        classifier = TrainerBertSequenceClassifier(pretrained_model_name_or_path=path_model,
+                                                   preprocessed_data_dir=None,
+                                                   output_dir=os.path.dirname(__file__))
+        classifier.load_model()
+        # Same interface as OnnxSequenceClassifier
+        classifier.config = classifier.model.config
+        return classifier
+
+    raise ValueError(f"Unknown backend: {backend}. Expected one of {[BACKEND_TORCH, BACKEND_ONNX]}")
+
+
+def get_labels_config(config) -> Labels:
+    """
+    Get the labels, in the order of the probabilities, from the config of the model.
+    """
+
+    d = config.eurovoc_concept_2_id
+
+    d_inverse = {int(label_id): label_name for label_name, label_id in d.items()}
+
+    names = [d_inverse[i] for i in range(len(d_inverse))]
+
+    return Labels(names=names)
+
+
+class HostedModel:
+    """
+    A loaded model with its labels and the batcher of its requests.
+    """
+
+    def __init__(self, name: str, classifier):
+        self.name = name
+        self.classifier = classifier
+        self.labels = get_labels_config(classifier.config)
+
+        # Concurrent requests are predicted together, in a worker thread.
+        self.batcher = MicroBatcher(self._predict_probabilities)
+
+    def warm_up(self):
+        """
+        A first forward pass, such that the first request doesn't pay for the lazy initialisations of the runtime.
+        """
+        self._predict_probabilities([WARM_UP_TEXT])
+
+    def _predict_probabilities(self, texts: List[str]):
+        _, probabilities = self.classifier.predict_fast(texts)
+        return probabilities
+
+    def close(self):
+        self.batcher.close()
+
+
+class ModelRegistry:
+    """
+    Named models, loaded on first use, with at most max_loaded models in memory.
+
+    A model is loaded (and warmed up) outside the lock of the registry, such that requests for the other models are
+    not blocked in the meantime. Concurrent requests for a model that is being loaded wait for that same load.
+    """
+
+    def __init__(self, model_dirs: Dict[str, str], max_loaded: int = MAX_LOADED_MODELS,
+                 load=load_classifier, warm_up: bool = True):
+        """
+
+        Args:
+            model_dirs: Dictionary name -> path of the model.
+            max_loaded: Maximum number of models in memory.
+            load: Function to load the classifier, given its path.
+            warm_up: Do a forward pass after loading a model.
+        """
+
+        self.model_dirs = dict(model_dirs)
+        self.max_loaded = max_loaded
+        self.warm_up = warm_up
+        self._load = load
+
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, HostedModel] = OrderedDict()
+        # Models that are being loaded.
+        self._loading: Dict[str, Future] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.model_dirs)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def get(self, name: str) -> HostedModel:
+        """
+        Get a model, load it if needed.
+
+        Args:
+            name: Name of the model.
+
+        Returns:
+            HostedModel
+
+        Raises:
+            KeyError if the model is unknown.
+        """
+
+        path_model = self.model_dirs[name]
+
+        with self._lock:
+            hosted_model = self._loaded.get(name)
+            if hosted_model is not None:
+                self._loaded.move_to_end(name)
+                return hosted_model
+
+            future = self._loading.get(name)
+            is_loader = future is None
+            if is_loader:
+                future = self._loading[name] = Future()
+                # Unload the least recently used models first, to limit the peak memory.
+                l_evicted = self._pop_least_recently_used(len(self._loading))
+
+        if not is_loader:
+            # Raises the exception of the load if it failed.
+            return future.result()
+
+        self._close_all(l_evicted)
+
+        try:
+            hosted_model = HostedModel(name, self._load(path_model))
+            if self.warm_up:
+                hosted_model.warm_up()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[name]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[name]
+            # Other models could have been loaded in the meantime.
+            l_evicted = self._pop_least_recently_used(1)
+            self._loaded[name] = hosted_model
+
+        self._close_all(l_evicted)
+        future.set_result(hosted_model)
+
+        return hosted_model
+
+    def _pop_least_recently_used(self, n_new: int) -> List[HostedModel]:
+        """
+        Remove the least recently used models, to make room for n_new models. Call while holding the lock.
+        """
+        l_evicted = []
+        while self._loaded and len(self._loaded) + n_new > self.max_loaded:
+            _, evicted = self._loaded.popitem(last=False)
+            l_evicted.append(evicted)
+        return l_evicted
+
+    @staticmethod
+    def _close_all(hosted_models: List[HostedModel]) -> None:
+        # Outside the lock, as closing waits for the requests that are already queued.
+        for hosted_model in hosted_models:
+            hosted_model.close()
+
+    def preload(self, names: List[str]) -> None:
+        """
+        Load (and warm up) models before they are requested.
+
+        Args:
+            names: Names of the models. Only the last max_loaded stay in memory.
+        """
+        for name in names:
+            self.get(name)
+
+    async def get_async(self, name: str) -> HostedModel:
+        """
+        Same as get, but loads the model without blocking the event loop.
+        """
+
+        return await asyncio.get_event_loop().run_in_executor(None, self.get, name)
+
+    async def predict(self, name: str, texts: List[str]):
+        """
+        Predict the probabilities of the texts with a model.
+
+        Args:
+            name: Name of the model.
+            texts: List of texts.
+
+        Returns:
+            The labels of the model and the probabilities of the texts.
+        """
+
+        while True:
+            hosted_model = await self.get_async(name)
+            try:
+                return hosted_model.labels, await hosted_model.batcher.predict(texts)
+            except BatcherClosedError:
+                # Unloaded in the meantime.
+                continue
+
+    def close(self):
+        with self._lock:
+            l_hosted_models = list(self._loaded.values())
+            self._loaded.clear()
+
+        self._close_all(l_hosted_models)
+
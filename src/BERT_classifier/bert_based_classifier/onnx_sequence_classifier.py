@@ -0,0 +1,218 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import onnxruntime
+import torch
+from numpy import ndarray
+from onnxruntime.quantization import quantize_dynamic, QuantType
+from transformers import AutoConfig, AutoTokenizer
+
+from BERT_classifier.bert_based_classifier.trainer_bert_sequence_classifier import get_padded_batches, \
+    TrainerBertSequenceClassifier
+
+FILENAME_ONNX = "model.onnx"
+FILENAME_ONNX_QUANTIZED = "model.quant.onnx"
+# Result of the parity check of each ONNX model, see save_parity.
+FILENAME_PARITY = "parity.json"
+
+INPUT_NAMES = ['input_ids', 'attention_mask']
+OUTPUT_NAMES = ['logits']
+
+
+def export_onnx(model_dir: Union[str, Path], output_dir: Union[str, Path], quantize: bool = False,
+                opset_version: int = 12) -> str:
+    '''
+    Export a trained BertForSequenceClassification model (see TrainerBertSequenceClassifier) to ONNX.
+
+    The config and tokenizer are saved next to the ONNX model, such that output_dir can be loaded
+    with OnnxSequenceClassifier without the PyTorch checkpoint, once the parity is checked (see save_parity).
+
+    :param model_dir: Path to the trained model.
+    :param output_dir: Path to save the ONNX model.
+    :param quantize: Boolean. If true, the weights are (dynamically) quantized to int8.
+    :param opset_version: int. ONNX opset.
+    :return: filename of the ONNX model to serve.
+    '''
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # The parity of a previous export doesn't hold for the new one.
+    filename_parity = os.path.join(output_dir, FILENAME_PARITY)
+    if os.path.exists(filename_parity):
+        os.remove(filename_parity)
+
+    trainer = TrainerBertSequenceClassifier(model_dir, None, output_dir)
+    trainer.load_model()
+    trainer.model.eval()
+
+    class Logits(torch.nn.Module):
+        '''
+        Only the logits as output (instead of a ModelOutput), with the inputs as positional arguments.
+        '''
+
+        def __init__(self, model):
+            super(Logits, self).__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids, attention_mask=attention_mask)[0]
+
+    _, input_ids, attention_mask = next(get_padded_batches(trainer.tokenizer, ["Export to ONNX."], batch_size=1))
+
+    filename = os.path.join(output_dir, FILENAME_ONNX)
+
+    with torch.no_grad():
+        torch.onnx.export(Logits(trainer.model),
+                          (torch.from_numpy(input_ids), torch.from_numpy(attention_mask)),
+                          filename,
+                          input_names=INPUT_NAMES,
+                          output_names=OUTPUT_NAMES,
+                          dynamic_axes={'input_ids': {0: 'batch', 1: 'sequence'},
+                                        'attention_mask': {0: 'batch', 1: 'sequence'},
+                                        'logits': {0: 'batch'}},
+                          opset_version=opset_version)
+
+    trainer.model.config.save_pretrained(output_dir)
+    trainer.tokenizer.save_pretrained(output_dir)
+
+    if quantize:
+        filename_quantized = os.path.join(output_dir, FILENAME_ONNX_QUANTIZED)
+        quantize_dynamic(filename, filename_quantized, weight_type=QuantType.QInt8)
+
+        return filename_quantized
+
+    return filename
+
+
+class OnnxSequenceClassifier():
+    '''
+    Inference with an ONNX model exported with export_onnx, with ONNX Runtime on CPU.
+    Same interface as TrainerBertSequenceClassifier.predict_fast.
+
+    Only models that passed the parity check with the PyTorch model (see save_parity) are loaded.
+    '''
+
+    def __init__(self, model_dir: Union[str, Path], quantized: Union[bool, type(None)] = None,
+                 require_parity: bool = True):
+        '''
+        :param model_dir: Path to the output_dir of export_onnx.
+        :param quantized: Boolean. Load the quantized model. By default, the quantized model if it exists.
+        :param require_parity: Boolean. If true, raise a ValueError if the model didn't pass the parity check.
+            Only disable to check the parity itself.
+        :return: None.
+        '''
+
+        if quantized is None:
+            quantized = os.path.exists(os.path.join(model_dir, FILENAME_ONNX_QUANTIZED))
+
+        self.filename = os.path.join(model_dir, FILENAME_ONNX_QUANTIZED if quantized else FILENAME_ONNX)
+
+        if require_parity:
+            parity = load_parity(model_dir).get(os.path.basename(self.filename))
+            if parity is None or not parity['passed']:
+                raise ValueError(f"{self.filename} did not pass the parity check with the PyTorch model "
+                                 f"({FILENAME_PARITY}: {parity}), export it with export_onnx_bert.py.")
+
+        self.config = AutoConfig.from_pretrained(model_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        self.session = onnxruntime.InferenceSession(self.filename, providers=['CPUExecutionProvider'])
+
+    def predict_fast(self, documents: List[str], batch_size: int = 32, gpu: int = 0) -> Tuple[ndarray, ndarray]:
+        '''
+        :param documents: List of strings
+        :param batch_size: int.
+        :param gpu. int. Ignored, inference is done on CPU.
+        :return: Tuple with the predicted labels and the probabilities, in the order of the documents.
+        '''
+
+        preds_proba = np.empty((len(documents), self.config.num_labels), np.float32)
+
+        if len(documents):
+            for idx, input_ids, attention_mask in get_padded_batches(self.tokenizer, documents, batch_size):
+                logits, = self.session.run(OUTPUT_NAMES, {'input_ids': input_ids, 'attention_mask': attention_mask})
+
+                preds_proba[idx] = 1. / (1. + np.exp(-logits))
+
+        preds_labels = (preds_proba >= self.config.threshold) * 1
+
+        return preds_labels, preds_proba
+
+
+def check_parity(documents: List[str], model_dir: Union[str, Path], onnx_model_dir: Union[str, Path],
+                 quantized: Union[bool, type(None)] = None, batch_size: int = 32) -> Dict[str, float]:
+    '''
+    Compare the predictions (and the speed) of the ONNX model with those of the PyTorch model.
+
+    :param documents: List of strings. E.g. the validation set.
+    :param model_dir: Path to the trained (PyTorch) model.
+    :param onnx_model_dir: Path to the exported ONNX model.
+    :param quantized: Boolean. Compare with the quantized model. By default, the quantized model if it exists.
+    :param batch_size: int.
+    :return: Dict with the maximum and mean absolute difference of the probabilities, the fraction of
+        identically predicted labels and the inference time of both backends.
+    '''
+
+    trainer = TrainerBertSequenceClassifier(model_dir, None, onnx_model_dir)
+    trainer.load_model()
+    onnx_classifier = OnnxSequenceClassifier(onnx_model_dir, quantized=quantized, require_parity=False)
+
+    t = time.perf_counter()
+    preds_labels, preds_proba = trainer.predict_fast(documents, batch_size=batch_size)
+    time_torch = time.perf_counter() - t
+
+    t = time.perf_counter()
+    preds_labels_onnx, preds_proba_onnx = onnx_classifier.predict_fast(documents, batch_size=batch_size)
+    time_onnx = time.perf_counter() - t
+
+    diff = np.abs(preds_proba - preds_proba_onnx)
+
+    return {'max_abs_diff': float(diff.max(initial=0.)),
+            'mean_abs_diff': float(diff.mean()) if diff.size else 0.,
+            'label_agreement': float(np.mean(preds_labels == preds_labels_onnx)) if diff.size else 1.,
+            'time_torch': time_torch,
+            'time_onnx': time_onnx}
+
+
+def load_parity(onnx_model_dir: Union[str, Path]) -> Dict[str, dict]:
+    '''
+    :param onnx_model_dir: Path to the exported ONNX model.
+    :return: Dict with the parity (see save_parity) per ONNX model filename. Empty if the parity was never checked.
+    '''
+
+    filename_parity = os.path.join(onnx_model_dir, FILENAME_PARITY)
+    if not os.path.exists(filename_parity):
+        return {}
+
+    with open(filename_parity) as f:
+        return json.load(f)
+
+
+def save_parity(parity: Dict[str, float], onnx_model_dir: Union[str, Path], quantized: bool = False,
+                min_label_agreement: float = .99) -> bool:
+    '''
+    Save the result of check_parity next to the ONNX model, such that OnnxSequenceClassifier only loads
+    models that passed.
+
+    :param parity: Dict returned by check_parity.
+    :param onnx_model_dir: Path to the exported ONNX model.
+    :param quantized: Boolean. The parity is of the quantized model.
+    :param min_label_agreement: float. Minimum fraction of identically predicted labels to pass the parity check.
+    :return: Boolean. True if the parity check passed.
+    '''
+
+    passed = parity['label_agreement'] >= min_label_agreement
+
+    d_parity = load_parity(onnx_model_dir)
+    d_parity[FILENAME_ONNX_QUANTIZED if quantized else FILENAME_ONNX] = {**parity,
+                                                                         'min_label_agreement': min_label_agreement,
+                                                                         'passed': passed}
+
+    with open(os.path.join(onnx_model_dir, FILENAME_PARITY), 'w') as f:
+        json.dump(d_parity, f, indent=2)
+
+    return passed
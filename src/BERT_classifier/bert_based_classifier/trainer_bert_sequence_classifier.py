@@ -6,7 +6,7 @@ import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterator, List, Tuple, Union
 
 import numpy as np
 import torch
@@ -25,6 +25,37 @@ os.environ["TOKENIZERS_PARALLELISM"] = "true"
 INPUT_KEY = "text"
 
 
+def get_padded_batches(tokenizer, documents: List[str],
+                       batch_size: int) -> Iterator[Tuple[List[int], ndarray, ndarray]]:
+    '''
+    Tokenize the documents at once and group them by length, such that each batch is padded to its longest document.
+
+    :param tokenizer: (fast) tokenizer of the model.
+    :param documents: List of strings
+    :param batch_size: int.
+    :return: Generator of (indices of the documents, input_ids, attention_mask) per batch.
+    '''
+
+    l_input_ids = tokenizer(list(documents), truncation=True, padding=False,
+                            return_attention_mask=False, return_token_type_ids=False)['input_ids']
+
+    order = sorted(range(len(l_input_ids)), key=lambda i: len(l_input_ids[i]))
+
+    pad_token_id = tokenizer.pad_token_id or 0
+
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+
+        max_length = len(l_input_ids[idx[-1]])
+        input_ids = np.full((len(idx), max_length), pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(idx), max_length), dtype=np.int64)
+        for j, i in enumerate(idx):
+            input_ids[j, :len(l_input_ids[i])] = l_input_ids[i]
+            attention_mask[j, :len(l_input_ids[i])] = 1
+
+        yield idx, input_ids, attention_mask
+
+
 class TrainerBertSequenceClassifier():
     '''
     A trainer for a BertForSequenceClassification model.
@@ -455,7 +486,7 @@ class TrainerBertSequenceClassifier():
         # Define dataloaders...
         test_dataloader = DataLoader(dataset, shuffle=False, batch_size=batch_size)
 
-        preds_proba = np.empty((0, self.model.config.num_labels), np.float32)
+        l_preds_proba = [np.empty((0, self.model.config.num_labels), np.float32)]
 
         activation = torch.nn.Sigmoid()
 
@@ -471,7 +502,9 @@ class TrainerBertSequenceClassifier():
             with torch.no_grad():
                 outputs = self.model(input_ids, attention_mask=attention_mask)
 
-            preds_proba = np.append(preds_proba, activation(outputs[0]).to('cpu').numpy(), axis=0)
+            l_preds_proba.append(activation(outputs[0]).to('cpu').numpy())
+
+        preds_proba = np.concatenate(l_preds_proba, axis=0)
 
         threshold = self.model.config.threshold
 
@@ -479,6 +512,46 @@ class TrainerBertSequenceClassifier():
 
         return preds_labels, preds_proba
 
+    def predict_fast(self, documents: List[str], batch_size: int = 32, gpu: int = 0) -> Tuple[ndarray, ndarray]:
+        '''
+        Inference for serving: same output as predict, without the overhead of building a dataset.
+
+        The documents are tokenized at once with the (fast) tokenizer and sorted by length, such that each batch
+        is padded to the length of its longest document only.
+
+        :param documents: List of strings
+        :param batch_size: int.
+        :param gpu. int.
+        :return: Tuple with the predicted labels and the probabilities, in the order of the documents.
+        '''
+
+        if not hasattr(self, 'model') or not hasattr(self, 'tokenizer'):
+            self._logger.info(
+                f"Loading  model finetuned for classification task from {self._pretrained_model_name_or_path}")
+            self.load_model()
+
+        device = torch.device(f'cuda:{gpu}') if torch.cuda.is_available() else torch.device('cpu')
+
+        if self.model.training or self.model.device != device:
+            self.model.eval()
+            self.model.to(device)
+
+        preds_proba = np.empty((len(documents), self.model.config.num_labels), np.float32)
+        if not len(documents):
+            return preds_proba.astype(int), preds_proba
+
+        # torch.inference_mode is only available as of torch 1.9.
+        with getattr(torch, 'inference_mode', torch.no_grad)():
+            for idx, input_ids, attention_mask in get_padded_batches(self.tokenizer, documents, batch_size):
+                outputs = self.model(torch.from_numpy(input_ids).to(device),
+                                     attention_mask=torch.from_numpy(attention_mask).to(device))
+
+                preds_proba[idx] = torch.sigmoid(outputs[0]).to('cpu').numpy()
+
+        preds_labels = (preds_proba >= self.model.config.threshold) * 1
+
+        return preds_labels, preds_proba
+
     def load_model(self, num_labels: Union[int, type(None)] = None,
                    eurovoc_concept_2_id: Union[Dict[str, int], type(None)] = None):
 
@@ -0,0 +1,56 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Union
+
+from BERT_classifier.bert_based_classifier.onnx_sequence_classifier import check_parity, export_onnx, save_parity
+
+
+def read_texts(filename: Union[str, Path]) -> List[str]:
+    with open(filename) as f:
+        return [json.loads(line)['text'] for line in f if line.strip()]
+
+
+def main(model_dir: Union[str, Path], output_dir: Union[str, Path], parity_file: Union[str, Path],
+         quantize: bool = False, min_label_agreement: float = .99) -> bool:
+    '''
+    Export a fine tuned model for sequence classification to ONNX, and check the parity with the PyTorch model.
+    The result of the parity check is saved next to the ONNX model, which can only be loaded if it passed.
+
+    :param model_dir: Path to the trained model.
+    :param output_dir: Path to save the ONNX model.
+    :param parity_file: jsonl file with a 'text' field, e.g. the validation set, to check the parity.
+    :param quantize: Boolean. If true, the weights are (dynamically) quantized to int8.
+    :param min_label_agreement: float. Minimum fraction of identically predicted labels to pass the parity check.
+    :return: Boolean. True if the parity check passed.
+    '''
+
+    filename = export_onnx(model_dir, output_dir, quantize=quantize)
+    print(f"Exported to {filename}")
+
+    parity = check_parity(read_texts(parity_file), model_dir, output_dir, quantized=quantize)
+    print(json.dumps(parity, indent=2))
+
+    return save_parity(parity, output_dir, quantized=quantize, min_label_agreement=min_label_agreement)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--model_dir", dest="model_dir",
+                        help="path to the trained model", required=True)
+    parser.add_argument("--output_dir", dest="output_dir",
+                        help="path to save the ONNX model", required=True)
+    parser.add_argument("--quantize", dest="quantize", action="store_true",
+                        help="dynamic int8 quantization of the weights")
+    parser.add_argument("--parity_file", dest="parity_file",
+                        help="jsonl file with texts to compare the ONNX and PyTorch predictions", required=True)
+    parser.add_argument("--min_label_agreement", dest="min_label_agreement", type=float, default=.99,
+                        help="minimum fraction of identical labels to pass the parity check")
+
+    args = parser.parse_args()
+
+    if not main(args.model_dir, args.output_dir, args.parity_file, quantize=args.quantize,
+                min_label_agreement=args.min_label_agreement):
+        sys.exit("Parity check failed")
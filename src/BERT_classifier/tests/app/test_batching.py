@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from BERT_classifier.app.batching import MicroBatcher
+
+
+class PredictRecorder:
+    """
+    Predicts the length of the texts and records the batches.
+    """
+
+    def __init__(self, delay: float = 0.):
+        self.delay = delay
+        self.l_batch = []
+
+    def __call__(self, texts):
+        self.l_batch.append(list(texts))
+        time.sleep(self.delay)
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_concurrent_requests(self):
+        predict = PredictRecorder()
+        batcher = MicroBatcher(predict, max_batch_size=32, max_wait=.1)
+
+        async def main():
+            return await asyncio.gather(*(batcher.predict(["a" * i, "b" * i]) for i in range(1, 11)))
+
+        l_probabilities = asyncio.run(main())
+        batcher.close()
+
+        with self.subTest("Results are scattered back"):
+            for i, probabilities in enumerate(l_probabilities, 1):
+                self.assertListEqual([[i], [i]], probabilities.tolist())
+
+        with self.subTest("Single batch"):
+            self.assertEqual(1, len(predict.l_batch))
+            self.assertEqual(20, len(predict.l_batch[0]))
+
+    def test_max_batch_size(self):
+        predict = PredictRecorder(delay=.05)
+        batcher = MicroBatcher(predict, max_batch_size=4, max_wait=.1)
+
+        futures = [batcher.submit(["a", "bb", "ccc"]) for _ in range(3)]
+        l_probabilities = [future.result(timeout=5) for future in futures]
+        batcher.close()
+
+        with self.subTest("Requests are not split"):
+            self.assertListEqual([["a", "bb", "ccc"]] * 3, predict.l_batch)
+
+        with self.subTest("Results"):
+            for probabilities in l_probabilities:
+                self.assertListEqual([[1], [2], [3]], probabilities.tolist())
+
+    def test_exception(self):
+        def predict(texts):
+            raise ValueError(texts)
+
+        batcher = MicroBatcher(predict)
+
+        with self.assertRaises(ValueError):
+            batcher.submit(["a"]).result(timeout=5)
+
+        with self.subTest("Worker still running"):
+            batcher._predict = PredictRecorder()
+            self.assertListEqual([[1]], batcher.submit(["a"]).result(timeout=5).tolist())
+
+        batcher.close()
+
+    def test_event_loop_not_blocked(self):
+        predict = PredictRecorder(delay=.2)
+        batcher = MicroBatcher(predict, max_wait=0)
+
+        async def main():
+            task = asyncio.ensure_future(batcher.predict(["a"]))
+            t = time.monotonic()
+            await asyncio.sleep(.01)
+            dt = time.monotonic() - t
+            await task
+            return dt
+
+        self.assertLess(asyncio.run(main()), .1)
+        batcher.close()
+
+        with self.subTest("Closed"):
+            self.assertNotIn(batcher._thread, threading.enumerate())
+
+
+if __name__ == '__main__':
+    unittest.main()
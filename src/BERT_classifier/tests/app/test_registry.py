@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from BERT_classifier.app.registry import ModelRegistry, parse_models
+
+
+class FakeClassifier:
+    """
+    Predicts the index of its model for each text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.config = SimpleNamespace(eurovoc_concept_2_id={"rule": 1, "cost": 0})
+        self.l_documents = []
+
+    def predict_fast(self, documents):
+        self.l_documents.append(list(documents))
+        preds_proba = np.full((len(documents), 2), float(self.path[-1]), np.float32)
+        return preds_proba >= .5, preds_proba
+
+
+class FakeLoader:
+    def __init__(self):
+        self.l_loaded = []
+
+    def __call__(self, path: str):
+        self.l_loaded.append(path)
+        return FakeClassifier(path)
+
+
+class BlockingLoader(FakeLoader):
+    """
+    Waits with loading a path until it is released.
+    """
+
+    def __init__(self, path_blocked: str):
+        super().__init__()
+        self.path_blocked = path_blocked
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, path: str):
+        if path == self.path_blocked:
+            self.started.set()
+            self.released.wait(timeout=10)
+        return super().__call__(path)
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loader = FakeLoader()
+        self.registry = ModelRegistry({"a": "/models/0", "b": "/models/1", "c": "/models/2"},
+                                      max_loaded=2,
+                                      load=self.loader)
+
+    def tearDown(self) -> None:
+        self.registry.close()
+
+    def test_lazy(self):
+        with self.subTest("Nothing loaded"):
+            self.assertListEqual([], self.loader.l_loaded)
+
+        hosted_model = self.registry.get("b")
+        self.registry.get("b")
+
+        with self.subTest("Loaded once"):
+            self.assertListEqual(["/models/1"], self.loader.l_loaded)
+
+        with self.subTest("Labels"):
+            self.assertListEqual(["cost", "rule"], hosted_model.labels.names)
+
+    def test_lru(self):
+        for name in ["a", "b", "a", "c"]:
+            self.registry.get(name)
+
+        with self.subTest("Least recently used is unloaded"):
+            self.assertListEqual([True, False, True], [self.registry.is_loaded(name) for name in "abc"])
+
+        self.registry.get("b")
+
+        with self.subTest("Reloaded"):
+            self.assertListEqual(["/models/0", "/models/1", "/models/2", "/models/1"], self.loader.l_loaded)
+
+    def test_predict(self):
+        async def main():
+            return await asyncio.gather(*(self.registry.predict(name, ["x", "y"]) for name in "abcab"))
+
+        l_labels_probabilities = asyncio.run(main())
+
+        for name, (labels, probabilities) in zip("abcab", l_labels_probabilities):
+            with self.subTest(name=name):
+                self.assertListEqual(["cost", "rule"], labels.names)
+                self.assertListEqual([[float("abc".index(name))] * 2] * 2, probabilities.tolist())
+
+    def test_warm_up(self):
+        classifier = self.registry.get("a").classifier
+
+        self.assertEqual(1, len(classifier.l_documents))
+
+    def test_preload(self):
+        self.registry.preload(["c", "a"])
+
+        self.assertListEqual([True, False, True], [self.registry.is_loaded(name) for name in "abc"])
+
+    def test_concurrent_load(self):
+        loader = BlockingLoader("/models/1")
+        registry = ModelRegistry({"a": "/models/0", "b": "/models/1"}, load=loader)
+        self.addCleanup(registry.close)
+
+        registry.get("a")
+
+        l_hosted_models = []
+        threads = [threading.Thread(target=lambda: l_hosted_models.append(registry.get("b"))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(loader.started.wait(timeout=10))
+
+        with self.subTest("Loaded model is not blocked by a load"):
+            self.assertEqual("a", registry.get("a").name)
+
+        loader.released.set()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        with self.subTest("Loaded once"):
+            self.assertListEqual(["/models/0", "/models/1"], loader.l_loaded)
+
+        with self.subTest("Same model"):
+            self.assertEqual(2, len(l_hosted_models))
+            self.assertIs(l_hosted_models[0], l_hosted_models[1])
+
+    def test_failed_load(self):
+        def load(path):
+            raise OSError(path)
+
+        registry = ModelRegistry({"a": "/models/0"}, load=load)
+
+        with self.assertRaises(OSError):
+            registry.get("a")
+
+        with self.subTest("Loaded again after a failure"):
+            with self.assertRaises(OSError):
+                registry.get("a")
+
+    def test_unknown(self):
+        with self.assertRaises(KeyError):
+            self.registry.get("d")
+
+    def test_parse_models(self):
+        self.assertDictEqual({"relations": "/models/relations", "titles": "/models/titles"},
+                             parse_models(" relations=/models/relations,titles=/models/titles,"))
+
+
+if __name__ == '__main__':
+    unittest.main()
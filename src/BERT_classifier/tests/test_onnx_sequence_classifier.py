@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+from BERT_classifier.bert_based_classifier.onnx_sequence_classifier import check_parity, export_onnx, \
+    FILENAME_ONNX_QUANTIZED, load_parity, OnnxSequenceClassifier, save_parity
+
+DOCUMENTS = ["the cost of a permit is 10 euro",
+             "cost",
+             "",
+             "a permit " * 20,
+             "the cost"]
+
+
+class TestOnnxSequenceClassifier(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        # Small, randomly initialised model, such that no trained model is needed.
+        self.model_dir = os.path.join(self.tmp_dir.name, "model")
+        self.onnx_model_dir = os.path.join(self.tmp_dir.name, "onnx")
+        os.makedirs(self.model_dir)
+
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "cost", "the", "of", "a", "permit", "is", "euro"]
+        vocab_file = os.path.join(self.model_dir, "vocab.txt")
+        with open(vocab_file, "w") as f:
+            f.write("\n".join(vocab))
+
+        config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                            intermediate_size=37, num_labels=3)
+        config.threshold = .5
+        config.model_name = self.model_dir
+        config.eurovoc_concept_2_id = {"cost": 0, "rule": 1, "evidence": 2}
+
+        BertForSequenceClassification(config).save_pretrained(self.model_dir)
+        BertTokenizerFast(vocab_file).save_pretrained(self.model_dir)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_parity(self):
+        export_onnx(self.model_dir, self.onnx_model_dir)
+
+        parity = check_parity(DOCUMENTS, self.model_dir, self.onnx_model_dir)
+
+        self.assertLess(parity['max_abs_diff'], 1e-4, parity)
+        self.assertEqual(1., parity['label_agreement'], parity)
+
+    def test_quantized(self):
+        filename = export_onnx(self.model_dir, self.onnx_model_dir, quantize=True)
+
+        with self.subTest("Quantized model"):
+            self.assertEqual(FILENAME_ONNX_QUANTIZED, os.path.basename(filename))
+
+        parity = check_parity(DOCUMENTS, self.model_dir, self.onnx_model_dir)
+
+        self.assertLess(parity['max_abs_diff'], .05, parity)
+
+        save_parity(parity, self.onnx_model_dir, quantized=True, min_label_agreement=0.)
+
+        onnx_classifier = OnnxSequenceClassifier(self.onnx_model_dir)
+
+        with self.subTest("Loads quantized model by default"):
+            self.assertEqual(filename, onnx_classifier.filename)
+
+        with self.subTest("Labels"):
+            self.assertDictEqual({"cost": 0, "rule": 1, "evidence": 2}, onnx_classifier.config.eurovoc_concept_2_id)
+
+    def test_parity_required(self):
+        export_onnx(self.model_dir, self.onnx_model_dir)
+
+        with self.subTest("Not checked"):
+            with self.assertRaises(ValueError):
+                OnnxSequenceClassifier(self.onnx_model_dir)
+
+        parity = check_parity(DOCUMENTS, self.model_dir, self.onnx_model_dir)
+
+        with self.subTest("Failed"):
+            self.assertFalse(save_parity(parity, self.onnx_model_dir, min_label_agreement=1.1))
+            with self.assertRaises(ValueError):
+                OnnxSequenceClassifier(self.onnx_model_dir)
+
+        with self.subTest("Passed"):
+            self.assertTrue(save_parity(parity, self.onnx_model_dir))
+            OnnxSequenceClassifier(self.onnx_model_dir)
+
+        with self.subTest("Only the quantized model was not checked"):
+            with self.assertRaises(ValueError):
+                OnnxSequenceClassifier(self.onnx_model_dir, quantized=True)
+
+        with self.subTest("Export again"):
+            export_onnx(self.model_dir, self.onnx_model_dir)
+            self.assertDictEqual({}, load_parity(self.onnx_model_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,13 @@ import glob
 import json
 import os
 import re
+import tempfile
 import unittest
 from configparser import ConfigParser
 
+import numpy as np
 from datasets import load_dataset
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
 
 from BERT_classifier.bert_based_classifier.trainer_bert_sequence_classifier import TrainerBertSequenceClassifier
 
@@ -140,5 +143,48 @@ class MyTestCase(unittest.TestCase):
             preds_proba
 
 
+class TestPredictFast(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+        # Small, randomly initialised model, such that no trained model is needed.
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "cost", "the", "of", "a", "permit", "is", "euro"]
+        vocab_file = os.path.join(self.tmp_dir.name, "vocab.txt")
+        with open(vocab_file, "w") as f:
+            f.write("\n".join(vocab))
+
+        config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                            intermediate_size=37, num_labels=3)
+        config.threshold = .5
+
+        self.trainer = TrainerBertSequenceClassifier(self.tmp_dir.name, None, self.tmp_dir.name)
+        self.trainer.model = BertForSequenceClassification(config)
+        self.trainer.tokenizer = BertTokenizerFast(vocab_file)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_same_as_predict(self):
+        documents = ["the cost of a permit is 10 euro",
+                     "cost",
+                     "",
+                     "a permit " * 20,
+                     "the cost"]
+
+        preds_labels, preds_proba = self.trainer.predict(documents, batch_size=2)
+        preds_labels_fast, preds_proba_fast = self.trainer.predict_fast(documents, batch_size=2)
+
+        with self.subTest("Probabilities"):
+            np.testing.assert_allclose(preds_proba, preds_proba_fast, atol=1e-5)
+
+        with self.subTest("Labels"):
+            np.testing.assert_array_equal(preds_labels, preds_labels_fast)
+
+    def test_empty(self):
+        preds_labels, preds_proba = self.trainer.predict_fast([])
+
+        self.assertTupleEqual((0, 3), preds_proba.shape)
+
+
 if __name__ == '__main__':
     unittest.main()
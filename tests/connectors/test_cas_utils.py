@@ -0,0 +1,66 @@
+import base64
+import os
+import unittest
+
+from connectors.term_extraction_utils.cas_utils import CasWrapper, CONTACT_PARAGRAPH_TYPE, get_contact_paragraph, \
+    PARAGRAPH_TYPE, select_annotations, SENTENCE_TYPE, SOFA_ID, TOKEN_TYPE
+
+FILENAME_CAS = os.path.join(os.path.dirname(__file__), "cas_contact_info_example.xml")
+
+XMI_TOKENS = """<?xml version="1.0" encoding="UTF-8"?>
+<xmi:XMI xmlns:xmi="http://www.omg.org/XMI" xmlns:cas="http:///uima/cas.ecore" xmlns:cassis="http:///cassis.ecore"
+xmi:version="2.0">
+    <cas:NULL xmi:id="0"/>
+    <cassis:Token xmi:id="5" begin="10" end="15" sofa="2" lemma="world"/>
+    <cassis:Token xmi:id="4" begin="0" end="2" sofa="2" lemma="smile"/>
+    <cassis:Token xmi:id="6" begin="3" end="8" sofa="2" lemma="hello"/>
+    <cas:Sofa xmi:id="1" sofaNum="1" sofaID="_InitialView" mimeType="None" sofaString="None"/>
+    <cas:Sofa xmi:id="2" sofaNum="2" sofaID="html2textView" mimeType="None" sofaString="\U0001F600 hello, world"/>
+    <cas:View sofa="2" members="4 5 6"/>
+</xmi:XMI>
+""".encode("utf-8")
+
+
+class TestSelectAnnotations(unittest.TestCase):
+    def setUp(self) -> None:
+        with open(FILENAME_CAS, "rb") as f:
+            self.cas_content = base64.b64encode(f.read()).decode("utf-8")
+
+        self.cas = CasWrapper.from_cas_content(self.cas_content)
+
+    def test_same_as_cassis(self):
+        for annotation in [PARAGRAPH_TYPE, SENTENCE_TYPE, CONTACT_PARAGRAPH_TYPE]:
+            with self.subTest(annotation=annotation):
+                l_text = [fs.get_covered_text() for fs in self.cas.get_view(SOFA_ID).select(annotation)]
+
+                l_annotation = select_annotations(self.cas_content, annotation)
+
+                self.assertTrue(l_annotation)
+                self.assertListEqual(l_text, [a.text for a in l_annotation])
+
+    def test_get_contact_paragraph(self):
+        with self.subTest("Content"):
+            self.assertListEqual(self.cas.get_contact_paragraph(),
+                                 get_contact_paragraph(self.cas_content))
+
+        with self.subTest("Text"):
+            self.assertListEqual(self.cas.get_contact_paragraph(clean=False),
+                                 get_contact_paragraph(self.cas_content, clean=False))
+
+        with self.subTest("Unique"):
+            self.assertSetEqual(set(self.cas.get_contact_paragraph(unique=True)),
+                                set(get_contact_paragraph(self.cas_content, unique=True)))
+
+    def test_features(self):
+        """
+        Features, order of the annotations and offsets (Java UTF-16) of characters outside the BMP.
+        """
+
+        l_annotation = select_annotations(XMI_TOKENS, TOKEN_TYPE, features=("lemma",))
+
+        self.assertListEqual([("\U0001F600", "smile"), ("hello", "hello"), ("world", "world")],
+                             [(a.text, a.features["lemma"]) for a in l_annotation])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from connectors.disk_cache import DiskCache
+from connectors.term_extraction import ConnectorTermExtraction
+from connectors.term_extraction_utils.models import Document
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_get_set(self):
+        cache = DiskCache(self.tmp_dir.name)
+
+        key = cache.make_key("/extract_terms", "<html></html>", "en")
+        value = b'{"cas_content": "abc"}'
+
+        with self.subTest("Miss"):
+            self.assertIsNone(cache.get(key))
+
+        cache.set(key, value)
+
+        with self.subTest("Hit"):
+            self.assertEqual(value, cache.get(key))
+
+        with self.subTest("Counters"):
+            self.assertEqual(1, cache.n_hits)
+            self.assertEqual(1, cache.n_misses)
+
+    def test_persistent(self):
+        cache = DiskCache(self.tmp_dir.name)
+        key = cache.make_key("a")
+        cache.set(key, b"value")
+
+        cache_reloaded = DiskCache(self.tmp_dir.name)
+
+        self.assertEqual(1, len(cache_reloaded))
+        self.assertEqual(b"value", cache_reloaded.get(key))
+
+    def test_key(self):
+        with self.subTest("Different language"):
+            self.assertNotEqual(DiskCache.make_key("/chunking", "html", "en"),
+                                DiskCache.make_key("/chunking", "html", "nl"))
+
+        with self.subTest("No language"):
+            self.assertNotEqual(DiskCache.make_key("/chunking", "html", None),
+                                DiskCache.make_key("/chunking", "html", "None"))
+
+    def test_eviction(self):
+        value = bytes(range(256)) * 8  # Badly compressible
+        cache = DiskCache(self.tmp_dir.name)
+        cache.set("size", value)
+        size_entry = cache.size
+        cache.clear()
+
+        cache = DiskCache(self.tmp_dir.name, max_size=3 * size_entry)
+
+        for key in ["a", "b", "c"]:
+            cache.set(key, value)
+
+        cache.get("a")  # a is now more recently used than b
+        cache.set("d", value)
+
+        with self.subTest("Size"):
+            self.assertLessEqual(cache.size, cache.max_size)
+
+        with self.subTest("Least recently used"):
+            self.assertIsNone(cache.get("b"))
+
+        for key in ["a", "c", "d"]:
+            with self.subTest("Kept", key=key):
+                self.assertEqual(value, cache.get(key))
+
+    def test_ttl(self):
+        cache = DiskCache(self.tmp_dir.name, ttl=.1)
+        cache.set("a", b"value")
+
+        self.assertEqual(b"value", cache.get("a"))
+
+        time.sleep(.2)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, len(cache))
+
+
+def make_response(status_code: int, content: bytes) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status_code
+    r._content = content
+    return r
+
+
+class TestConnectorTermExtractionCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        self.conn = ConnectorTermExtraction("http://localhost", cache=DiskCache(self.tmp_dir.name))
+        self.doc = Document(html="<html></html>", language="en")
+
+    def post_cached(self, response: requests.Response) -> mock.Mock:
+        post = mock.Mock(return_value=response)
+
+        with mock.patch.object(self.conn.transport, "post", post):
+            self.conn._post_cached("/chunking", self.doc)
+
+        return post
+
+    def test_hit(self):
+        self.post_cached(make_response(200, b'{"a": 1}'))
+        post = self.post_cached(make_response(200, b'{"a": 1}'))
+
+        post.assert_not_called()
+
+    def test_error(self):
+        with self.subTest("Status is raised"):
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.post_cached(make_response(500, b"Internal Server Error"))
+
+        with self.subTest("Not cached"):
+            post = self.post_cached(make_response(200, b'{"a": 1}'))
+            post.assert_called_once()
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from connectors.sqlite_store import MAX_VARIABLES, SQLiteStore
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, "store.sqlite")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def get_store(self) -> SQLiteStore:
+        return SQLiteStore(self.filename,
+                           table="translation",
+                           partition=("source", "target"),
+                           key="segment",
+                           value="translation",
+                           extra={"created": "REAL"})
+
+    def test_get_set(self):
+        store = self.get_store()
+
+        store.set_many(("NL", "EN"), {"Kosten": "Costs", "Voorwaarden": "Conditions"}, extra=(0.,))
+
+        with self.subTest("Found"):
+            self.assertDictEqual({"Kosten": "Costs"}, store.get_many(("NL", "EN"), ["Kosten", "Prijs"]))
+
+        with self.subTest("Other partition"):
+            self.assertDictEqual({}, store.get_many(("NL", "FR"), ["Kosten"]))
+
+        with self.subTest("Replace"):
+            store.set_many(("NL", "EN"), {"Kosten": "Cost"}, extra=(1.,))
+            self.assertDictEqual({"Kosten": "Cost"}, store.get_many(("NL", "EN"), ["Kosten"]))
+            self.assertEqual(2, len(store))
+
+    def test_many_keys(self):
+        """
+        More keys than variables allowed in a single query.
+        """
+        store = self.get_store()
+
+        d_value = {str(i): str(-i) for i in range(2 * MAX_VARIABLES + 1)}
+        store.set_many(("NL", "EN"), d_value, extra=(0.,))
+
+        self.assertDictEqual(d_value, store.get_many(("NL", "EN"), d_value))
+
+    def test_persistent(self):
+        self.get_store().set_many(("NL", "EN"), {"Kosten": "Costs"}, extra=(0.,))
+
+        self.assertDictEqual({"Kosten": "Costs"}, self.get_store().get_many(("NL", "EN"), ["Kosten"]))
+
+    def test_schema(self):
+        """
+        Same table as before the store was shared, such that existing files can still be used.
+        """
+        self.get_store()
+
+        with sqlite3.connect(self.filename) as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(translation)")]
+
+        self.assertListEqual(["source", "target", "segment", "translation", "created"], columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
+import json
 import os
 import re
 import unittest
+from unittest import mock
+
+import requests
 
 from connectors.term_extraction import ConnectionWarning, ConnectorContactInfoClassification, ConnectorTermExtraction, \
     Label
@@ -311,3 +315,131 @@ class TestConnectorContactInfoClassification(unittest.TestCase):
         b = conn._post_classify_contact_type_email(self.s_email)
 
         self.assertEqual(True, b)
+
+
+def make_response(status_code: int, j=None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status_code
+    r._content = json.dumps(j).encode("utf-8")
+    return r
+
+
+def classify(s: str) -> list:
+    """
+    Stub of the contact type classification of a line.
+    """
+    return [{"name": "EMAIL" if "@" in s else "PHONE"}]
+
+
+class TestClassifyContactTypeLines(unittest.TestCase):
+    """
+    With a stub of the API instead of the live one.
+    """
+
+    URL = "http://contact-classification"
+
+    s_email = "This is an email@host.com"
+    s_phone = "+32 9 123 45 67"
+
+    def setUp(self) -> None:
+        # Status code of the batch route, None if it is available.
+        self.status_code_lines = None
+
+        self.transport = mock.Mock()
+        self.transport.post.side_effect = self.post
+
+        for patcher in [mock.patch("connectors.term_extraction.get_transport", return_value=self.transport),
+                        mock.patch.dict(ConnectorContactInfoClassification._has_route_lines, clear=True)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.conn = ConnectorContactInfoClassification(self.URL, test_connection=False)
+
+    def post(self, url, json=None, **kwargs) -> requests.Response:
+        if url.endswith(ConnectorContactInfoClassification._PATH_CLASSIFY_CONTACT_TYPE_LINES):
+            if self.status_code_lines is not None:
+                return make_response(self.status_code_lines, {"detail": "Error"})
+
+            return make_response(200, [classify(s) for s in json["strings"]])
+
+        elif url.endswith(ConnectorContactInfoClassification._PATH_CLASSIFY_CONTACT_TYPE):
+            return make_response(200, classify(json["string"]))
+
+        return make_response(404, {"detail": "Not Found"})
+
+    def get_posted(self, path: str) -> list:
+        """
+        The JSON of the requests to a route.
+        """
+        return [call.kwargs["json"] for call in self.transport.post.call_args_list if call.args[0].endswith(path)]
+
+    def assert_labels(self, l_s, l_labels):
+        self.assertEqual(len(l_s), len(l_labels))
+
+        for s, labels in zip(l_s, l_labels):
+            self.assertListEqual([Label(**label) for label in classify(s)], labels)
+
+    def test_batch(self):
+        l_s = [self.s_email, self.s_phone, self.s_email]
+
+        l_labels = self.conn.classify_contact_type_lines(l_s, country_code="BE")
+
+        with self.subTest("Labels"):
+            self.assert_labels(l_s, l_labels)
+
+        with self.subTest("Single request, without duplicates"):
+            self.assertEqual(1, self.transport.post.call_count)
+            self.assertEqual([[self.s_email, self.s_phone]],
+                             [j["strings"] for j in self.get_posted(self.conn._PATH_CLASSIFY_CONTACT_TYPE_LINES)])
+
+        with self.subTest("Route remembered"):
+            self.assertTrue(ConnectorContactInfoClassification._has_route_lines[self.URL])
+
+    def test_fallback(self):
+        l_s = [self.s_email, self.s_phone, self.s_email]
+
+        for status_code in [404, 405]:
+            with self.subTest(status_code=status_code):
+                ConnectorContactInfoClassification._has_route_lines.clear()
+                self.transport.post.reset_mock()
+                self.status_code_lines = status_code
+
+                l_labels = self.conn.classify_contact_type_lines(l_s, country_code="BE")
+
+                self.assert_labels(l_s, l_labels)
+
+                # Once per unique line.
+                self.assertCountEqual([self.s_email, self.s_phone],
+                                      [j["string"] for j in self.get_posted(self.conn._PATH_CLASSIFY_CONTACT_TYPE)])
+
+                self.assertFalse(ConnectorContactInfoClassification._has_route_lines[self.URL])
+
+    def test_fallback_remembered(self):
+        self.status_code_lines = 404
+
+        self.conn.classify_contact_type_lines([self.s_email], country_code="BE")
+        self.conn.classify_contact_type_lines([self.s_phone], country_code="BE")
+
+        with self.subTest("Batch route tried once"):
+            self.assertEqual(1, len(self.get_posted(self.conn._PATH_CLASSIFY_CONTACT_TYPE_LINES)))
+
+        with self.subTest("Per URL"):
+            conn_other = ConnectorContactInfoClassification(self.URL + "/other", test_connection=False)
+            conn_other.classify_contact_type_lines([self.s_email], country_code="BE")
+
+            self.assertEqual(2, len(self.get_posted(self.conn._PATH_CLASSIFY_CONTACT_TYPE_LINES)))
+
+    def test_error(self):
+        self.status_code_lines = 500
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.conn.classify_contact_type_lines([self.s_email], country_code="BE")
+
+        with self.subTest("No fallback"):
+            self.assertFalse(self.get_posted(self.conn._PATH_CLASSIFY_CONTACT_TYPE))
+            self.assertNotIn(self.URL, ConnectorContactInfoClassification._has_route_lines)
+
+    def test_empty(self):
+        self.assertListEqual([], self.conn.classify_contact_type_lines([], country_code="BE"))
+        self.transport.post.assert_not_called()
+
@@ -2,16 +2,19 @@
 Swagger at https://mtapi.occam.crosslang.com/swagger-ui.html
 """
 
+import email
 import os
 import random
 import signal
 import string
 import tempfile
+import threading
 import time
 import unittest
 import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from connectors.translation import ETranslationConnector
+from connectors.translation import _chunk_lines, ETranslationConnector
 
 CEF_LOGIN = os.environ.get("CEF_LOGIN")
 CEF_PASSW = os.environ.get("CEF_PASSW")
@@ -354,6 +357,102 @@ class TestEtranslationConnectorList(unittest.TestCase):
                 self.assertEqual(s_orig, s_trans)
 
 
+class DocumentTranslationHandler(BaseHTTPRequestHandler):
+    """
+    Mock of the document translation of eTranslation: "translates" to upper case.
+    """
+    protocol_version = "HTTP/1.1"
+
+    l_documents = []
+    # Target language of each document.
+    l_targets = []
+    # Target languages for which the translation fails.
+    targets_unavailable = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+
+        message = email.message_from_bytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+        document = next(part.get_payload(decode=True) for part in message.get_payload() if part.get_filename())
+        target = next(part.get_payload() for part in message.get_payload()
+                      if part.get_param("name", header="content-disposition") == "target")
+        self.l_documents.append(document.decode("UTF-8"))
+        self.l_targets.append(target)
+
+        if target in self.targets_unavailable:
+            content = b"Unavailable"
+            self.send_response(500)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        content = document.upper()
+
+        self.send_response(200)
+        self.send_header("Content-Disposition", "attachment; filename=tmp_text_lines_trans.txt")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestEtranslationConnectorChunks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("localhost", 0), DocumentTranslationHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        DocumentTranslationHandler.l_documents = []
+        DocumentTranslationHandler.l_targets = []
+
+        self.connector = ETranslationConnector(username=CEF_LOGIN,
+                                               password=CEF_PASSW)
+        self.connector.url_trans_doc_blocking = f"http://localhost:{self.server.server_port}/translate/document/blocking"
+
+    def test_chunks(self):
+        l = [f"line {i}" for i in range(100)] + ["two\nlines", ""]
+
+        trans = self.connector.trans_list_blocking(l, target="NL",
+                                                   source="EN",
+                                                   max_chunk_size=100)
+
+        with self.subTest("Translation"):
+            self.assertListEqual([s.upper() for s in l], trans)
+
+        with self.subTest("Chunks"):
+            self.assertGreater(len(DocumentTranslationHandler.l_documents), 1)
+
+            for document in DocumentTranslationHandler.l_documents:
+                self.assertLessEqual(len(document.encode("UTF-8")), 100)
+
+    def test_unique(self):
+        l = ["Kosten", "Voorwaarden", "Kosten", "Voorwaarden\nKosten"]
+
+        trans = self.connector.trans_list_blocking(l, target="NL",
+                                                   source="EN")
+
+        with self.subTest("Translation"):
+            self.assertListEqual([s.upper() for s in l], trans)
+
+        with self.subTest("Sent once"):
+            self.assertListEqual(["Kosten\nVoorwaarden\n"], DocumentTranslationHandler.l_documents)
+
+    def test_chunk_lines(self):
+        l = ["a" * 3, "b" * 3, "c" * 10, "d"]
+
+        self.assertListEqual([["aaa", "bbb"], ["c" * 10], ["d"]],
+                             list(_chunk_lines(l, max_chunk_size=8)))
+
+
 def random_text_generator(n: int):
     return "".join([random.choice(string.ascii_letters[:26] + ' ' * 10) for i in range(n)])
 
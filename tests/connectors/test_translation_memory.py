@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+from connectors.translation import ETranslationConnector
+from connectors.translation_memory import normalize_segment, TranslationMemory
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, "translation_memory.sqlite")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_get_set(self):
+        tm = TranslationMemory(self.filename)
+
+        with self.subTest("Miss"):
+            self.assertIsNone(tm.get("NL", "EN", "Kosten"))
+
+        tm.set("NL", "EN", "Kosten", "Costs")
+
+        with self.subTest("Hit"):
+            self.assertEqual("Costs", tm.get("NL", "EN", "Kosten"))
+
+        with self.subTest("Normalized"):
+            self.assertEqual("Costs", tm.get("nl", "en", "  Kosten\t"))
+
+        with self.subTest("Other target"):
+            self.assertIsNone(tm.get("NL", "FR", "Kosten"))
+
+        with self.subTest("Counters"):
+            self.assertEqual(2, tm.n_hits)
+            self.assertEqual(2, tm.n_misses)
+
+    def test_persistent(self):
+        TranslationMemory(self.filename).set_many("NL", "EN", {"Kosten": "Costs",
+                                                               "Voorwaarden": "Conditions"})
+
+        tm = TranslationMemory(self.filename)
+
+        self.assertEqual(2, len(tm))
+        self.assertDictEqual({"Kosten": "Costs", "Voorwaarden": "Conditions"},
+                             tm.get_many("NL", "EN", ["Kosten", "Voorwaarden", "Procedure"]))
+
+    def test_normalize_segment(self):
+        self.assertEqual("Wat meebrengen?", normalize_segment(" Wat  meebrengen?\n"))
+
+
+class ETranslationConnectorRecorder(ETranslationConnector):
+    """
+    Records the lines that would be sent to eTranslation, instead of sending them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ETranslationConnectorRecorder, self).__init__(*args, **kwargs)
+        self.l_sent = []
+
+    def _trans_lines_blocking(self, l_line: List[str], target: str, source: str, **kwargs) -> List[str]:
+        self.l_sent.append(l_line)
+        return [line.upper() for line in l_line]
+
+
+class TestETranslationConnectorMemory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tm = TranslationMemory(os.path.join(self.tmp_dir.name, "translation_memory.sqlite"))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_trans_list_blocking(self):
+        connector = ETranslationConnectorRecorder(username=None, password=None, translation_memory=self.tm)
+
+        l_text = ["Kosten", "Voorwaarden\nKosten", "", "Kosten "]
+
+        l_text_trans = connector.trans_list_blocking(l_text, target="EN", source="NL")
+
+        with self.subTest("Translation"):
+            self.assertListEqual(["KOSTEN", "VOORWAARDEN\nKOSTEN", "", "KOSTEN"], l_text_trans)
+
+        with self.subTest("Only unique segments are sent"):
+            self.assertListEqual([["Kosten", "Voorwaarden"]], connector.l_sent)
+
+        l_text_trans_2 = connector.trans_list_blocking(l_text + ["Procedure"], target="EN", source="NL")
+
+        with self.subTest("Translation from memory"):
+            self.assertListEqual(l_text_trans + ["PROCEDURE"], l_text_trans_2)
+
+        with self.subTest("Only misses are sent"):
+            self.assertListEqual([["Procedure"]], connector.l_sent[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
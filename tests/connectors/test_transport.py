@@ -0,0 +1,149 @@
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from connectors.term_extraction import ConnectionWarning, Connector
+from connectors.transport import get_transport, HTTP_TIMEOUT, Transport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    # Number of requests per path.
+    counts = {}
+    # The first request to a path starting with it is answered with 503 (Service Unavailable).
+    PATH_UNAVAILABLE_ONCE = "/unavailable_once"
+    # Requests to a path starting with it are answered after a second.
+    PATH_SLOW = "/slow"
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._respond()
+
+    def _respond(self):
+        n = self.counts[self.path] = self.counts.get(self.path, 0) + 1
+
+        if self.path.startswith(self.PATH_SLOW):
+            time.sleep(1)
+
+        status = 503 if self.path.startswith(self.PATH_UNAVAILABLE_ONCE) and n == 1 else 200
+
+        body = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTransport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("localhost", 0), Handler)
+        cls.url = f"http://localhost:{cls.server.server_port}"
+
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_reuse(self):
+        transport = Transport()
+
+        n = 5
+        for _ in range(n):
+            r = transport.get(self.url)
+            self.assertTrue(r.ok)
+
+        stats = transport.stats()
+
+        with self.subTest("Requests"):
+            self.assertEqual(n, stats.n_requests)
+
+        with self.subTest("Connections"):
+            self.assertEqual(1, stats.n_connections)
+
+        with self.subTest("Reuse rate"):
+            self.assertAlmostEqual((n - 1) / n, stats.reuse_rate)
+
+        with self.subTest("In flight"):
+            self.assertEqual(0, stats.in_flight)
+
+    def test_retry(self):
+        transport = Transport(retries=1, backoff_factor=0)
+
+        path = Handler.PATH_UNAVAILABLE_ONCE
+
+        with self.subTest("GET"):
+            r = transport.get(self.url + path + "/get")
+            self.assertEqual(200, r.status_code)
+            self.assertEqual(2, Handler.counts[path + "/get"])
+
+        with self.subTest("POST is not retried"):
+            r = transport.post(self.url + path + "/post", json={})
+            self.assertEqual(503, r.status_code)
+            self.assertEqual(1, Handler.counts[path + "/post"])
+
+        with self.subTest("Idempotent POST"):
+            r = transport.post(self.url + path + "/post_idempotent", json={}, idempotent=True)
+            self.assertEqual(200, r.status_code)
+            self.assertEqual(2, Handler.counts[path + "/post_idempotent"])
+
+        with self.subTest("No retries for a single request"):
+            r = transport.get(self.url + path + "/get_no_retries", retries=0)
+            self.assertEqual(503, r.status_code)
+            self.assertEqual(1, Handler.counts[path + "/get_no_retries"])
+
+    def test_timeout(self):
+        with self.subTest("Finite default"):
+            connect, read = HTTP_TIMEOUT
+            self.assertIsNotNone(connect)
+            self.assertEqual(HTTP_TIMEOUT, Transport().timeout)
+
+        with self.subTest("Read timeout"):
+            # Through the retry of urllib3, the timeout is raised as a connection error.
+            with self.assertRaises((requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                Transport(retries=0, timeout=(5, .1)).get(self.url + Handler.PATH_SLOW)
+
+    def test_shared(self):
+        self.assertIs(get_transport(), get_transport())
+
+
+class TestConnector(unittest.TestCase):
+    def test_connection_check_no_retries(self):
+        """
+        An unreachable API is reported immediately, without waiting for the backoff of the retries.
+        """
+
+        # Free port, nothing is listening.
+        with socket.socket() as sock:
+            sock.bind(("localhost", 0))
+            url = f"http://localhost:{sock.getsockname()[1]}"
+
+        transport = Transport(retries=3, backoff_factor=10)
+        self.addCleanup(transport.close)
+
+        with mock.patch("connectors.term_extraction.get_transport", return_value=transport):
+            t = time.perf_counter()
+            with self.assertWarns(ConnectionWarning):
+                Connector(url)
+
+        self.assertLess(time.perf_counter() - t, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
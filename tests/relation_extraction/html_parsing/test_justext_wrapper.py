@@ -1,12 +1,18 @@
+import json
 import os.path
+import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import List
 
 import justext
+import lxml.html
 
-from relation_extraction.html_parsing.justext_wrapper import BoldJustextWrapper, JustextWrapper, \
-    TitleClassificationJustextWrapper
+from relation_extraction.html_parsing.justext_wrapper import BoldJustextWrapper, GeneralParagraph, \
+    get_title_classifier_labels, JustextWrapper, TitleClassificationJustextWrapper
 from relation_extraction.html_parsing.utils import _get_language_full_from_code, _tmp_html
+from relation_extraction.prediction_cache import PredictionCache
 
 
 class TestJustTextWrapper(unittest.TestCase):
@@ -118,3 +124,165 @@ class TestTitleClassificationJustextWrapper(unittest.TestCase):
         wrapper = TitleClassificationJustextWrapper(self.html, self.stoplist)
 
         wrapper._export_debugging(self.FILENAME_OUT)
+
+
+class TitleClassifierHandler(BaseHTTPRequestHandler):
+    """
+    Mock of the title classifier: short texts are titles.
+    """
+    protocol_version = "HTTP/1.1"
+
+    l_labels = []
+    l_text_lines = []
+
+    def do_GET(self):
+        self.l_labels.append(self.path)
+        self._send_json({"names": ["text", "title"]})
+
+    def do_POST(self):
+        text_lines = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["text"]
+        self.l_text_lines.append(text_lines)
+
+        p_title = [float(len(text) < 30) for text in text_lines]
+        self._send_json({"names": ["text", "title"],
+                         "probabilities": [[1 - p, p] for p in p_title]})
+
+    def _send_json(self, d):
+        content = json.dumps(d).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+HTML_TITLES = """<html><body>
+<p>Menu</p>
+<h2>Apply for a permit</h2>
+<p>You can apply for a permit online, at the counter of the town hall, or by mail to the municipality.</p>
+<p>Menu</p>
+<p>Costs</p>
+<p>The permit costs 10 euro, to be paid when you apply for the permit at the counter of the town hall.</p>
+</body></html>"""
+
+
+class TestTitleClassificationCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("localhost", 0), TitleClassifierHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://localhost:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        TitleClassifierHandler.l_labels = []
+        TitleClassifierHandler.l_text_lines = []
+        get_title_classifier_labels.cache_clear()
+
+        self.stoplist = justext.get_stoplist("English")
+        self.prediction_cache = PredictionCache()
+
+    def get_wrapper(self, html=HTML_TITLES):
+        return TitleClassificationJustextWrapper(html, self.stoplist,
+                                                 title_classifier_url=self.url,
+                                                 prediction_cache=self.prediction_cache)
+
+    def test_titles(self):
+        paragraphs = self.get_wrapper().paragraphs
+
+        self.assertListEqual([True, True, False, True, True, False],
+                             [paragraph.is_heading for paragraph in paragraphs])
+
+    def test_cache(self):
+        self.get_wrapper()
+
+        with self.subTest("Unique texts"):
+            self.assertEqual(1, len(TitleClassifierHandler.l_text_lines))
+            self.assertEqual(5, len(TitleClassifierHandler.l_text_lines[0]))
+
+        self.get_wrapper(HTML_TITLES.replace("Costs", "Conditions"))
+
+        with self.subTest("Labels requested once"):
+            self.assertEqual(1, len(TitleClassifierHandler.l_labels))
+
+        with self.subTest("Only new texts"):
+            self.assertListEqual([["Conditions"]], TitleClassifierHandler.l_text_lines[1:])
+
+    def test_chunks(self):
+        wrapper = self.get_wrapper()
+
+        l_text = [f"Text {i}" for i in range(10)]
+        d_results = wrapper._classify_text_lines(l_text, chunk_size=3, max_workers=2)
+
+        with self.subTest("Chunks"):
+            self.assertListEqual([3, 3, 3, 1], sorted(map(len, TitleClassifierHandler.l_text_lines[1:]),
+                                                      reverse=True))
+
+        with self.subTest("Results"):
+            self.assertListEqual(l_text, list(d_results))
+
+
+class CountingBoldJustextWrapper(BoldJustextWrapper):
+    """
+    Counts how many times the HTML is parsed.
+    """
+
+    def _html_to_dom(self, *args, **kwargs):
+        self.n_parsed = getattr(self, "n_parsed", 0) + 1
+        return super(CountingBoldJustextWrapper, self)._html_to_dom(*args, **kwargs)
+
+
+class TestSingleDom(unittest.TestCase):
+    def setUp(self) -> None:
+        self.wrapper = CountingBoldJustextWrapper(HTML_TITLES, justext.get_stoplist("English"))
+
+    def test_parsed_once(self):
+        list(self.wrapper.iterator_paragraph_element())
+        self.wrapper._heading_include_strong()
+
+        self.assertEqual(1, self.wrapper.n_parsed)
+
+    def test_same_as_get_dom_clean(self):
+        self.assertEqual(lxml.html.tostring(self.wrapper.get_dom_clean()),
+                         lxml.html.tostring(self.wrapper.dom))
+
+    def test_export_debugging(self):
+        html_before = lxml.html.tostring(self.wrapper.dom)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.wrapper._export_debugging(os.path.join(tmp_dir, "debug.html"))
+
+        with self.subTest("Parsed once"):
+            self.assertEqual(1, self.wrapper.n_parsed)
+
+        with self.subTest("Shared DOM not modified"):
+            self.assertEqual(html_before, lxml.html.tostring(self.wrapper.dom))
+
+
+class TestGeneralParagraph(unittest.TestCase):
+    def test_from_justext_paragraph(self):
+        paras_baseline = justext.justext(HTML_TITLES, justext.get_stoplist("English"))
+        paras = JustextWrapper(HTML_TITLES, justext.get_stoplist("English")).paragraphs
+
+        with self.subTest("Type"):
+            for par in paras:
+                self.assertIsInstance(par, GeneralParagraph)
+
+        with self.subTest("Same as justext"):
+            self.assertListEqual([par.__dict__ for par in paras_baseline],
+                                 [par.__dict__ for par in paras])
+
+    def test_no_copy(self):
+        paragraph = justext.justext(HTML_TITLES, justext.get_stoplist("English"))[0]
+        text_nodes = paragraph.text_nodes
+
+        general_paragraph = GeneralParagraph.from_justext_paragraph(paragraph)
+
+        self.assertIs(text_nodes, general_paragraph.text_nodes)
@@ -0,0 +1,158 @@
+import glob
+import os
+import unittest
+
+from bs4 import BeautifulSoup
+
+from relation_extraction.aalter import AalterParser
+from relation_extraction.austrheim import AustrheimParser
+from relation_extraction.html_parsing.parsers import HeaderHTMLParser
+from relation_extraction.html_parsing.section_extractor import get_text, html_to_lxml, LxmlSectionExtractor
+from relation_extraction.san_paolo import SanPaoloParser
+from relation_extraction.wien import WienParser
+from relation_extraction.zagreb import ZagrebParser
+
+DIR_EXAMPLE_FILES = os.path.join(os.path.dirname(__file__), "../EXAMPLE_FILES")
+
+HTML = """<html><body>
+<div><h1>Title</h1><p>Intro <!-- comment --> text<script>var a = 1;</script></p></div>
+<div>
+    <h2>Sub <b>title</b></h2>
+    <p>First&nbsp;paragraph</p>
+    <ul><li>one</li><li>two <style>.a {}</style></li></ul>
+    <h3>Subsub</h3>
+    <p>Second paragraph</p>
+    <h2>Other</h2>
+    <div>Third paragraph</div>
+</div>
+</body></html>"""
+
+# Headers of different levels and in different parents, and an accordion header (San Paolo).
+HTML_NESTED = """<html><body>
+<div>
+    <h1>Title</h1>
+    <h2>A</h2>
+    <p>a</p>
+    <h3>A.1</h3>
+    <p>a.1</p>
+    <h4>A.1.1</h4>
+    <ul><li>a.1.1</li></ul>
+    <h3>A.2</h3>
+    <div class="header">A.2 accordion</div>
+    <p>a.2</p>
+    <h2>B</h2>
+    <p>b</p>
+</div>
+<div>
+    <h2>C</h2>
+    <p>c</p>
+    <h5>C.1</h5>
+    <li>c.1</li>
+</div>
+</body></html>"""
+
+
+class TestGetText(unittest.TestCase):
+    def test_same_as_beautifulsoup(self):
+        soup = BeautifulSoup(HTML, 'html.parser')
+        root = html_to_lxml(HTML)
+
+        for separator in ["", " ", "\n"]:
+            with self.subTest(separator=separator):
+                self.assertEqual(soup.body.get_text(separator=separator, strip=True),
+                                 get_text(root.find("body"), separator=separator, strip=True))
+
+    def test_no_script(self):
+        text = get_text(html_to_lxml(HTML))
+
+        self.assertNotIn("var a", text)
+        self.assertNotIn("comment", text)
+
+
+class TestLxmlSectionExtractor(unittest.TestCase):
+    def test_get_header_paragraphs(self):
+        extractor = LxmlSectionExtractor(HTML)
+
+        l = extractor.get_header_paragraphs(include_sub=False)
+
+        self.assertEqual([("Title", ["Intro text"]),
+                          ("Sub title", ["First paragraph", "* one", "* two"]),
+                          ("Subsub", ["Second paragraph"]),
+                          ("Other", ["Third paragraph"])],
+                         l)
+
+    def test_include_sub(self):
+        extractor = LxmlSectionExtractor(HTML)
+
+        text_header, l_par = extractor.get_header_paragraphs(include_sub=True)[1]
+
+        self.assertEqual("Sub title", text_header)
+        self.assertEqual(["First paragraph", "* one", "* two", "Subsub", "Second paragraph"], l_par)
+
+    def test_nested_same_as_beautifulsoup(self):
+        parser = SanPaoloParser()
+
+        for include_sub in [True, False]:
+            with self.subTest(include_sub=include_sub):
+                parser.use_lxml = False
+                sections_bs4 = parser.parse_page(HTML_NESTED, include_sub=include_sub)
+
+                parser.use_lxml = True
+                sections_lxml = parser.parse_page(HTML_NESTED, include_sub=include_sub)
+
+                self.assertEqual(sections_bs4, sections_lxml)
+
+    def test_same_as_beautifulsoup(self):
+        """
+        The lxml fast path should give exactly the same sections as BeautifulSoup.
+        """
+
+        filenames = sorted(glob.glob(os.path.join(DIR_EXAMPLE_FILES, "*.html")))
+        self.assertTrue(filenames)
+
+        for parser_class in [AalterParser, AustrheimParser, SanPaoloParser, WienParser, ZagrebParser]:
+            parser = parser_class()
+            self.assertTrue(parser.use_lxml)
+
+            for filename in filenames:
+                with open(filename) as f:
+                    html = f.read()
+
+                for include_sub in [True, False]:
+                    with self.subTest(parser=parser_class.__name__,
+                                      filename=os.path.basename(filename),
+                                      include_sub=include_sub):
+                        parser.use_lxml = False
+                        sections_bs4 = parser.parse_page(html, include_sub=include_sub)
+
+                        parser.use_lxml = True
+                        sections_lxml = parser.parse_page(html, include_sub=include_sub)
+
+                        self.assertEqual(sections_bs4, sections_lxml)
+
+
+class TestHeaderHTMLParser(unittest.TestCase):
+    def test_default(self):
+        with self.assertWarns(DeprecationWarning):
+            parser = HeaderHTMLParser(HTML)
+
+        self.assertTrue(parser.use_lxml)
+
+    def test_same_as_beautifulsoup(self):
+        filenames = sorted(glob.glob(os.path.join(DIR_EXAMPLE_FILES, "*.html")))
+        self.assertTrue(filenames)
+
+        for filename in filenames:
+            with open(filename) as f:
+                parser = HeaderHTMLParser(f.read())
+
+            for include_sub in [True, False]:
+                with self.subTest(filename=os.path.basename(filename),
+                                  include_sub=include_sub):
+                    parser.use_lxml = False
+                    sections_bs4 = parser.get_sections(include_sub=include_sub)
+
+                    parser.use_lxml = True
+                    sections_lxml = parser.get_sections(include_sub=include_sub)
+
+                    self.assertEqual(sections_bs4, sections_lxml)
@@ -0,0 +1,112 @@
+import glob
+import os
+import unittest
+
+from relation_extraction.html_parsing.general_parser import GeneralHTMLParser
+from relation_extraction.html_parsing.justext_wrapper import get_stoplist, JustextWrapper
+from relation_extraction.html_parsing.streaming import iter_paragraphs, iter_sections
+
+DIR_EXAMPLE_FILES = os.path.join(os.path.dirname(__file__), "../EXAMPLE_FILES")
+
+HTML = """<html><head><title>Procedures</title></head><body>
+<h1>Procedures</h1>
+<script>var a = "not a paragraph";</script>
+<p>Introduction &amp; more</p>
+<h2>First</h2>
+<p>Paragraph 1</p>
+<ul><li>Item 1</li><li>Item 2</li></ul>
+<h2>Second</h2>
+<form><div>Paragraph 2</div></form>
+</body></html>"""
+
+PARAGRAPH_1 = "This is a long paragraph about the procedure, which explains what you have to do when you move to " \
+              "another city and how you can register at the town hall of the municipality where you are going to live."
+PARAGRAPH_2 = "When you want to move, you have to register your new address within eight days at the town hall, " \
+              "and you will then be visited by the police to check that you really live there with all of your family members."
+# The second heading only contains links: boilerplate.
+HTML_BOILERPLATE_HEADING = f"""<html><body>
+<h1>Moving</h1>
+<p>{PARAGRAPH_1}</p>
+<h2><a href="/menu">Menu</a> <a href="/home">Home</a></h2>
+<p>{PARAGRAPH_2}</p>
+<h2>Conditions</h2>
+<p>{PARAGRAPH_1}</p>
+</body></html>"""
+
+
+class TestIterParagraphs(unittest.TestCase):
+    def test_same_as_justext_wrapper(self):
+        """
+        Same paragraphs as JustextWrapper (before classification), without building the DOM.
+        """
+
+        filenames = sorted(glob.glob(os.path.join(DIR_EXAMPLE_FILES, "*.html")))
+        self.assertTrue(filenames)
+
+        def get_info(paragraphs):
+            return [(p.text, p.dom_path, p.xpath, p.chars_count_in_links, p.tags_count) for p in paragraphs]
+
+        for filename in filenames:
+            with open(filename) as f:
+                html = f.read()
+
+            with self.subTest(filename=os.path.basename(filename)):
+                justext_wrapper = JustextWrapper(html, get_stoplist("English"))
+
+                self.assertEqual(get_info(justext_wrapper.paragraphs),
+                                 get_info(iter_paragraphs(html, chunk_size=1000)))
+
+
+class TestIterSections(unittest.TestCase):
+    def test_sections(self):
+        sections = list(iter_sections(HTML, chunk_size=16))
+
+        self.assertEqual([["Procedures", "Introduction & more"],
+                          ["First", "Paragraph 1", "Item 1", "Item 2"],
+                          ["Second", "Paragraph 2"]],
+                         [[section.title] + section.paragraphs for section in sections])
+
+    def test_incremental(self):
+        """
+        A section is generated before the rest of the page is parsed.
+        """
+
+        chunks = [HTML[i:i + 16] for i in range(0, len(HTML), 16)]
+        n_fed = 0
+
+        def iter_chunks():
+            nonlocal n_fed
+            for chunk in chunks:
+                n_fed += 1
+                yield chunk
+
+        section = next(iter_sections(iter_chunks()))
+
+        self.assertEqual("Procedures", section.title)
+        self.assertLess(n_fed, len(chunks))
+
+    def test_file(self):
+        filename = os.path.join(DIR_EXAMPLE_FILES, "https_www_aalter_be_verhuizen.html")
+
+        with open(filename) as f:
+            sections = list(iter_sections(f, language="Dutch"))
+
+        self.assertTrue(sections)
+        self.assertIn("Voorwaarden", [section.title for section in sections])
+
+    def test_boilerplate_heading(self):
+        """
+        As in GeneralHTMLParser.get_sections, the paragraphs of a boilerplate heading are added to the previous section.
+        """
+
+        sections = list(iter_sections(HTML_BOILERPLATE_HEADING, language="English"))
+
+        with self.subTest("Previous section"):
+            self.assertEqual([["Moving", PARAGRAPH_1, PARAGRAPH_2],
+                              ["Conditions", PARAGRAPH_1]],
+                             [[section.title] + section.paragraphs for section in sections])
+
+        with self.subTest("Same as GeneralHTMLParser"):
+            parser = GeneralHTMLParser(HTML_BOILERPLATE_HEADING, "English")
+
+            self.assertEqual(parser.get_sections(), sections)
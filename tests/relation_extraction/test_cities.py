@@ -603,6 +603,34 @@ class TestWien(TestCaseExtra):
         self.assertTrue(ps)
 
 
+class TestPredictAll(unittest.TestCase):
+    def test_same_as_predict(self):
+        """
+        The batch prediction should give the same results as predicting one by one.
+        """
+
+        for parser, page in [(WienParser(), "https://www.wien.gv.at/amtshelfer/verkehr/fahrzeuge/aenderungen/einzelgenehmigung.html"),
+                             (AalterParser(), "https://www.aalter.be/eid")]:
+            html = get_html(url2filename(page))
+
+            titles = [title for title, _ in parser._paragraph_generator(html)]
+            paragraphs = [paragraph for _, paragraph in parser._paragraph_generator(html)]
+
+            predictions = parser.classifier.predict_all(titles, paragraphs)
+
+            with self.subTest("Number of predictions", page=page):
+                self.assertEqual(len(titles), len(predictions))
+
+            for title, paragraph, prediction in zip(titles, paragraphs, predictions):
+                with self.subTest(page=page, title=title):
+                    classifier = parser.classifier
+                    self.assertEqual(classifier.predict_criterion_requirement(title, paragraph),
+                                     prediction.criterion_requirement)
+                    self.assertEqual(classifier.predict_rule(title, paragraph), prediction.rule)
+                    self.assertEqual(classifier.predict_evidence(title, paragraph), prediction.evidence)
+                    self.assertEqual(classifier.predict_cost(title, paragraph), prediction.cost)
+
+
 class TestZagreb(unittest.TestCase):
     """
     Croatia, Croatian
@@ -1,9 +1,11 @@
 import unittest
+from unittest import mock
 
 from connectors.elastic_search import ElasticSearchConnector
+from connectors.term_extraction import Label
 from data.html import FILENAME_HTML, get_html
 from relation_extraction.methods import get_chunks, get_concepts, get_public_service_description, \
-    get_public_service_name, get_requirements
+    get_public_service_name, get_requirements, RelationExtractor
 
 
 class TestExtraction(unittest.TestCase):
@@ -62,6 +64,73 @@ class TestExtraction(unittest.TestCase):
                 self.assertIn(concept_expected, concepts)
 
 
+class TestContactInfoCache(unittest.TestCase):
+    """
+    The contact info APIs are replaced, to only test the cache.
+    """
+
+    def setUp(self) -> None:
+        self.html = get_html(FILENAME_HTML)
+
+        RelationExtractor.clear_contact_info_split_cache()
+        self.addCleanup(RelationExtractor.clear_contact_info_split_cache)
+
+        patcher = mock.patch("relation_extraction.methods.ConnectorTermExtraction")
+        self.conn_term_extraction = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.conn_term_extraction.get_contact_info.return_value = ["info@1819.brussels", "02 123 45 67"]
+
+        patcher = mock.patch("relation_extraction.methods.ConnectorContactInfoClassification")
+        self.conn_contact_info_classification = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.conn_contact_info_classification.classify_contact_type_lines.return_value = [[Label(name="EMAIL")],
+                                                                                           [Label(name="PHONE")]]
+
+    def test_reuse(self):
+        relation_extractor = RelationExtractor(self.html, context="https://www.1819.brussels/", country_code="BE")
+
+        contact_info_split = relation_extractor.get_contact_info_split()
+
+        with self.subTest("Contact info"):
+            self.assertListEqual(["info@1819.brussels"], contact_info_split.email)
+            self.assertListEqual(["02 123 45 67"], contact_info_split.telephone)
+
+        with self.subTest("Cached"):
+            self.assertEqual(1, len(RelationExtractor._contact_info_split_cache))
+
+        with self.subTest("Shared between extractors"):
+            relation_extractor_other = RelationExtractor(self.html, context="https://www.1819.brussels/",
+                                                         country_code="BE")
+
+            self.assertEqual(contact_info_split, relation_extractor_other.get_contact_info_split())
+            self.assertEqual(1, len(RelationExtractor._contact_info_split_cache))
+
+        with self.subTest("Extracted once"):
+            self.assertEqual(1, self.conn_term_extraction.get_contact_info.call_count)
+            self.assertEqual(1, self.conn_contact_info_classification.classify_contact_type_lines.call_count)
+
+        with self.subTest("Copy"):
+            contact_info_split.add_email("foo@bar.com")
+
+            self.assertNotIn("foo@bar.com", relation_extractor.get_contact_info_split().email)
+
+    def test_no_cache(self):
+        relation_extractor = RelationExtractor(self.html, context="https://www.1819.brussels/", country_code="BE")
+
+        relation_extractor.get_contact_info_split(use_cache=False)
+
+        with self.subTest("Not cached"):
+            self.assertEqual(0, len(RelationExtractor._contact_info_split_cache))
+
+        relation_extractor.get_contact_info_split()
+        relation_extractor.get_contact_info_split(use_cache=False)
+
+        with self.subTest("Extracted again"):
+            self.assertEqual(3, self.conn_term_extraction.get_contact_info.call_count)
+
+
 class TestElasticSearch(unittest.TestCase):
     def test_query(self):
         connector = ElasticSearchConnector()
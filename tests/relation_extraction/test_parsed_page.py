@@ -0,0 +1,138 @@
+import os
+import unittest
+from unittest import mock
+
+from relation_extraction.methods import ContactInfoSplit, get_public_service_name
+from relation_extraction.parsed_page import get_page_key, ParsedPage, ParsedPageCache
+from relation_extraction.pipeline import RelationExtractor2
+from relation_extraction.wien import WienParser
+
+FILENAME_HTML = os.path.join(os.path.dirname(__file__), "EXAMPLE_FILES",
+                             "https_www_wien_gv_at_amtshelfer_verkehr_fahrzeuge_aenderungen_einzelgenehmigung_html.html")
+
+
+class CountingWienParser(WienParser):
+    def __init__(self, *args, **kwargs):
+        super(CountingWienParser, self).__init__(*args, **kwargs)
+        self.n_parse_page = 0
+
+    def parse_page(self, *args, **kwargs):
+        self.n_parse_page += 1
+        return super(CountingWienParser, self).parse_page(*args, **kwargs)
+
+
+class TestParsedPageCache(unittest.TestCase):
+    def test_lru(self):
+        cache = ParsedPageCache(max_size=2)
+
+        for key in ["a", "b", "c"]:
+            cache.put(key, ParsedPage(key=key, sections=[]))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(2, len(cache))
+
+    def test_evict(self):
+        cache = ParsedPageCache()
+
+        cache.put(("a", True), ParsedPage(key="a", sections=[]))
+        cache.put(("a", False), ParsedPage(key="a", sections=[]))
+        cache.put(("b", True), ParsedPage(key="b", sections=[]))
+
+        cache.evict("a")
+
+        self.assertEqual(1, len(cache))
+        self.assertIsNotNone(cache.get(("b", True)))
+
+
+class TestCityParserParsedPage(unittest.TestCase):
+    def setUp(self) -> None:
+        with open(FILENAME_HTML) as f:
+            self.html = f.read()
+
+        self.parser = CountingWienParser()
+
+    def test_get_parsed_page(self):
+        parsed_page = self.parser.get_parsed_page(self.html)
+
+        self.assertEqual(get_page_key(self.html), parsed_page.key)
+        self.assertIs(parsed_page, self.parser.get_parsed_page(self.html))
+        self.assertEqual(1, self.parser.n_parse_page)
+
+        self.assertEqual(self.parser.parse_page(self.html), parsed_page.sections)
+
+    def test_paragraph_generator(self):
+        l = list(self.parser._paragraph_generator(self.html))
+        l_again = list(self.parser._paragraph_generator(self.html))
+
+        self.assertEqual(l, l_again)
+        self.assertEqual(1, self.parser.n_parse_page)
+
+    def test_extract_relations(self):
+        relations = self.parser.extract_relations(self.html, url="")
+
+        with self.subTest("Parsed once"):
+            self.assertEqual(1, self.parser.n_parse_page)
+
+        with self.subTest("Kept for the other consumers"):
+            n_hits = self.parser.parsed_page_cache.n_hits
+            self.parser.get_parsed_page(self.html)
+
+            self.assertEqual(n_hits + 1, self.parser.parsed_page_cache.n_hits)
+            self.assertEqual(1, self.parser.n_parse_page)
+
+        with self.subTest("Same relations"):
+            self.assertEqual(relations, self.parser.extract_relations(self.html, url=""))
+
+    def test_soup(self):
+        parsed_page = self.parser.get_parsed_page(self.html)
+
+        self.assertIsNotNone(parsed_page.soup)
+        self.assertIs(parsed_page.soup, parsed_page.soup)
+
+
+class TestRelationExtractor2ParsedPage(unittest.TestCase):
+    """
+    The page is parsed once for the whole extraction and released at the end. The remote calls are replaced.
+    """
+
+    def setUp(self) -> None:
+        with open(FILENAME_HTML) as f:
+            self.html = f.read()
+
+        self.parser = CountingWienParser()
+
+        self.get_public_service_name = mock.Mock(wraps=get_public_service_name)
+
+        for target, new in [
+            ("relation_extraction.methods.RelationExtractor.get_contact_info_split",
+             mock.Mock(return_value=ContactInfoSplit())),
+            ("relation_extraction.pipeline.get_public_service_description", mock.Mock(return_value="")),
+            ("relation_extraction.pipeline.get_public_service_name", self.get_public_service_name),
+        ]:
+            patcher = mock.patch(target, new)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.relation_extractor = RelationExtractor2(self.html,
+                                                     parser=self.parser,
+                                                     url="",
+                                                     context="https://www.wien.gv.at/",
+                                                     country_code="AT",
+                                                     lang_code="DE")
+
+    def test_extract_all(self):
+        ps = self.relation_extractor.extract_all(extract_concepts=False)
+
+        with self.subTest("Parsed once"):
+            self.assertEqual(1, self.parser.n_parse_page)
+
+        with self.subTest("Cache hit for the public service name"):
+            self.assertLessEqual(1, self.parser.parsed_page_cache.n_hits)
+
+            _, kwargs = self.get_public_service_name.call_args
+            self.assertIsNotNone(kwargs["soup"])
+            self.assertEqual(get_public_service_name(self.html), ps.name)
+
+        with self.subTest("Evicted at the end"):
+            self.assertEqual(0, len(self.parser.parsed_page_cache))
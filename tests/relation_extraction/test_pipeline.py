@@ -0,0 +1,218 @@
+import re
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+import rdflib
+from rdflib.compare import isomorphic
+
+from c4c_cpsv_ap.models import Info
+from connectors.translation import ETranslationConnector
+from data.html import FILENAME_HTML, get_html
+from relation_extraction.cities import Relations
+from relation_extraction.methods import ContactInfoSplit, RelationExtractor
+from relation_extraction.pipeline import RelationExtractor2
+from tests.connectors.test_translation import DocumentTranslationHandler
+
+CONTEXT = "https://www.1819.brussels/"
+URL = "https://www.1819.brussels/financial-plan"
+
+# Random identifier of a generated URI.
+PATTERN_UUID = re.compile(r"[0-9a-f]{32}")
+
+
+def get_relations(html, url=None, verbose=0) -> Relations:
+    return Relations(criterionRequirements=[Info(name="Conditions", description="Be a company.")],
+                     rules=[Info(name="Procedure", description="Fill in the form.")])
+
+
+def anonymize(graph: rdflib.Graph) -> rdflib.Graph:
+    """
+    Replace the generated URIs (and identifiers) by blank nodes, such that graphs of different runs can be compared.
+    """
+
+    def anonymize_term(term):
+        match = PATTERN_UUID.search(str(term))
+        return rdflib.BNode(match.group()) if match else term
+
+    graph_anonymous = rdflib.Graph()
+    for triple in graph.triples((None, None, None)):
+        graph_anonymous.add(tuple(map(anonymize_term, triple)))
+
+    return graph_anonymous
+
+
+class TestExtractAll(unittest.TestCase):
+    """
+    The remote calls are replaced, such that the concurrent extraction can be compared to the sequential one.
+    """
+
+    def setUp(self) -> None:
+        self.html = get_html(FILENAME_HTML)
+
+        self.get_contact_info_split = mock.Mock(return_value=ContactInfoSplit(email=["info@1819.brussels"],
+                                                                              address=["Rue 1, Brussels"]))
+        self.get_public_service_description = mock.Mock(return_value="The financial plan is a dynamic instrument.")
+        self.get_concepts = mock.Mock(return_value=["business", "project"])
+        self.extract_relations = mock.Mock(side_effect=get_relations)
+
+        for target, new in [
+            ("relation_extraction.methods.RelationExtractor.get_contact_info_split", self.get_contact_info_split),
+            ("relation_extraction.methods.get_public_service_description", self.get_public_service_description),
+            ("relation_extraction.pipeline.get_public_service_description", self.get_public_service_description),
+            ("relation_extraction.methods.get_concepts", self.get_concepts),
+            ("relation_extraction.pipeline.get_concepts", self.get_concepts),
+        ]:
+            patcher = mock.patch(target, new)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_relation_extractor(self) -> RelationExtractor2:
+        return RelationExtractor2(self.html,
+                                  parser=SimpleNamespace(extract_relations=self.extract_relations),
+                                  url=URL,
+                                  context=CONTEXT,
+                                  country_code="BE",
+                                  lang_code="EN")
+
+    def extract_sequential(self) -> RelationExtractor2:
+        """
+        One remote call after the other, as RelationExtractor2.extract_all before the calls were overlapped.
+        """
+        relation_extractor = self.get_relation_extractor()
+
+        ps = RelationExtractor.extract_all(relation_extractor, extract_concepts=True)
+        relation_extractor._add_relations(ps, self.extract_relations(self.html, url=URL))
+
+        return relation_extractor
+
+    def test_same_as_sequential(self):
+        relation_extractor = self.get_relation_extractor()
+        relation_extractor.extract_all(extract_concepts=True)
+
+        relation_extractor_sequential = self.extract_sequential()
+
+        graph = relation_extractor.provider.graph
+
+        with self.subTest("Relations are added"):
+            self.assertIn("Fill in the form.", {str(o) for o in graph.objects()})
+
+        with self.subTest("Same triples"):
+            self.assertEqual(len(relation_extractor_sequential.provider.graph), len(graph))
+            self.assertTrue(isomorphic(anonymize(relation_extractor_sequential.provider.graph), anonymize(graph)))
+
+        with self.subTest("Remote calls"):
+            self.extract_relations.assert_any_call(self.html, url=URL, verbose=0)
+            self.get_concepts.assert_any_call(self.html)
+
+    def test_contact_info_failed(self):
+        self.get_contact_info_split.side_effect = ConnectionError("Contact info")
+
+        relation_extractor = self.get_relation_extractor()
+
+        with self.assertWarns(UserWarning):
+            relation_extractor.extract_all()
+
+        with self.subTest("Still extracted"):
+            self.assertIn("Fill in the form.", {str(o) for o in relation_extractor.provider.graph.objects()})
+
+        with self.subTest("No contact info"):
+            self.assertNotIn("info@1819.brussels", {str(o) for o in relation_extractor.provider.graph.objects()})
+
+    def test_relations_failed(self):
+        self.extract_relations.side_effect = ConnectionError("Relations")
+
+        relation_extractor = self.get_relation_extractor()
+
+        with self.assertWarns(UserWarning):
+            relation_extractor.extract_all()
+
+        objects = {str(o) for o in relation_extractor.provider.graph.objects()}
+
+        with self.subTest("No relations"):
+            self.assertNotIn("Fill in the form.", objects)
+
+        with self.subTest("Public service"):
+            self.assertIn("The financial plan is a dynamic instrument.", objects)
+
+    def test_concepts_failed(self):
+        """
+        As before, a failure of the concept extraction is not caught.
+        """
+        self.get_concepts.side_effect = ConnectionError("Concepts")
+
+        with self.assertRaises(ConnectionError):
+            self.get_relation_extractor().extract_all(extract_concepts=True)
+
+
+class TestTranslate(unittest.TestCase):
+    """
+    With the mock of eTranslation, which "translates" to upper case.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("localhost", 0), DocumentTranslationHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        DocumentTranslationHandler.l_documents = []
+        DocumentTranslationHandler.l_targets = []
+        DocumentTranslationHandler.targets_unavailable = {"FR"}
+        self.addCleanup(setattr, DocumentTranslationHandler, "targets_unavailable", set())
+
+        patcher = mock.patch.object(ETranslationConnector, "url_trans_doc_blocking",
+                                    f"http://localhost:{self.server.server_port}/translate/document/blocking")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.relation_extractor = RelationExtractor2("<html></html>",
+                                                     parser=None,
+                                                     url=URL,
+                                                     context=CONTEXT,
+                                                     country_code="BE",
+                                                     lang_code="NL")
+
+        # The same text in different contexts.
+        self.graph = self.relation_extractor.provider.graph
+        self.l_quads = [(rdflib.URIRef(f"http://example.org/{subject}"),
+                         rdflib.RDFS.label,
+                         rdflib.Literal(text, lang="NL"),
+                         self.graph.get_context(context))
+                        for subject, text, context in [("a", "Kosten", CONTEXT),
+                                                       ("a", "Kosten", URL),
+                                                       ("b", "Voorwaarden", CONTEXT)]]
+        self.graph.addN(self.l_quads)
+
+    def test_translate(self):
+        with self.assertWarns(UserWarning):
+            self.relation_extractor.translate(["EN", "FR", "NL"], source="NL")
+
+        l_literals = [o for o in self.graph.objects() if isinstance(o, rdflib.Literal)]
+
+        with self.subTest("Successful target"):
+            for s, p, o, c in self.l_quads:
+                self.assertIn((s, p, rdflib.Literal(str(o).upper(), lang="EN")), c)
+
+        with self.subTest("Failed target"):
+            self.assertFalse([o for o in l_literals if o.language.upper() == "FR"])
+
+        with self.subTest("Source is not translated"):
+            self.assertNotIn("NL", DocumentTranslationHandler.l_targets)
+            self.assertFalse([o for o in l_literals if o.language.upper() == "NL" and str(o).isupper()])
+
+        with self.subTest("Sent once"):
+            self.assertListEqual([["Kosten", "Voorwaarden"]] * 2,
+                                 [sorted(document.splitlines()) for document in DocumentTranslationHandler.l_documents])
+            self.assertListEqual(["EN", "FR"], sorted(DocumentTranslationHandler.l_targets))
+
+
+if __name__ == '__main__':
+    unittest.main()
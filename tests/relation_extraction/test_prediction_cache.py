@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from BERT_classifier.app.models import Results
+from relation_extraction.prediction_cache import PredictionCache
+
+MODEL = "http://relations_classifier_bert_api_cpu:5000"
+
+
+def get_results(p: float) -> Results:
+    return Results(names=["cost", "rule"],
+                   probabilities=[p, 1 - p])
+
+
+class TestPredictionCache(unittest.TestCase):
+    def test_get_set(self):
+        cache = PredictionCache()
+
+        with self.subTest("Miss"):
+            self.assertIsNone(cache.get("Kosten", "NL", MODEL))
+
+        cache.set("Kosten", "NL", MODEL, get_results(.9))
+
+        with self.subTest("Hit"):
+            self.assertEqual(get_results(.9), cache.get("Kosten", "NL", MODEL))
+
+        with self.subTest("Normalized"):
+            self.assertEqual(get_results(.9), cache.get(" Kosten\n", "nl", MODEL))
+
+        with self.subTest("Other model"):
+            self.assertIsNone(cache.get("Kosten", "NL", "other model"))
+
+        with self.subTest("Hit rate"):
+            self.assertEqual(.5, cache.hit_rate)
+
+    def test_max_size(self):
+        cache = PredictionCache(max_size=2)
+
+        cache.set("a", "EN", MODEL, get_results(.1))
+        cache.set("b", "EN", MODEL, get_results(.2))
+        cache.get("a", "EN", MODEL)  # a is more recently used than b
+        cache.set("c", "EN", MODEL, get_results(.3))
+
+        self.assertEqual(2, len(cache))
+        self.assertDictEqual({"a": get_results(.1), "c": get_results(.3)},
+                             cache.get_many(["a", "b", "c"], "EN", MODEL))
+
+    def test_persistent(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "predictions.sqlite")
+
+            PredictionCache(filename=filename).set_many({"Kosten": get_results(.9),
+                                                         "Voorwaarden": get_results(.1)}, "NL", MODEL)
+
+            cache = PredictionCache(filename=filename)
+
+            self.assertDictEqual({"Kosten": get_results(.9), "Voorwaarden": get_results(.1)},
+                                 cache.get_many(["Kosten", "Voorwaarden", "Procedure"], "NL", MODEL))
+
+            with self.subTest("Loaded in memory"):
+                self.assertEqual(2, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
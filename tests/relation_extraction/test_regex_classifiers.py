@@ -0,0 +1,123 @@
+import re
+import unittest
+
+from relation_extraction.aalter import AalterCPSVAPRelationsClassifier
+from relation_extraction.austrheim import AustrheimCPSVAPRelationsClassifier
+from relation_extraction.cities import RegexCPSVAPRelationsClassifier
+from relation_extraction.nova_gorica import NovaGoricaCPSVAPRelationsClassifier
+from relation_extraction.regex_classifiers import compile_relations_pattern, DataRegexClassifiers, \
+    get_regex_classifiers, LABELS
+from relation_extraction.san_paolo import SanPaoloCPSVAPRelationsClassifier
+from relation_extraction.wien import WienCPSVAPRelationsClassifier
+from relation_extraction.zagreb import ZagrebCPSVAPRelationsClassifier
+
+TITLES = ["Voorwaarden", "Hoe aanvragen?", "Wat meebrengen?", "Prijs",
+          "Krav til søkjar", "Kva kostar det?",
+          "Obrazci", "Opis postopka", "Zahtevane priloge", "Taksa",
+          "Pagamenti", "Moduli da compilare e documenti da allegare",
+          "Voraussetzungen", "Allgemeine Informationen", "Erforderliche Unterlagen", "Kosten",
+          "Contact", "", "Het voorwaarden"]
+
+
+class TestRegexClassifiers(unittest.TestCase):
+    def test_load_yaml(self):
+        data = DataRegexClassifiers.load_yaml()
+
+        self.assertNotIn("City", data.municipality_names(), "Template should be removed")
+        self.assertIn("Wien", data.municipality_names())
+
+        self.assertEqual("kosten.*", data.get("wien").cost)
+
+    def test_same_as_re_match(self):
+        """
+        The single match gives the same labels as matching each pattern separately.
+        """
+
+        for classifier_class in [AalterCPSVAPRelationsClassifier, AustrheimCPSVAPRelationsClassifier,
+                                 NovaGoricaCPSVAPRelationsClassifier, SanPaoloCPSVAPRelationsClassifier,
+                                 WienCPSVAPRelationsClassifier, ZagrebCPSVAPRelationsClassifier]:
+            classifier = classifier_class()
+
+            predictions = classifier.predict_all(TITLES)
+
+            for title, prediction in zip(TITLES, predictions):
+                with self.subTest(classifier=classifier_class.__name__, title=title):
+                    for label in LABELS:
+                        pattern = getattr(classifier, f"pattern_{label}")
+
+                        self.assertEqual(bool(re.match(pattern, title, re.IGNORECASE)), getattr(prediction, label))
+
+    def test_multiple_labels(self):
+        classifier = RegexCPSVAPRelationsClassifier(pattern_criterion_requirement="voorwaarden",
+                                                    pattern_rule="voorwaarden en regels",
+                                                    pattern_cost="kosten")
+
+        prediction = classifier.predict_all(["Voorwaarden en regels"])[0]
+
+        self.assertTrue(prediction.criterion_requirement)
+        self.assertTrue(prediction.rule)
+        self.assertFalse(prediction.evidence)
+        self.assertFalse(prediction.cost)
+
+    def test_override_pattern(self):
+        classifier = WienCPSVAPRelationsClassifier(pattern_cost="preis")
+
+        self.assertTrue(classifier.predict_cost("Preis"))
+        self.assertTrue(classifier.predict_evidence("Erforderliche Unterlagen"))
+
+    def test_from_url(self):
+        classifier = RegexCPSVAPRelationsClassifier.from_url("https://www.wien.gv.at/amtshelfer/")
+
+        self.assertEqual("Wien", classifier.municipality)
+        self.assertIsNone(RegexCPSVAPRelationsClassifier.from_url("https://www.example.com"))
+
+    def test_get_by_url(self):
+        data = get_regex_classifiers()
+
+        for url, name in [("https://www.wien.gv.at/amtshelfer/", "Wien"),
+                          ("https://WIEN.GV.AT", "Wien"),
+                          ("www.aalter.be/verhuizen", "Aalter"),
+                          ("https://www.notwien.gv.at/", None),
+                          ("https://www.example.com/?redirect=https://www.wien.gv.at/", None),
+                          ("", None)]:
+            with self.subTest(url=url):
+                municipality = data.get_by_url(url)
+                self.assertEqual(name, municipality and municipality.name)
+
+    def test_named_groups(self):
+        with self.assertRaises(ValueError):
+            compile_relations_pattern({"cost": "(?P<price>kosten)"})
+
+    def test_groups(self):
+        for pattern in ["kosten(.)*", r"(a)\1", r"(a)?(?(1)b|c)", r"(a)\\\1"]:
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ValueError):
+                    compile_relations_pattern({"cost": pattern})
+
+        with self.subTest("Non-capturing group"):
+            self.assertTrue(compile_relations_pattern({"cost": "kosten(?:.)*"}).match("Kosten").group("cost"))
+
+        with self.subTest("Escaped backslash"):
+            self.assertTrue(compile_relations_pattern({"cost": r"a\\1"}).match("a\\1").group("cost"))
+
+    def test_inline_flags(self):
+        with self.assertRaisesRegex(ValueError, r"Inline flags"):
+            compile_relations_pattern({"cost": "(?i)kosten"})
+
+        with self.subTest("Scoped flag"):
+            self.assertTrue(compile_relations_pattern({"cost": "(?s:kosten.)"}).match("Kosten\n").group("cost"))
+
+    def test_invalid_pattern(self):
+        with self.assertRaisesRegex(ValueError, r"cost of Atlantis"):
+            compile_relations_pattern({"cost": "kosten("}, municipality="Atlantis")
+
+    def test_validate_yaml(self):
+        with self.assertRaisesRegex(ValueError, r"rule of Atlantis"):
+            DataRegexClassifiers(municipalities={"Atlantis": {"rule": "(procedure)"}})
+
+    def test_unknown_municipality(self):
+        with self.assertRaises(KeyError):
+            RegexCPSVAPRelationsClassifier(municipality="Atlantis")
+
+    def test_cached(self):
+        self.assertIs(get_regex_classifiers(), get_regex_classifiers())
@@ -0,0 +1,48 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from relation_extraction.utils import get_all_headers, get_page_procedure, HeaderIndex
+
+HTML = """<html><body>
+<div id="menu"><h2>Menu</h2></div>
+<div id="procedure">
+    <div id="title"><h1>Title</h1></div>
+    <h2>Sub title</h2>
+    <p>Paragraph</p>
+    <div><h3>Subsub</h3></div>
+</div>
+<h2>Footer</h2>
+</body></html>"""
+
+
+class TestHeaderIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.soup = BeautifulSoup(HTML, 'html.parser')
+        self.header_index = HeaderIndex(self.soup)
+
+    def test_get_headers(self):
+        for tag in [self.soup, self.soup.body] + self.soup.find_all("div"):
+            with self.subTest(tag=tag.get("id")):
+                headers = self.header_index.get_headers(tag)
+
+                self.assertEqual(get_all_headers(tag), headers)
+                self.assertEqual(len(headers), self.header_index.count(tag))
+
+    def test_contains(self):
+        self.assertIn(self.soup.find("h3"), self.header_index)
+        self.assertNotIn(self.soup.find("p"), self.header_index)
+
+    def test_get_page_procedure(self):
+        h_title = self.soup.find_all("h1")[-1]
+
+        page_procedure = get_page_procedure(h_title, header_index=self.header_index)
+
+        self.assertEqual("procedure", page_procedure.get("id"))
+        self.assertIs(page_procedure, get_page_procedure(h_title))
+
+    def test_get_page_procedure_max(self):
+        soup = BeautifulSoup("<html><body><div><div><h1>Title</h1></div></div></body></html>", 'html.parser')
+
+        # Only one header on the page: the first parent that contains it.
+        self.assertIs(soup.find("h1").parent, get_page_procedure(soup.find("h1")))
@@ -1,14 +1,27 @@
+import hashlib
+import json
 import os
+import shutil
+import tempfile
 import unittest
 import warnings
+from types import SimpleNamespace
+from unittest import mock
 
-from data.html import url2html
-from scripts.extract_cpsv_ap import extract_cpsv_ap_from_html, get_parser
+import rdflib
+
+from c4c_cpsv_ap.connector.hierarchy import CPSV_APGraph
+from data.html import get_html, url2html
+from relation_extraction.aalter import AalterParser
+from relation_extraction.cities import RegexCityParser
+from scripts.extract_cpsv_ap import extract_cpsv_ap_from_corpus, extract_cpsv_ap_from_html, get_batch_jobs, \
+    get_municipality_parser, get_parser
 
 DIR_SOURCE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 FILENAME_AFFLIGEM = os.path.join(DIR_SOURCE, "data/relation_extraction/AFFLIGEM_HANDTEKENING.html")
 FILENAME_AUSTRHEIM = os.path.join(DIR_SOURCE,
                                   "tests/relation_extraction/EXAMPLE_FILES/https_austrheim_kommune_no_innhald_helse_sosial_og_omsorg_pleie_og_omsorg_omsorgsbustader_.html")
+FILENAME_AALTER = os.path.join(DIR_SOURCE, "tests/relation_extraction/EXAMPLE_FILES/https_www_aalter_be_eid.html")
 
 DIR_EXAMPLES = os.path.join(os.path.dirname(__file__), "examples")
 
@@ -552,6 +565,189 @@ class TestCLISaveHTMLParsing(unittest.TestCase):
         return
 
 
+class TestCLIBatch(unittest.TestCase):
+    def test_args(self):
+        parser = get_parser()
+
+        l_args = [
+            "--batch",
+            "--workers", "4",
+            "--split",
+            "-o", DIR_EXAMPLES,
+            "-l", "NL",
+            "-c", "BE",
+            "-m", "www.aalter.be",
+            os.path.join(DIR_SOURCE, "tests/relation_extraction/EXAMPLE_FILES"),
+        ]
+
+        args = parser.parse_args(l_args)
+
+        self.assertTrue(args.batch)
+        self.assertTrue(args.split)
+        self.assertEqual(4, args.workers)
+
+    def test_jobs_directory(self):
+        dirname = os.path.join(DIR_SOURCE, "tests/relation_extraction/EXAMPLE_FILES")
+
+        jobs = get_batch_jobs(dirname, country_code="BE", lang="NL", context="www.aalter.be")
+
+        with self.subTest("All HTML files"):
+            self.assertEqual(len([f for f in os.listdir(dirname) if f.endswith(".html")]), len(jobs))
+
+        with self.subTest("Defaults"):
+            for job in jobs:
+                self.assertEqual("BE", job.country)
+                self.assertEqual("NL", job.language)
+                self.assertEqual("www.aalter.be", job.municipality)
+
+    def test_jobs_glob(self):
+        pattern = os.path.join(DIR_SOURCE, "tests/relation_extraction/EXAMPLE_FILES/*aalter*.html")
+
+        jobs = get_batch_jobs(pattern)
+
+        self.assertEqual(2, len(jobs))
+
+    def test_jobs_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename_manifest = os.path.join(tmp_dir, "manifest.jsonl")
+
+            with open(filename_manifest, "w") as f:
+                f.write(json.dumps({"html": "page.html",
+                                    "url": "https://www.wien.gv.at/",
+                                    "country": "AT",
+                                    "language": "DE"}) + "\n")
+                f.write(json.dumps({"html": FILENAME_AUSTRHEIM}) + "\n")
+
+            jobs = get_batch_jobs(filename_manifest, country_code="NO", lang="NO")
+
+        with self.subTest("Relative path"):
+            self.assertEqual(os.path.join(tmp_dir, "page.html"), jobs[0].html)
+
+        with self.subTest("From manifest"):
+            self.assertEqual("AT", jobs[0].country)
+            self.assertEqual("DE", jobs[0].language)
+
+        with self.subTest("Defaults"):
+            self.assertEqual(FILENAME_AUSTRHEIM, jobs[1].html)
+            self.assertEqual("NO", jobs[1].country)
+            self.assertIsNone(jobs[1].url)
+
+
+class TestGetMunicipalityParser(unittest.TestCase):
+    def test_aalter(self):
+        self.assertIsInstance(get_municipality_parser(country_code="BE", url="https://www.aalter.be/eid"), AalterParser)
+
+    def test_no_url(self):
+        self.assertIsNone(get_municipality_parser(country_code="BE", url=None))
+
+    def test_regex_classifiers(self):
+        """
+        Municipality without a parser of its own, found by its domain in regex_classifiers.yml.
+        """
+        parser = get_municipality_parser(url="https://www.wien.gv.at/amtshelfer/")
+
+        self.assertIs(RegexCityParser, type(parser))
+        self.assertEqual("Wien", parser.classifier.municipality)
+
+
+class StubRelationExtractor:
+    """
+    Replaces the extraction of a page by a single triple, identified by the content of the page.
+    """
+
+    def __init__(self, html: str, **kwargs):
+        self.uri = rdflib.URIRef("http://example.org/" + hashlib.sha256(html.encode("utf-8")).hexdigest())
+
+        graph = CPSV_APGraph()
+        graph.get_context("http://example.org/context").add((self.uri, rdflib.RDF.type, rdflib.OWL.Thing))
+        self.provider = SimpleNamespace(graph=graph)
+
+    def export(self, destination=None):
+        self.provider.graph.serialize(destination)
+
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+
+        # Same name in different subdirectories.
+        self.dir_source = os.path.join(self.tmp_dir, "source")
+        self.l_filename = [os.path.join(self.dir_source, subdir, "page.html") for subdir in ["a", "b"]]
+        for filename_example, filename in zip([FILENAME_AALTER, FILENAME_AUSTRHEIM], self.l_filename):
+            os.makedirs(os.path.dirname(filename))
+            shutil.copyfile(filename_example, filename)
+
+        self.l_uri = [StubRelationExtractor(get_html(filename)).uri for filename in self.l_filename]
+
+        patcher = mock.patch("scripts.extract_cpsv_ap._get_relation_extractor", StubRelationExtractor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def extract(self, source, output, split=False):
+        return extract_cpsv_ap_from_corpus(source,
+                                           output,
+                                           context="www.aalter.be",
+                                           country_code="BE",
+                                           lang="NL",
+                                           split=split,
+                                           workers=1,
+                                           filename_report=os.path.join(self.tmp_dir, "report.jsonl"))
+
+    def test_merged(self):
+        output = os.path.join(self.tmp_dir, "output.rdf")
+
+        l_report = self.extract(self.dir_source, output)
+
+        with self.subTest("Report"):
+            self.assertListEqual(self.l_filename, [report.html for report in l_report])
+            self.assertListEqual([True, True], [report.success for report in l_report])
+            self.assertListEqual([1, 1], [report.n_triples for report in l_report])
+
+        with self.subTest("Report file"):
+            with open(os.path.join(self.tmp_dir, "report.jsonl")) as f:
+                self.assertListEqual([report.dict() for report in l_report], list(map(json.loads, f)))
+
+        with self.subTest("Merged output"):
+            graph = rdflib.Graph().parse(output, format="turtle")
+            self.assertSetEqual(set(self.l_uri), set(graph.subjects()))
+
+    def test_split(self):
+        output = os.path.join(self.tmp_dir, "output")
+
+        l_report = self.extract(self.dir_source, output, split=True)
+
+        with self.subTest("Relative path"):
+            self.assertListEqual([os.path.join(output, subdir, "page.rdf") for subdir in ["a", "b"]],
+                                 [report.output for report in l_report])
+
+        for report, uri in zip(l_report, self.l_uri):
+            with self.subTest("Split output", output=report.output):
+                graph = rdflib.Graph().parse(report.output, format="turtle")
+                self.assertListEqual([uri], list(graph.subjects()))
+
+    def test_split_duplicate(self):
+        filename_manifest = os.path.join(self.tmp_dir, "manifest.jsonl")
+        with open(filename_manifest, "w") as f:
+            for filename in [self.l_filename[1], self.l_filename[0], self.l_filename[1]]:
+                f.write(json.dumps({"html": filename}) + "\n")
+
+        output = os.path.join(self.tmp_dir, "output")
+
+        l_report = self.extract(filename_manifest, output, split=True)
+
+        with self.subTest("Order of the manifest"):
+            self.assertListEqual([self.l_filename[1], self.l_filename[0], self.l_filename[1]],
+                                 [report.html for report in l_report])
+
+        with self.subTest("Unique output"):
+            self.assertListEqual([os.path.join(output, "b", "page.rdf"),
+                                  os.path.join(output, "a", "page.rdf"),
+                                  os.path.join(output, "b", "page_2.rdf")],
+                                 [report.output for report in l_report])
+
+
 def print_command(l_args):
     print()
     print("$ python extract_cpsv_ap.py", *l_args)